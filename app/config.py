@@ -1,10 +1,17 @@
+import os
 from pathlib import Path
+from typing import Optional
 import yaml
 import logging
 
+# Overrides the default config file, e.g. for load tests
+CONFIG_ENV = "ASSISTANT_CONFIG"
+DEFAULT_CONFIG_PATH = "./app/config/assistant.yaml"
+
 
 class Config:
-    def __init__(self, path: str = "./app/config/assistant.yaml"):
+    def __init__(self, path: Optional[str] = None):
+        path = path or os.environ.get(CONFIG_ENV) or DEFAULT_CONFIG_PATH
         with open(Path(path), "r") as f:
             self.raw = yaml.safe_load(f) or {}
 
@@ -42,10 +49,28 @@ class Config:
             },
         )
 
+        # Storage
+        self.storage = self.raw.get(
+            "storage",
+            {
+                "path": "data/assistant.db",
+                "write_behind": False,
+            },
+        )
+
+        # Memory
+        self.memory = self.raw.get(
+            "memory",
+            {
+                "retrieval": "lexical",
+            },
+        )
+
         # TTS
         self.tts = self.raw.get(
             "tts",
             {
+                "backend": "piper",
                 "model_path": "models/piper/en_US-amy-medium.onnx",
                 "use_cuda": False,
             },
@@ -57,5 +82,7 @@ class Config:
             {
                 "level": "INFO",
                 "dir": "logs",
+                "format": "text",
+                "queue": True,
             },
         )
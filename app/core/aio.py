@@ -0,0 +1,46 @@
+import asyncio
+import contextvars
+from concurrent.futures import Executor
+from typing import Any, AsyncIterator, Callable, Generator, Optional
+
+_SENTINEL = object()
+
+
+def _next_or_sentinel(iterator):
+    try:
+        return next(iterator)
+    except StopIteration as stop:
+        return _SENTINEL, stop.value
+
+
+async def run_blocking(fn: Callable[..., Any], *args, executor: Optional[Executor] = None) -> Any:
+    """
+    Run a blocking call (LLM, tool, planner) on `executor` (default: the
+    loop's default executor), in a copy of the caller's context so the
+    current trace span carries over. Storage calls use Database.run() instead.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(executor, context.run, fn, *args)
+
+
+async def iterate_blocking(gen: Generator, result: list | None = None) -> AsyncIterator[Any]:
+    """
+    Drive a blocking generator on the default executor and re-yield its items.
+    The generator's return value is appended to `result` when given.
+
+    Each step runs in a fresh context copy, so the generator must not keep
+    a span (or other context variable) open across a yield; time such
+    stages from the awaiting side instead.
+    """
+    iterator = iter(gen)
+
+    while True:
+        item = await run_blocking(_next_or_sentinel, iterator)
+
+        if isinstance(item, tuple) and len(item) == 2 and item[0] is _SENTINEL:
+            if result is not None:
+                result.append(item[1])
+            return
+
+        yield item
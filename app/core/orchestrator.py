@@ -1,19 +1,54 @@
 import uuid
 import logging
 import time
-from typing import Generator, Optional, Dict
+from functools import partial
+from typing import Any, Awaitable, Callable, Generator, Optional, Dict
 
+from app.core.aio import iterate_blocking, run_blocking
 from app.core.events import AssistantSpeechEvent, AssistantStateEvent
 from app.core.assistant_state import AssistantState
 from app.core.actions import Action
 from app.core.plan import Plan
-from app.perception.state import PerceptionState
+from app.observability import metrics, tracing
+from app.perception.bus import PerceptionBus
+from app.services.prompt_compressor import PromptCompressor
+from app.services.summary_worker import SummaryWorker
 from app.services.tool_executor import ToolExecutor
 
 
 logger = logging.getLogger("orchestrator")
 
 
+class _Call:
+    """
+    A turn step that blocks: run inline by the sync driver, awaited by
+    the async one (storage on the database pool, anything else on the
+    default executor).
+    """
+
+    def __init__(self, run: Callable[[], Any], run_async: Callable[[], Awaitable[Any]]):
+        self.run = run
+        self.run_async = run_async
+
+    @classmethod
+    def storage(cls, fn, async_fn, *args, **kwargs) -> "_Call":
+        return cls(partial(fn, *args, **kwargs), partial(async_fn, *args, **kwargs))
+
+    @classmethod
+    def blocking(cls, fn, *args) -> "_Call":
+        return cls(partial(fn, *args), partial(run_blocking, fn, *args))
+
+
+class _Stream:
+    """
+    A turn step that is itself a generator of events (tool, LLM stream).
+    Its return value is sent back to the turn.
+    """
+
+    def __init__(self, events: Generator):
+        self.events = events
+
+
 class Orchestrator:
     def __init__(
         self,
@@ -27,6 +62,10 @@ class Orchestrator:
         memory_policy,
         tool_executor: ToolExecutor,
         summary_trigger: int = 10,
+        summary_worker: Optional[SummaryWorker] = None,
+        compressor: Optional[PromptCompressor] = None,
+        perception: Optional[PerceptionBus] = None,
+        session_id: Optional[str] = None,
     ):
         self.llm = llm
         self.context_builder = context_builder
@@ -37,11 +76,17 @@ class Orchestrator:
         self.planner = planner
         self.tool_executor = tool_executor
         self.summary_trigger = summary_trigger
+        self.summary_worker = summary_worker
+        self.compressor = compressor
         self.memory_policy = memory_policy
 
-        self.perception = PerceptionState()  # NEW
+        self.perception = perception or PerceptionBus()
+
+        # Rolling summarization counters
+        self.summaries_built = 0
+        self.messages_summarized = 0
 
-        self.session_id = str(uuid.uuid4())[:8]
+        self.session_id = session_id or str(uuid.uuid4())[:8]
 
         logger.info(
             "[%s] Orchestrator initialized (summary_trigger=%d)",
@@ -50,11 +95,36 @@ class Orchestrator:
         )
 
     # ============================================================
-    # Public entry point
+    # Public entry points
+    #
+    # Both run the same turn (_turn); they only differ in how its
+    # storage and blocking calls are executed (see _Call).
     # ============================================================
 
     def handle_user_input(self, user_text: str):
+        return self._drive(self._turn(user_text))
+
+    async def handle_user_input_async(self, user_text: str):
+        """
+        Async twin of handle_user_input() for the server.
+
+        Storage is awaited on the database thread pool; only the blocking
+        planner, tool, LLM and summarizer calls use the default executor.
+        """
+        async for event in self._drive_async(self._turn(user_text)):
+            yield event
+
+    # ============================================================
+    # Turn
+    # ============================================================
+
+    def _turn(self, user_text: str):
+        """
+        One turn as a generator of steps: events for the caller, plus
+        _Call / _Stream requests the driver executes and sends back.
+        """
         start_ts = time.perf_counter()
+        metrics.TURNS.inc()
 
         logger.info(
             "[%s] User input received (len=%d)",
@@ -79,14 +149,14 @@ class Orchestrator:
         # --------------------------------------------------------
         # 2. Persist user input
         # --------------------------------------------------------
-        self.history.add(self.session_id, "user", user_text)
+        yield _Call.storage(self.history.add, self.history.add_async, self.session_id, "user", user_text)
         logger.debug("[%s] User input persisted to history", self.session_id)
 
         # --------------------------------------------------------
         # 3. Planning (decide actions)
         # --------------------------------------------------------
         perception_snapshot = self.perception.snapshot()  # NEW
-        plan = self._plan(user_text, perception_snapshot)  # NEW
+        plan = yield _Call.blocking(self._plan, user_text, perception_snapshot)  # NEW
 
         logger.debug(
             "[%s] Plan actions: %s",
@@ -107,13 +177,12 @@ class Orchestrator:
             )
 
             if action.type == "web_search":
-                    tool_context = yield from self.tool_executor.execute(
-                        action,
-                        user_text,
-                    )
+                with tracing.span("tool", tool=action.type) as tool_span:
+                    tool_context = yield _Stream(self.tool_executor.execute(action, user_text))
+                    tool_span.set("tool.context_chars", len(tool_context or ""))
 
             elif action.type == "write_memory":
-                self._run_memory_action(action)
+                yield from self._run_memory_action(action)
 
             elif action.type == "respond":
                 logger.debug(
@@ -132,17 +201,17 @@ class Orchestrator:
         # --------------------------------------------------------
         # 5. Context construction
         # --------------------------------------------------------
-        messages = self._build_context(user_text, tool_context)
+        messages = yield from self._build_context(user_text, tool_context)
 
         # --------------------------------------------------------
         # 6. LLM streaming response
         # --------------------------------------------------------
-        response = yield from self._stream_response(messages)
+        response = yield _Stream(self._stream_response(messages, tracing.current_span()))
 
         # --------------------------------------------------------
         # 7. Persist assistant response
         # --------------------------------------------------------
-        self.history.add(self.session_id, "assistant", response)
+        yield _Call.storage(self.history.add, self.history.add_async, self.session_id, "assistant", response)
         logger.debug("[%s] Assistant response persisted to history", self.session_id)
 
         yield AssistantSpeechEvent(text=response, is_final=True)
@@ -151,7 +220,13 @@ class Orchestrator:
         # --------------------------------------------------------
         # 8. Post-processing (summarization)
         # --------------------------------------------------------
-        self._maybe_summarize()
+        if self.summary_worker is not None:
+            self.summary_worker.submit(
+                self.session_id,
+                partial(self._maybe_summarize, tracing.current_span()),
+            )
+        else:
+            yield from self._summarize(tracing.current_span())
 
         logger.info(
             "[%s] Turn completed (duration=%.2f ms)",
@@ -159,6 +234,61 @@ class Orchestrator:
             (time.perf_counter() - start_ts) * 1000,
         )
 
+    # ============================================================
+    # Drivers
+    # ============================================================
+
+    def _drive(self, steps):
+        """
+        Run steps inline: calls are made directly, streams re-yielded.
+        Returns the steps' return value.
+        """
+        result, error = None, None
+
+        while True:
+            try:
+                step = steps.throw(error) if error is not None else steps.send(result)
+            except StopIteration as stop:
+                return stop.value
+
+            result, error = None, None
+            try:
+                if isinstance(step, _Stream):
+                    result = yield from step.events
+                elif isinstance(step, _Call):
+                    result = step.run()
+                else:
+                    yield step
+            except Exception as e:
+                error = e
+
+    async def _drive_async(self, steps):
+        """
+        Run steps from the event loop: calls are awaited, streams driven
+        on the default executor.
+        """
+        result, error = None, None
+
+        while True:
+            try:
+                step = steps.throw(error) if error is not None else steps.send(result)
+            except StopIteration:
+                return
+
+            result, error = None, None
+            try:
+                if isinstance(step, _Stream):
+                    returned: list = []
+                    async for event in iterate_blocking(step.events, returned):
+                        yield event
+                    result = returned[0]
+                elif isinstance(step, _Call):
+                    result = await step.run_async()
+                else:
+                    yield step
+            except Exception as e:
+                error = e
+
     # ============================================================
     # Planning
     # ============================================================
@@ -166,14 +296,21 @@ class Orchestrator:
     def _plan(self, user_text: str, perception: dict) -> Plan:  # NEW
         logger.info("[%s] Running planner", self.session_id)
 
+        planner_name = self.planner.__class__.__name__
+        start_ts = time.perf_counter()
+
         try:
-            plan = self.planner.decide(
-                user_text=user_text,
-                perception=perception,  # NEW
-            )
+            with tracing.span("planner", planner=planner_name) as planner_span:
+                plan = self.planner.decide(
+                    user_text=user_text,
+                    perception=perception,  # NEW
+                )
+                planner_span.set("plan.actions", ",".join(a.type for a in plan.actions))
         except Exception:
             logger.exception("[%s] Planner failed", self.session_id)
             raise
+        finally:
+            metrics.PLANNER_LATENCY.labels(planner_name).observe(time.perf_counter() - start_ts)
 
         logger.info(
             "[%s] Planner produced %d actions",
@@ -258,7 +395,9 @@ class Orchestrator:
             logger.debug("[%s] Memory action ignored by policy", self.session_id)
             return
 
-        self.memory.add(
+        yield _Call.storage(
+            self.memory.add,
+            self.memory.add_async,
             content=decision.content,
             category=decision.category,
             importance=decision.importance,
@@ -278,11 +417,18 @@ class Orchestrator:
     def _build_context(self, user_text: str, tool_context: Optional[str]):
         logger.info("[%s] Building context", self.session_id)
 
-        messages = self.context_builder.build(
-            session_id=self.session_id,
-            user_text=user_text,
-            tool_context=tool_context,
-        )
+        with tracing.span("context.build") as context_span:
+            messages = yield _Call.storage(
+                self.context_builder.build,
+                self.context_builder.build_async,
+                session_id=self.session_id,
+                user_text=user_text,
+                tool_context=tool_context,
+            )
+            context_span.set("context.messages", len(messages))
+        if self.compressor is not None:
+            with tracing.span("context.compress"):
+                messages = yield _Call.blocking(self.compressor.compress, messages, user_text)
 
         logger.debug(
             "[%s] Context built (messages=%d, tool_context=%s)",
@@ -292,16 +438,37 @@ class Orchestrator:
         )
         return messages
 
-    def _stream_response(self, messages):
+    def _stream_response(self, messages, parent=tracing.NOOP_SPAN):
+        """
+        Streams the LLM answer. Timed with explicit child spans of
+        `parent`: in the async path each step runs in a fresh context, so
+        no span can stay current across the yields.
+        """
         logger.info("[%s] Calling LLM (streaming)", self.session_id)
         yield AssistantStateEvent(state=AssistantState.RESPONDING)
 
         buffer = ""
+        chunks = 0
         start_ts = time.perf_counter()
+        generate = parent.child("llm.generate", **{"llm.messages": len(messages)})
+        first_token = generate.child("llm.first_token")
 
-        for chunk in self.llm.stream_chat(messages):
-            buffer += chunk
-            yield AssistantSpeechEvent(text=chunk)
+        try:
+            for chunk in self.llm.stream_chat(messages):
+                if not chunks:
+                    first_token.end()
+                    metrics.TIME_TO_FIRST_TOKEN.observe(time.perf_counter() - start_ts)
+                buffer += chunk
+                chunks += 1
+                yield AssistantSpeechEvent(text=chunk)
+        finally:
+            first_token.end()
+            # Chunks are ~tokens for Ollama's streaming API
+            elapsed = time.perf_counter() - start_ts
+            generate.set("llm.chunks", chunks)
+            generate.set("llm.chars", len(buffer))
+            generate.set("llm.chunks_per_s", round(chunks / elapsed, 2) if elapsed > 0 else 0.0)
+            generate.end()
 
         logger.info(
             "[%s] LLM response complete (chars=%d, duration=%.2f ms)",
@@ -315,44 +482,93 @@ class Orchestrator:
     # Summarization
     # ============================================================
 
-    def _maybe_summarize(self):
+    def _maybe_summarize(self, parent=tracing.NOOP_SPAN):
+        """
+        Summarization pass run inline, e.g. as a SummaryWorker job.
+        """
+        for _ in self._drive(self._summarize(parent)):
+            pass
+
+    def _summarize(self, parent=tracing.NOOP_SPAN):
         logger.debug("[%s] Checking summarization conditions", self.session_id)
 
-        if self.summary_store.get(self.session_id):
-            logger.debug("[%s] Summary already exists, skipping", self.session_id)
+        summary, summarized_count = yield _Call.storage(
+            self.summary_store.get_progress,
+            self.summary_store.get_progress_async,
+            self.session_id,
+        )
+        message_count = yield _Call.storage(self.history.count, self.history.count_async, self.session_id)
+
+        if not self._summary_due(message_count, summarized_count):
             return
 
-        history = self.history.get_recent(
-            session_id=self.session_id,
-            limit=100,
+        new_messages = yield _Call.storage(
+            self.history.get_range,
+            self.history.get_range_async,
+            self.session_id,
+            summarized_count,
+            message_count,
         )
 
-        if len(history) < self.summary_trigger:
+        try:
+            with tracing.use_span(parent), tracing.span("summarize", **{"summary.messages": len(new_messages)}):
+                summary = yield _Call.blocking(self._fold_summary, summary, new_messages)
+        except Exception:
+            logger.exception("[%s] Summarization failed", self.session_id)
+            return
+
+        yield _Call.storage(
+            self.summary_store.set,
+            self.summary_store.set_async,
+            self.session_id,
+            summary,
+            message_count,
+        )
+        self._log_summary(summary, len(new_messages), message_count)
+
+    def _summary_due(self, message_count: int, summarized_count: int) -> bool:
+        """
+        Rolling summarization: due once `summary_trigger` messages arrived
+        since the summary's high-water mark. Both counts are cached.
+        """
+        unsummarized = message_count - summarized_count
+
+        if unsummarized < self.summary_trigger:
             logger.debug(
-                "[%s] History length (%d) below trigger (%d)",
+                "[%s] Unsummarized messages (%d) below trigger (%d)",
                 self.session_id,
-                len(history),
+                unsummarized,
                 self.summary_trigger,
             )
-            return
+            return False
 
-        logger.info("[%s] Summarizing conversation history", self.session_id)
+        return True
 
+    def _fold_summary(self, summary: Optional[str], new_messages: list) -> str:
         summary_input = [
             {"role": row["role"], "content": row["content"]}
-            for row in history
+            for row in new_messages
         ]
 
-        try:
-            summary = self.summarizer.summarize(summary_input)
-        except Exception:
-            logger.exception("[%s] Summarization failed", self.session_id)
-            return
+        if summary:
+            logger.info(
+                "[%s] Folding %d messages into summary",
+                self.session_id,
+                len(summary_input),
+            )
+            return self.summarizer.fold(summary, summary_input)
+
+        logger.info("[%s] Summarizing conversation history", self.session_id)
+        return self.summarizer.summarize(summary_input)
 
-        self.summary_store.set(self.session_id, summary)
+    def _log_summary(self, summary: str, folded: int, message_count: int) -> None:
+        self.summaries_built += 1
+        self.messages_summarized += folded
 
         logger.info(
-            "[%s] History summarized (%d chars)",
+            "[%s] History summarized (%d chars, covers %d messages, summaries=%d)",
             self.session_id,
             len(summary),
+            message_count,
+            self.summaries_built,
         )
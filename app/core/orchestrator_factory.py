@@ -1,25 +1,34 @@
 import logging
+from typing import Optional
 
 from app.config import Config
 from app.llm.ollama_stream import OllamaClient
+from app.llm.priority import LLMPriorityGate, PrioritizedLLM
 from app.core.orchestrator import Orchestrator
 from app.storage.database import Database
 from app.memory.chat_history import ChatHistoryStore
 from app.memory.memory_store import MemoryStore
+from app.memory.memory_index import MemoryIndexCache
+from app.memory.retention import MemoryRetention
+from app.memory.session_cache import SessionCache
 from app.memory.summary_store import SummaryStore
 from app.services.context_builder import ContextBuilder
 from app.services.summarizer import HistorySummarizer
+from app.services.summary_worker import SummaryWorker
 from app.tools.web_search import SearXNGClient
 from app.services.search_summarizer import SearchResultSummarizer
 from app.tools.web_search import WebSearchTool
 from app.planners.factory import build_planner
 from app.memory.memory_policy import SimpleMemoryPolicy
+from app.perception.bus import PerceptionBus
+from app.services.prompt_compressor import PromptCompressor
+from app.services.tokens import TokenCounter
 from app.services.tool_executor import ToolExecutor
 
 logger = logging.getLogger("orchestrator_factory")
 
 
-def build_orchestrator() -> Orchestrator:
+def build_orchestrator(session_id: Optional[str] = None) -> Orchestrator:
     logger.info("Building orchestrator")
 
     # --------------------------------------------------
@@ -43,7 +52,7 @@ def build_orchestrator() -> Orchestrator:
         config.llm.get("host"),
     )
 
-    llm = OllamaClient(
+    backend = OllamaClient(
         model=config.llm["model"],
         host=config.llm["host"],
         options={
@@ -53,6 +62,17 @@ def build_orchestrator() -> Orchestrator:
         },
     )
 
+    # User-facing calls go first; summaries wait for an idle backend
+    priority_cfg = config.llm.get("priority", {})
+    gate = LLMPriorityGate.for_backend(
+        config.llm["host"],
+        idle_s=priority_cfg.get("background_idle_s", 0.5),
+        max_wait_s=priority_cfg.get("background_max_wait_s", 30.0),
+        background_slots=priority_cfg.get("background_slots", 2),
+    )
+    llm = PrioritizedLLM(backend, gate)
+    background_llm = PrioritizedLLM(backend, gate, background=True)
+
     logger.debug(
         "LLM options: temperature=%.2f top_p=%.2f max_tokens=%d",
         config.llm["generation"]["temperature"],
@@ -65,10 +85,25 @@ def build_orchestrator() -> Orchestrator:
     # --------------------------------------------------
     logger.info("Initializing database and stores")
 
-    db = Database()
-    history_store = ChatHistoryStore(db)
-    memory_store = MemoryStore(db)
-    summary_store = SummaryStore(db)
+    storage_cfg = config.storage
+
+    db = Database.shared(
+        storage_cfg.get("path", "data/assistant.db"),
+        write_behind=storage_cfg.get("write_behind", False),
+        commit_window_ms=storage_cfg.get("commit_window_ms", 20.0),
+        max_batch=storage_cfg.get("max_batch", 256),
+        readers=storage_cfg.get("readers", 4),
+        cached_statements=storage_cfg.get("cached_statements", 256),
+        async_workers=storage_cfg.get("async_workers"),
+    )
+    session_cache = SessionCache.for_database(
+        db,
+        capacity=config.context.get("history_cache_size", 100),
+        max_sessions=config.context.get("history_cache_sessions", 256),
+    )
+    history_store = ChatHistoryStore(db, cache=session_cache)
+    memory_store = _build_memory_store(config, db)
+    summary_store = SummaryStore(db, cache=session_cache)
 
     logger.debug("Storage initialized: history, memory, summary")
 
@@ -84,7 +119,12 @@ def build_orchestrator() -> Orchestrator:
     # --------------------------------------------------
     logger.info("Initializing summarizers")
 
-    history_summarizer = HistorySummarizer(llm)
+    history_summarizer = HistorySummarizer(
+        background_llm,
+        max_chars=config.orchestrator.get("summary_max_chars", 1200),
+        chunk_tokens=config.orchestrator.get("summary_chunk_tokens", 1500),
+        max_concurrency=config.orchestrator.get("summary_concurrency", 2),
+    )
     search_summarizer = SearchResultSummarizer(llm)
 
     logger.debug(
@@ -137,6 +177,8 @@ def build_orchestrator() -> Orchestrator:
     # --------------------------------------------------
     logger.info("Setting up context builder")
 
+    token_counter = TokenCounter(config.context.get("tokenizer"))
+
     context_builder = ContextBuilder(
         system_prompt=config.assistant["system_prompt"],
         history_store=history_store,
@@ -144,8 +186,19 @@ def build_orchestrator() -> Orchestrator:
         summary_store=summary_store,
         history_limit=config.context["history_limit"],
         memory_limit=config.context["memory_limit"],
+        budget_tokens=config.context.get("budget_tokens"),
+        token_counter=token_counter,
     )
 
+    compression = config.context.get("compression") or {}
+    compressor = None
+    if compression.get("enabled", False):
+        compressor = PromptCompressor(
+            target_ratio=compression.get("target_ratio", 0.6),
+            min_tokens=compression.get("min_tokens", 48),
+            token_counter=token_counter,
+        )
+
     logger.debug(
         "Context builder configured (history_limit=%d, memory_limit=%d)",
         config.context["history_limit"],
@@ -169,6 +222,14 @@ def build_orchestrator() -> Orchestrator:
         tool_executor=tool_executor,
         memory_policy=memory_policy,
         summary_trigger=config.orchestrator["summary_trigger"],
+        summary_worker=(
+            SummaryWorker.shared()
+            if config.orchestrator.get("background_summary", True)
+            else None
+        ),
+        compressor=compressor,
+        perception=_build_perception(config),
+        session_id=session_id,
     )
 
     logger.info(
@@ -177,3 +238,105 @@ def build_orchestrator() -> Orchestrator:
     )
 
     return orchestrator
+
+
+def _build_memory_store(config, db: Database) -> MemoryStore:
+    memory_cfg = config.memory
+    store = _build_memory_retrieval(config, db)
+
+    capacity = memory_cfg.get("capacity")
+    if capacity:
+        store.retention = MemoryRetention.for_database(
+            db,
+            capacity=capacity,
+            half_life_days=memory_cfg.get("half_life_days", 30.0),
+            interval_s=memory_cfg.get("retention_interval_s", 60.0),
+            index_cache=store.index_cache,
+            vector_index=store.vector_index,
+        )
+        logger.info("Memory retention enabled (capacity=%d)", capacity)
+
+    return store
+
+
+def _build_memory_retrieval(config, db: Database) -> MemoryStore:
+    memory_cfg = config.memory
+    retrieval = memory_cfg.get("retrieval", "lexical")
+
+    dedup = {
+        "dedup_threshold": memory_cfg.get("dedup_threshold"),
+        "dedup_similarity": memory_cfg.get("dedup_similarity"),
+    }
+
+    if retrieval == "lexical":
+        logger.info("Memory retrieval: lexical")
+        return MemoryStore(db, **dedup)
+
+    if retrieval == "cached":
+        logger.info("Memory retrieval: cached (shared in-process index)")
+        return MemoryStore(
+            db,
+            index_cache=MemoryIndexCache.for_database(db),
+            **dedup,
+        )
+
+    if retrieval != "semantic":
+        raise ValueError(f"Unknown memory retrieval mode: {retrieval}")
+
+    # numpy is only needed for semantic retrieval
+    from app.llm.embeddings import HashingEmbedder, OllamaEmbedder
+    from app.memory.vector_index import VectorIndex
+
+    embedder_name = memory_cfg.get("embedder", "ollama")
+
+    if embedder_name == "hashing":
+        embedder = HashingEmbedder(dim=memory_cfg.get("dim", 256))
+    elif embedder_name == "ollama":
+        embedder = OllamaEmbedder(
+            model=memory_cfg.get("embedding_model", "nomic-embed-text"),
+            host=config.llm["host"],
+        )
+    else:
+        raise ValueError(f"Unknown embedder: {embedder_name}")
+
+    try:
+        dim = embedder.embed(["dimension probe"]).shape[1]
+    except Exception:
+        logger.exception("Embedder unavailable, falling back to lexical memory retrieval")
+        return MemoryStore(db, **dedup)
+
+    index = VectorIndex.open(
+        memory_cfg.get("index_path", "data/memory_vectors"),
+        dim=dim,
+        quantize=memory_cfg.get("quantize", False),
+    )
+
+    logger.info(
+        "Memory retrieval: semantic (embedder=%s, dim=%d, quantize=%s)",
+        embedder_name,
+        dim,
+        index.quantize,
+    )
+
+    return MemoryStore(
+        db,
+        embedder=embedder,
+        vector_index=index,
+        lexical_weight=memory_cfg.get("lexical_weight", 0.0),
+        min_similarity=memory_cfg.get("min_similarity", 0.0),
+        **dedup,
+    )
+
+
+def _build_perception(config) -> PerceptionBus:
+    perception_cfg = config.raw.get("perception") or {}
+
+    bus = PerceptionBus(history=perception_cfg.get("history", 32))
+    for key, policy in (perception_cfg.get("keys") or {}).items():
+        bus.configure(
+            key,
+            ttl_s=policy.get("ttl_s"),
+            rate=policy.get("rate"),
+            burst=policy.get("burst", 1),
+        )
+    return bus
@@ -6,3 +6,6 @@ from app.core.actions import Action
 @dataclass
 class Plan:
     actions: List[Action]
+    # Default plan a planner fell back to because it couldn't decide
+    # (e.g. unparseable LLM output); never cached
+    fallback: bool = False
@@ -0,0 +1,79 @@
+import hashlib
+import re
+from abc import ABC, abstractmethod
+from typing import List
+
+import numpy as np
+import requests
+
+
+class Embedder(ABC):
+    dim: int
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed a batch of texts.
+        Returns a float32 array of shape (len(texts), dim).
+        """
+        raise NotImplementedError
+
+
+class OllamaEmbedder(Embedder):
+    """
+    Embeddings from the Ollama /api/embed endpoint.
+    The dimension is discovered from the first response.
+    """
+
+    def __init__(self, model: str, host: str, timeout: float = 10.0):
+        self.model = model
+        self.url = f"{host}/api/embed"
+        self.timeout = timeout
+        self.dim = 0
+
+    def embed(self, texts):
+        r = requests.post(
+            self.url,
+            json={"model": self.model, "input": list(texts)},
+            timeout=self.timeout,
+        )
+        r.raise_for_status()
+
+        vectors = np.asarray(r.json()["embeddings"], dtype=np.float32)
+        self.dim = vectors.shape[1]
+        return vectors
+
+
+class HashingEmbedder(Embedder):
+    """
+    Deterministic local stand-in for a real embedding model.
+    Hashes word and character-trigram features into a fixed-size vector.
+    Not semantic, but stable across runs and processes (tests, offline use).
+    """
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def embed(self, texts):
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                h = int.from_bytes(digest, "little")
+                sign = 1.0 if h & 1 else -1.0
+                out[row, (h >> 1) % self.dim] += sign
+
+        return out
+
+    def _features(self, text: str) -> List[str]:
+        words = re.findall(r"\w+", text.lower())
+        features = [f"w:{w}" for w in words]
+
+        for w in words:
+            padded = f"#{w}#"
+            features.extend(
+                f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)
+            )
+
+        return features
@@ -0,0 +1,143 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+from .base import LLMClient
+
+logger = logging.getLogger("llm_priority")
+
+
+class LLMPriorityGate:
+    """
+    Two-level priority for calls to one LLM backend.
+
+    Foreground calls (user-facing turns, planner, search summaries) run
+    immediately and are counted. Background calls (conversation summaries)
+    wait until no foreground call has been active for `idle_s`, and at most
+    `background_slots` run at once. A background call that already started
+    is not interrupted. After `max_wait_s` a background call runs anyway so
+    it can't starve.
+    """
+
+    _registry: Dict[str, "LLMPriorityGate"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(
+        self,
+        idle_s: float = 0.5,
+        max_wait_s: float | None = 30.0,
+        background_slots: int = 1,
+    ):
+        self.idle_s = idle_s
+        self.max_wait_s = max_wait_s
+
+        self._cond = threading.Condition()
+        self._foreground = 0
+        self._last_foreground = 0.0
+        self._background = threading.Semaphore(background_slots)
+
+        # Metrics
+        self.foreground_calls = 0
+        self.background_calls = 0
+        self.background_wait_s = 0.0
+        self.background_forced = 0
+
+    @classmethod
+    def for_backend(cls, key: str, **kwargs) -> "LLMPriorityGate":
+        """
+        One gate per backend (host) for the whole process.
+        """
+        with cls._registry_lock:
+            gate = cls._registry.get(key)
+            if gate is None:
+                gate = cls(**kwargs)
+                cls._registry[key] = gate
+            return gate
+
+    @property
+    def foreground_active(self) -> int:
+        return self._foreground
+
+    @contextmanager
+    def foreground(self) -> Iterator[None]:
+        with self._cond:
+            self._foreground += 1
+            self.foreground_calls += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._foreground -= 1
+                self._last_foreground = time.monotonic()
+                self._cond.notify_all()
+
+    @contextmanager
+    def background(self) -> Iterator[None]:
+        start = time.monotonic()
+
+        with self._background:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    waited = now - start
+
+                    if self.max_wait_s is not None and waited >= self.max_wait_s:
+                        self.background_forced += 1
+                        logger.debug("Background LLM call forced after %.1f s", waited)
+                        break
+
+                    if not self._foreground:
+                        idle_left = self._last_foreground + self.idle_s - now
+                        if idle_left <= 0:
+                            break
+                        timeout = idle_left
+                    else:
+                        timeout = None
+
+                    if self.max_wait_s is not None:
+                        remaining = self.max_wait_s - waited
+                        timeout = remaining if timeout is None else min(timeout, remaining)
+
+                    self._cond.wait(timeout)
+
+                self.background_calls += 1
+                self.background_wait_s += time.monotonic() - start
+
+            yield
+
+    def stats(self) -> dict:
+        return {
+            "foreground_active": self._foreground,
+            "foreground_calls": self.foreground_calls,
+            "background_calls": self.background_calls,
+            "background_wait_ms_avg": (
+                self.background_wait_s / self.background_calls * 1000
+                if self.background_calls else 0.0
+            ),
+            "background_forced": self.background_forced,
+        }
+
+
+class PrioritizedLLM(LLMClient):
+    """
+    LLMClient wrapper that runs every call through a priority gate.
+    """
+
+    def __init__(self, llm: LLMClient, gate: LLMPriorityGate, background: bool = False):
+        self.llm = llm
+        self.gate = gate
+        self.background = background
+
+    def _slot(self):
+        return self.gate.background() if self.background else self.gate.foreground()
+
+    def chat(self, messages: List[Dict]) -> str:
+        with self._slot():
+            return self.llm.chat(messages)
+
+    def stream_chat(self, messages: List[Dict]) -> Iterator[str]:
+        # Counted from the request until the stream is exhausted or closed
+        with self._slot():
+            yield from self.llm.stream_chat(messages)
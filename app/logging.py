@@ -1,15 +1,189 @@
+import atexit
+import contextvars
+import copy
+import json
 import logging
 import logging.config
+import logging.handlers
+import queue
+import random
 import sys
+import threading
+import time
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Dict, Optional
 
 
 _LOGGING_CONFIGURED = False
+_LISTENER: Optional[logging.handlers.QueueListener] = None
 
+# Session / turn of the current task; set by the server per turn and
+# carried into executor threads by run_blocking's context copy
+_log_context: contextvars.ContextVar[Dict[str, object]] = contextvars.ContextVar("log_context", default={})
+
+
+def bind_log_context(**fields) -> contextvars.Token:
+    """
+    Add fields (e.g. session_id, turn) to every record logged from the
+    current context. Returns a token for unbind_log_context().
+    """
+    return _log_context.set({**_log_context.get(), **fields})
+
+
+def unbind_log_context(token: contextvars.Token) -> None:
+    _log_context.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """
+    Copies the bound log context onto the record. Runs on the thread
+    that logs, before the record is queued.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        fields = _log_context.get()
+        record.session_id = fields.get("session_id")
+        record.turn = fields.get("turn")
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Per-logger limits for chatty lines at or below `max_level`.
+
+    `limits` maps a logger name (or dotted prefix; the longest match
+    wins) to either {"rate": lines/s, "burst": n}, a token bucket, or
+    {"sample": share}, keeping that random share of lines. Records above
+    `max_level` (warnings, errors) always pass.
+    """
+
+    def __init__(self, limits: Dict[str, dict], max_level: int = logging.DEBUG):
+        super().__init__()
+        self.limits = limits
+        self.max_level = max_level
+        self._buckets: Dict[str, list] = {}
+        self._rules: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.suppressed: Dict[str, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level:
+            return True
+
+        rule = self._rule(record.name)
+        if rule is None:
+            return True
+
+        limit = self.limits[rule]
+        if "sample" in limit:
+            keep = random.random() < limit["sample"]
+        else:
+            keep = self._take_token(rule, limit)
+
+        if not keep:
+            self.suppressed[rule] = self.suppressed.get(rule, 0) + 1
+        return keep
+
+    def _rule(self, name: str) -> Optional[str]:
+        try:
+            return self._rules[name]
+        except KeyError:
+            pass
+
+        match = None
+        for prefix in self.limits:
+            if name == prefix or name.startswith(prefix + "."):
+                if match is None or len(prefix) > len(match):
+                    match = prefix
+        self._rules[name] = match
+        return match
+
+    def _take_token(self, rule: str, limit: dict) -> bool:
+        rate = limit.get("rate", 1.0)
+        burst = limit.get("burst", max(rate, 1.0))
+        now = time.monotonic()
+
+        with self._lock:
+            bucket = self._buckets.get(rule)
+            if bucket is None:
+                bucket = self._buckets[rule] = [float(burst), now]
+
+            bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if bucket[0] < 1.0:
+                return False
+            bucket[0] -= 1.0
+            return True
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line: time, level, logger, message, thread,
+    session_id / turn when bound, and the traceback if any.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "thread": record.threadName,
+        }
+
+        session_id = getattr(record, "session_id", None)
+        if session_id is not None:
+            entry["session_id"] = session_id
+        turn = getattr(record, "turn", None)
+        if turn is not None:
+            entry["turn"] = turn
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Resolves the message on the caller's thread (args may change later)
+    but leaves all formatting to the listener's handlers, so the JSON
+    formatter still sees fields and the traceback separately.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(
+    level=logging.INFO,
+    log_dir: str = "logs",
+    fmt: str = "text",
+    use_queue: bool = True,
+    limits: Optional[Dict[str, dict]] = None,
+    limit_level=logging.DEBUG,
+):
+    """
+    Console + rotating file logging on the root logger.
+
+    With `use_queue`, loggers only enqueue records and a QueueListener
+    thread does the formatting and I/O. `fmt="json"` writes JSON lines
+    with session_id / turn (see bind_log_context). `limits` rate-limits
+    or samples chatty loggers (see RateLimitFilter).
+    """
+    global _LOGGING_CONFIGURED, _LISTENER
 
-def setup_logging(level=logging.INFO, log_dir: str = "logs"):
-    global _LOGGING_CONFIGURED
-    
     if _LOGGING_CONFIGURED:
         logging.getLogger(__name__).debug("Logging already configured, skipping")
         return
@@ -17,7 +191,7 @@ def setup_logging(level=logging.INFO, log_dir: str = "logs"):
     log_path = Path(log_dir)
     log_path.mkdir(parents=True, exist_ok=True)
 
-    log_file = log_path / "assistant.log"
+    log_file = log_path / ("assistant.jsonl" if fmt == "json" else "assistant.log")
 
     logging_config = {
         "version": 1,
@@ -27,12 +201,15 @@ def setup_logging(level=logging.INFO, log_dir: str = "logs"):
                 "format": "%(asctime)s | %(levelname)-7s | %(name)s | %(message)s",
                 "datefmt": "%H:%M:%S",
             },
+            "json": {
+                "()": JsonFormatter,
+            },
         },
         "handlers": {
             "console": {
                 "class": "logging.StreamHandler",
                 "stream": sys.stdout,
-                "formatter": "default",
+                "formatter": "json" if fmt == "json" else "default",
             },
             "file": {
                 "class": "logging.handlers.RotatingFileHandler",
@@ -40,7 +217,7 @@ def setup_logging(level=logging.INFO, log_dir: str = "logs"):
                 "maxBytes": 10_000_000,  # 10 MB
                 "backupCount": 5,
                 "encoding": "utf-8",
-                "formatter": "default",
+                "formatter": "json" if fmt == "json" else "default",
             },
         },
         "root": {
@@ -52,8 +229,75 @@ def setup_logging(level=logging.INFO, log_dir: str = "logs"):
     logging.config.dictConfig(logging_config)
 
     root = logging.getLogger()
+    handlers = list(root.handlers)
+
+    if use_queue:
+        # Same handlers, driven by the listener thread instead
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        for handler in handlers:
+            root.removeHandler(handler)
+        entry = _QueueHandler(records)
+        root.addHandler(entry)
+        _LISTENER = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+        _LISTENER.start()
+        atexit.register(shutdown_logging)
+        handlers = [entry]
+
+    # Context and limits run where the record is created
+    for handler in handlers:
+        handler.addFilter(ContextFilter())
+        if limits:
+            handler.addFilter(RateLimitFilter(limits, _level(limit_level)))
+
     root.info("Logging initialized")
     root.info("Log level set to %s", logging.getLevelName(level))
-    root.info("Log file: %s", log_file.resolve())
+    root.info("Log file: %s (format=%s, queued=%s)", log_file.resolve(), fmt, use_queue)
 
     _LOGGING_CONFIGURED = True
+
+
+def setup_logging_from_config(cfg: Optional[dict]) -> None:
+    """
+    setup_logging() from the `logging` config section.
+    """
+    cfg = cfg or {}
+    setup_logging(
+        level=_level(cfg.get("level", "INFO")),
+        log_dir=cfg.get("dir", "logs"),
+        fmt=cfg.get("format", "text"),
+        use_queue=cfg.get("queue", True),
+        limits=cfg.get("limits"),
+        limit_level=cfg.get("limit_level", "DEBUG"),
+    )
+
+
+def shutdown_logging() -> None:
+    """
+    Drain the queue and stop the listener; logging can be set up again.
+    """
+    global _LOGGING_CONFIGURED, _LISTENER
+
+    handlers = []
+    if _LISTENER is not None:
+        _LISTENER.stop()
+        handlers.extend(_LISTENER.handlers)
+        _LISTENER = None
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handlers.append(handler)
+
+    for handler in handlers:
+        handler.close()
+
+    _LOGGING_CONFIGURED = False
+
+
+def _level(value) -> int:
+    if isinstance(value, int):
+        return value
+    level = logging.getLevelName(str(value).upper())
+    if not isinstance(level, int):
+        raise ValueError(f"Unknown log level: {value}")
+    return level
@@ -1,24 +1,142 @@
+from collections import defaultdict, deque
+
+from app.memory.session_cache import SessionCache, SessionState
 from app.storage.database import Database
 
 
 class ChatHistoryStore:
-    def __init__(self, db: Database):
+    def __init__(self, db: Database, cache: SessionCache | None = None):
         self.db = db
+        self.cache = cache
+
+        # Messages queued for the writer but not yet committed, per session
+        self._pending: dict[str, deque] = defaultdict(deque)
 
     def add(self, session_id: str, role: str, content: str):
-        cursor = self.db.conn.cursor()
-        cursor.execute(
-            """
-            INSERT INTO chat_history (session_id, role, content)
-            VALUES (?, ?, ?)
-            """,
-            (session_id, role, content)
-        )
-        self.db.conn.commit()
+        message = {"role": role, "content": content}
+
+        with self.db.consistent_read():
+            self._pending[session_id].append(message)
+
+            if self.cache is not None:
+                with self.cache.lock:
+                    state = self.cache.get(session_id)
+                    if state is not None and state.history_loaded:
+                        state.messages.append(message)
+                        state.count += 1
+
+        def insert(conn):
+            conn.execute(
+                """
+                INSERT INTO chat_history (session_id, role, content)
+                VALUES (?, ?, ?)
+                """,
+                (session_id, role, content)
+            )
+
+        def done():
+            pending = self._pending[session_id]
+            pending.popleft()
+            if not pending:
+                del self._pending[session_id]
+
+        self.db.submit_write(insert, on_done=done)
 
     def get_recent(self, session_id: str, limit: int = 10):
-        cursor = self.db.conn.cursor()
-        cursor.execute(
+        if self.cache is not None and limit <= self.cache.capacity:
+            state = self._cached(session_id)
+            with self.cache.lock:
+                return list(state.messages)[-limit:]
+
+        with self.db.read() as conn:
+            rows = self._load_recent(conn, session_id, limit)
+            pending = list(self._pending.get(session_id, ()))
+
+        if pending:
+            rows = (rows + pending)[-limit:]
+
+        return rows
+
+    def get_range(self, session_id: str, start: int, end: int):
+        """
+        Messages `start` (inclusive) to `end` (exclusive) of the session,
+        by position. Unaffected by messages added after `end`.
+        """
+        if self.cache is not None:
+            state = self._cached(session_id)
+            with self.cache.lock:
+                first = state.count - len(state.messages)
+                if start >= first:
+                    return list(state.messages)[start - first:end - first]
+
+        with self.db.read() as conn:
+            committed = self._load_count(conn, session_id)
+            rows = conn.execute(
+                """
+                SELECT role, content
+                FROM chat_history
+                WHERE session_id = ?
+                ORDER BY id
+                LIMIT ? OFFSET ?
+                """,
+                (session_id, max(min(end, committed) - start, 0), start)
+            ).fetchall()
+            pending = list(self._pending.get(session_id, ()))
+
+        return rows + pending[max(start - committed, 0):max(end - committed, 0)]
+
+    def count(self, session_id: str) -> int:
+        """
+        Total number of messages in the session.
+        """
+        if self.cache is not None:
+            return self._cached(session_id).count
+
+        with self.db.read() as conn:
+            return self._load_count(conn, session_id) + len(self._pending.get(session_id, ()))
+
+    # --------------------------------------------------
+    # Hot cache
+    # --------------------------------------------------
+
+    def _cached(self, session_id: str) -> SessionState:
+        """
+        The session's cached state, seeded from the database on first use
+        (new or resumed session, or evicted since).
+        """
+        with self.cache.lock:
+            state = self.cache.session(session_id)
+            if state.history_loaded:
+                self.cache.record(hit=True)
+                return state
+
+        self.cache.record(hit=False)
+
+        # Reads the DB and the pending overlay at one instant; the cache
+        # lock keeps concurrent adds from slipping in between
+        with self.db.read() as conn, self.cache.lock:
+            state = self.cache.session(session_id)
+            if not state.history_loaded:
+                pending = list(self._pending.get(session_id, ()))
+                rows = self._load_recent(conn, session_id, self.cache.capacity)
+
+                state.messages.clear()
+                state.messages.extend(
+                    {"role": row["role"], "content": row["content"]}
+                    for row in rows
+                )
+                state.messages.extend(pending)
+                state.count = self._load_count(conn, session_id) + len(pending)
+                state.history_loaded = True
+
+            return state
+
+    # --------------------------------------------------
+    # Database
+    # --------------------------------------------------
+
+    def _load_recent(self, conn, session_id: str, limit: int) -> list:
+        cursor = conn.execute(
             """
             SELECT role, content
             FROM chat_history
@@ -28,5 +146,27 @@ class ChatHistoryStore:
             """,
             (session_id, limit)
         )
-        rows = cursor.fetchall()
-        return list(reversed(rows))
+        return list(reversed(cursor.fetchall()))
+
+    def _load_count(self, conn, session_id: str) -> int:
+        (count,) = conn.execute(
+            "SELECT COUNT(*) FROM chat_history WHERE session_id = ?",
+            (session_id,),
+        ).fetchone()
+        return count
+
+    # --------------------------------------------------
+    # Async
+    # --------------------------------------------------
+
+    async def add_async(self, session_id: str, role: str, content: str):
+        await self.db.run(self.add, session_id, role, content)
+
+    async def get_recent_async(self, session_id: str, limit: int = 10):
+        return await self.db.run(self.get_recent, session_id, limit)
+
+    async def get_range_async(self, session_id: str, start: int, end: int):
+        return await self.db.run(self.get_range, session_id, start, end)
+
+    async def count_async(self, session_id: str) -> int:
+        return await self.db.run(self.count, session_id)
@@ -0,0 +1,172 @@
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_NORMALIZE_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+
+# Mersenne prime for universal hashing of 64-bit shingle hashes
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def normalize(text: str) -> str:
+    text = _NORMALIZE_RE.sub(" ", text.lower())
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def shingles(text: str, k: int = 4) -> frozenset[str]:
+    """
+    Character k-shingles of the normalized text.
+    Robust to small rewordings, punctuation and casing.
+    """
+    text = normalize(text)
+    if len(text) <= k:
+        return frozenset((text,)) if text else frozenset()
+    return frozenset(text[i:i + k] for i in range(len(text) - k + 1))
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """
+    MinHash signatures with LSH banding, for finding near-duplicate
+    pairs in a whole table without comparing every pair.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        # Deterministic permutation parameters
+        params = []
+        for i in range(num_perm):
+            digest = hashlib.blake2b(f"{seed}:{i}".encode(), digest_size=16).digest()
+            a = int.from_bytes(digest[:8], "little") % (_PRIME - 1) + 1
+            b = int.from_bytes(digest[8:], "little") % _PRIME
+            params.append((a, b))
+        self._params = params
+
+    def signature(self, shingle_set: Iterable[str]) -> Tuple[int, ...]:
+        hashes = [
+            int.from_bytes(
+                hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(),
+                "little",
+            )
+            for s in shingle_set
+        ]
+        if not hashes:
+            return (_MAX_HASH,) * self.num_perm
+
+        return tuple(
+            min(((a * h + b) % _PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self._params
+        )
+
+    def band_keys(self, signature: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+        return [
+            (band, signature[band * self.rows:(band + 1) * self.rows])
+            for band in range(self.bands)
+        ]
+
+
+@dataclass
+class DuplicateGroup:
+    keep_id: int
+    remove_ids: List[int]
+    importance: int
+
+    # Newest text in the group, written to the kept row
+    content: str
+
+
+@dataclass
+class ConsolidationReport:
+    rows_before: int = 0
+    rows_removed: int = 0
+    groups: List[DuplicateGroup] = field(default_factory=list)
+
+    @property
+    def rows_after(self) -> int:
+        return self.rows_before - self.rows_removed
+
+
+def find_duplicate_groups(
+    rows: List[Tuple[int, str, int]],
+    threshold: float,
+    max_importance: int,
+    hasher: Optional[MinHasher] = None,
+) -> List[DuplicateGroup]:
+    """
+    Group near-duplicate (id, content, importance) rows.
+
+    LSH proposes candidate pairs, exact shingle Jaccard confirms them.
+    Each group keeps its most important (then oldest) row, whose importance
+    is bumped once per merged duplicate and whose text is replaced by the
+    newest member's (a reworded fact is usually a correction).
+    """
+    hasher = hasher or MinHasher()
+
+    shingle_sets = {memory_id: shingles(content) for memory_id, content, _ in rows}
+    importance = {memory_id: imp or 1 for memory_id, _, imp in rows}
+    contents = {memory_id: content for memory_id, content, _ in rows}
+
+    buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+    for memory_id, _, _ in rows:
+        signature = hasher.signature(shingle_sets[memory_id])
+        for key in hasher.band_keys(signature):
+            buckets.setdefault(key, []).append(memory_id)
+
+    parent = {memory_id: memory_id for memory_id, _, _ in rows}
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    checked = set()
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                pair = (a, b) if a < b else (b, a)
+                if pair in checked:
+                    continue
+                checked.add(pair)
+                if jaccard(shingle_sets[a], shingle_sets[b]) >= threshold:
+                    parent[find(a)] = find(b)
+
+    clusters: Dict[int, List[int]] = {}
+    for memory_id in parent:
+        clusters.setdefault(find(memory_id), []).append(memory_id)
+
+    groups = []
+    for members in clusters.values():
+        if len(members) < 2:
+            continue
+
+        keep = min(members, key=lambda m: (-importance[m], m))
+        groups.append(
+            DuplicateGroup(
+                keep_id=keep,
+                remove_ids=sorted(m for m in members if m != keep),
+                importance=min(
+                    importance[keep] + len(members) - 1,
+                    max_importance,
+                ),
+                content=contents[max(members)],
+            )
+        )
+
+    return groups
@@ -0,0 +1,312 @@
+import logging
+import re
+import threading
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger("memory_index")
+
+_TOKEN_RE = re.compile(r"\b\w+\b")
+
+
+def tokenize(text: str) -> frozenset[str]:
+    return frozenset(_TOKEN_RE.findall(text.lower()))
+
+
+def read_changes(conn) -> Tuple[int, int]:
+    """
+    (inserted, modified) counters of the memory table, maintained by
+    triggers (see migrations._memory_changes).
+    """
+    return tuple(conn.execute("SELECT inserted, modified FROM memory_changes").fetchone())
+
+
+class IndexChange:
+    """
+    Index updates made by one write command.
+
+    The command calls begin() / end() around its SQL inside the write
+    transaction; the store hands the change to MemoryIndexCache.apply()
+    from its on_done callback, i.e. only once the COMMIT is visible.
+    `vectors` carries the matching VectorIndex updates, applied from
+    on_commit.
+    """
+
+    def __init__(self):
+        self.before: Optional[Tuple[int, int]] = None
+        self.after: Optional[Tuple[int, int]] = None
+        self.upserts: List[Tuple[int, str, int]] = []
+        self.removed: List[int] = []
+        # (memory_id, vector or None for an importance-only update, importance)
+        self.vectors: List[Tuple[int, object, int]] = []
+
+    def begin(self, conn) -> None:
+        self.before = read_changes(conn)
+
+    def end(self, conn) -> None:
+        self.after = read_changes(conn)
+
+    def upsert(self, memory_id: int, content: str, importance: int) -> None:
+        self.upserts.append((memory_id, content, importance))
+
+    def remove(self, memory_ids: List[int]) -> None:
+        self.removed.extend(memory_ids)
+
+
+class MemoryIndexCache:
+    """
+    Process-wide inverted index over the memory table.
+
+    Built once per database file and shared by every MemoryStore
+    (i.e. every session). Rows live in slots:
+    - ids / importance / alive flags: compact typed arrays
+    - contents: cached per slot, tokenized once on insert
+    - postings: term -> slots containing it (array of slot numbers)
+
+    Writes through MemoryStore / MemoryRetention are applied
+    incrementally after they commit (see IndexChange). Anything else is
+    detected on search from the trigger-maintained memory_changes
+    counters: new rows only are picked up with a delta load, updates or
+    deletes behind our back trigger a full rebuild.
+    """
+
+    _registry: Dict[str, "MemoryIndexCache"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._built = False
+        self._reset()
+
+    @classmethod
+    def for_database(cls, db) -> "MemoryIndexCache":
+        if db.path == ":memory:":
+            key = f":memory:{id(db)}"
+        else:
+            key = str(Path(db.path).resolve())
+
+        with cls._registry_lock:
+            cache = cls._registry.get(key)
+            if cache is None:
+                cache = cls()
+                cls._registry[key] = cache
+            return cache
+
+    # --------------------------------------------------
+    # Write
+    # --------------------------------------------------
+
+    def apply(self, change: IndexChange) -> None:
+        """
+        Apply a committed write. Skipped when the command failed, or when
+        another change landed since the index last caught up (the next
+        search reconciles from the counters instead).
+        """
+        with self._lock:
+            if not self._built or change.before is None or change.after is None:
+                return
+            if change.before != self._changes:
+                return
+
+            for memory_id in change.removed:
+                self._remove(memory_id)
+            for memory_id, content, importance in change.upserts:
+                self._upsert(memory_id, content, importance)
+
+            self._changes = change.after
+
+    def invalidate(self) -> None:
+        """
+        Drop the index, it is rebuilt on the next search.
+        """
+        with self._lock:
+            self._built = False
+            self._reset()
+
+    # --------------------------------------------------
+    # Read
+    # --------------------------------------------------
+
+    def search(
+        self,
+        conn,
+        query: str,
+        limit: int,
+        importance_weight: float,
+    ) -> List[Tuple[int, str]]:
+        """
+        Return up to `limit` (memory_id, content) pairs ranked by
+        term overlap + importance. Only slots sharing a query term are
+        scored, plus the top high-importance rows (importance >= 2),
+        which qualify without any overlap.
+
+        Without `conn` the index is searched as is, without catching up
+        (and returns nothing before the first build).
+        """
+        query_terms = tokenize(query)
+
+        with self._lock:
+            if conn is not None:
+                self._ensure_fresh(conn)
+
+            overlap: Counter = Counter()
+            for term in query_terms:
+                slots = self._postings.get(term)
+                if slots:
+                    overlap.update(slots)
+
+            if self._removed:
+                alive = self._alive
+                overlap = Counter({s: c for s, c in overlap.items() if alive[s]})
+
+            for slot in self._top_important(limit):
+                overlap.setdefault(slot, 0)
+
+            scored = [
+                (count + self._importance[slot] * importance_weight, slot)
+                for slot, count in overlap.items()
+            ]
+            scored.sort(reverse=True)
+
+            return [
+                (self._ids[slot], self._contents[slot])
+                for _, slot in scored[:limit]
+            ]
+
+    # --------------------------------------------------
+    # Freshness
+    # --------------------------------------------------
+
+    def _ensure_fresh(self, conn) -> None:
+        changes = read_changes(conn)
+
+        if not self._built:
+            self._rebuild(conn, changes)
+        elif changes != self._changes:
+            self._sync(conn, changes)
+
+    def _sync(self, conn, changes: Tuple[int, int]) -> None:
+        inserted, modified = changes
+
+        if modified != self._changes[1] or inserted < self._changes[0]:
+            logger.info("Memory table changed externally, rebuilding index cache")
+            self._rebuild(conn, changes)
+            return
+
+        rows = conn.execute(
+            "SELECT id, content, importance FROM memory WHERE id > ? ORDER BY id",
+            (self._max_id,),
+        ).fetchall()
+
+        for memory_id, content, importance in rows:
+            self._insert(memory_id, content, importance)
+
+        self._changes = changes
+        logger.debug("Memory index cache picked up %d external rows", len(rows))
+
+    def _rebuild(self, conn, changes: Tuple[int, int]) -> None:
+        self._reset()
+
+        for memory_id, content, importance in conn.execute(
+            "SELECT id, content, importance FROM memory ORDER BY id"
+        ):
+            self._insert(memory_id, content, importance)
+
+        self._changes = changes
+        self._built = True
+        logger.info("Memory index cache built (%d memories)", len(self._ids))
+
+    # --------------------------------------------------
+    # Internals (caller holds the lock)
+    # --------------------------------------------------
+
+    def _reset(self) -> None:
+        self._ids = array("q")
+        self._importance = array("i")
+        self._contents: List[str] = []
+        self._postings: Dict[str, array] = {}
+        self._slot_by_id: Dict[int, int] = {}
+        self._alive = bytearray()
+        self._removed = 0
+        self._importance_buckets: Dict[int, List[int]] = {}
+        self._max_id = 0
+
+        # memory_changes counters the index reflects
+        self._changes: Tuple[int, int] = (0, 0)
+
+    def _insert(self, memory_id: int, content: str, importance: int) -> None:
+        if memory_id in self._slot_by_id:
+            return
+
+        importance = importance if importance is not None else 1
+        slot = len(self._ids)
+        tokens = tokenize(content)
+
+        self._ids.append(memory_id)
+        self._alive.append(1)
+        self._importance.append(importance)
+        self._contents.append(content)
+        self._slot_by_id[memory_id] = slot
+        self._max_id = max(self._max_id, memory_id)
+
+        for term in tokens:
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = array("I")
+            postings.append(slot)
+
+        if importance >= 2:
+            self._importance_buckets.setdefault(importance, []).append(slot)
+
+    def _upsert(self, memory_id: int, content: str, importance: int) -> None:
+        slot = self._slot_by_id.get(memory_id)
+
+        if slot is None:
+            self._insert(memory_id, content, importance)
+        elif self._contents[slot] == content:
+            self._set_importance(slot, importance)
+        else:
+            # New text means new postings: tombstone and re-insert
+            self._remove(memory_id)
+            self._insert(memory_id, content, importance)
+
+    def _set_importance(self, slot: int, importance: int) -> None:
+        old = self._importance[slot]
+        if old >= 2:
+            self._importance_buckets[old].remove(slot)
+        if importance >= 2:
+            bucket = self._importance_buckets.setdefault(importance, [])
+            bucket.append(slot)
+            bucket.sort()
+
+        self._importance[slot] = importance
+
+    def _remove(self, memory_id: int) -> None:
+        """
+        Slots are tombstoned, not compacted.
+        """
+        slot = self._slot_by_id.pop(memory_id, None)
+        if slot is None:
+            return
+
+        importance = self._importance[slot]
+        if importance >= 2:
+            self._importance_buckets[importance].remove(slot)
+
+        self._alive[slot] = 0
+        self._contents[slot] = ""
+        self._removed += 1
+
+    def _top_important(self, limit: int) -> List[int]:
+        """
+        Newest slots from the highest importance buckets, O(limit).
+        """
+        out: List[int] = []
+        for importance in sorted(self._importance_buckets, reverse=True):
+            bucket = self._importance_buckets[importance]
+            out.extend(bucket[-(limit - len(out)):][::-1])
+            if len(out) >= limit:
+                break
+        return out
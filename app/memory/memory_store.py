@@ -1,10 +1,69 @@
 from app.storage.database import Database
+from app.memory.dedup import (
+    ConsolidationReport,
+    find_duplicate_groups,
+    jaccard,
+    shingles,
+)
+from app.memory.memory_index import IndexChange
+from concurrent.futures import Future
+import logging
 import re
 
+logger = logging.getLogger("memory_store")
+
 
 class MemoryStore:
-    def __init__(self, db: Database):
+    # Weight of importance relative to lexical relevance
+    IMPORTANCE_WEIGHT = 0.3
+
+    # FTS candidates fetched per requested result, re-ranked with importance
+    CANDIDATE_FACTOR = 4
+
+    # Importance is bumped on every merged duplicate, up to this cap
+    MAX_IMPORTANCE = 5
+
+    # Existing memories compared against a new one for write-time dedup
+    DEDUP_CANDIDATES = 8
+
+    def __init__(
+        self,
+        db: Database,
+        embedder=None,
+        vector_index=None,
+        lexical_weight: float = 0.0,
+        min_similarity: float = 0.0,
+        index_cache=None,
+        dedup_threshold: float | None = None,
+        dedup_similarity: float | None = None,
+        retention=None,
+    ):
+        """
+        Lexical retrieval (FTS5) by default.
+        Passing a MemoryIndexCache serves lexical retrieval from memory.
+        Passing an embedder and a VectorIndex switches to semantic retrieval.
+
+        dedup_threshold (shingle Jaccard) and dedup_similarity (embedding
+        cosine) enable merging near-duplicate writes into existing rows.
+
+        A MemoryRetention records retrieval hits and keeps the table
+        within capacity.
+        """
         self.db = db
+        self.index_cache = index_cache
+        self.embedder = embedder
+        self.vector_index = vector_index
+        self.lexical_weight = lexical_weight
+        self.min_similarity = min_similarity
+        self.dedup_threshold = dedup_threshold
+        self.dedup_similarity = dedup_similarity
+        self.retention = retention
+
+        # Memories queued for the writer but not yet committed
+        self._pending: list[tuple[str, int]] = []
+
+        if self.vector_index is not None:
+            self._sync_vector_index()
 
     # --------------------------------------------------
     # Write
@@ -15,33 +74,242 @@ class MemoryStore:
         content: str,
         category: str = "general",
         importance: int = 1,
+    ) -> Future:
+        """
+        Store a memory. The returned future resolves to its id.
+        Near-duplicates of an existing memory are merged into it instead:
+        the row takes the new text (it is the newer fact) and a bumped
+        importance.
+        """
+        vector = self._embed(content) if self.vector_index is not None else None
+        entry = (content, importance)
+        change = IndexChange()
+
+        with self.db.consistent_read():
+            self._pending.append(entry)
+
+        def done():
+            self._pending.remove(entry)
+            if self.index_cache is not None:
+                self.index_cache.apply(change)
+
+        return self.db.submit_write(
+            lambda conn: self._write(conn, content, category, importance, vector, change),
+            on_done=done,
+            on_commit=lambda: self._apply_vectors(change),
+        )
+
+    def _write(
+        self,
+        conn,
+        content: str,
+        category: str,
+        importance: int,
+        vector,
+        change: IndexChange,
+    ) -> int:
+        if self.index_cache is not None:
+            change.begin(conn)
+
+        duplicate_id = self._find_duplicate(conn, content, vector)
+        if duplicate_id is not None:
+            memory_id = duplicate_id
+            self._merge_into(conn, memory_id, content, importance, vector, change)
+        else:
+            cursor = conn.execute(
+                """
+                INSERT INTO memory (category, content, importance)
+                VALUES (?, ?, ?)
+                """,
+                (category, content, importance),
+            )
+            memory_id = cursor.lastrowid
+            change.upsert(memory_id, content, importance)
+
+            if vector is not None:
+                change.vectors.append((memory_id, vector, importance))
+
+        if self.index_cache is not None:
+            change.end(conn)
+
+        return memory_id
+
+    def _apply_vectors(self, change: IndexChange) -> None:
+        """
+        Vector index updates of a committed write (from on_commit), so the
+        index never holds rows that were rolled back or aren't visible yet.
+        """
+        for memory_id, vector, importance in change.vectors:
+            if vector is None:
+                self.vector_index.set_importance(memory_id, importance)
+            else:
+                self.vector_index.replace(memory_id, vector, importance)
+
+    # --------------------------------------------------
+    # Deduplication
+    # --------------------------------------------------
+
+    def consolidate(self, threshold: float | None = None) -> ConsolidationReport:
+        """
+        Merge near-duplicate rows already in the table.
+        Each group keeps one row with bumped importance and the group's
+        newest text; the rest are deleted.
+        """
+        threshold = threshold or self.dedup_threshold or 0.8
+
+        with self.db.read() as conn:
+            cursor = conn.execute("SELECT id, content, importance FROM memory ORDER BY id")
+            rows = [(r["id"], r["content"], r["importance"]) for r in cursor.fetchall()]
+
+        groups = find_duplicate_groups(rows, threshold, self.MAX_IMPORTANCE)
+        removed = [memory_id for g in groups for memory_id in g.remove_ids]
+
+        def compact(conn):
+            conn.executemany(
+                """
+                UPDATE memory
+                SET content = ?, importance = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+                """,
+                [(g.content, g.importance, g.keep_id) for g in groups],
+            )
+            conn.executemany(
+                "DELETE FROM memory WHERE id = ?",
+                [(memory_id,) for memory_id in removed],
+            )
+
+        self.db.submit_write(compact).result()
+
+        if self.index_cache is not None and groups:
+            self.index_cache.invalidate()
+
+        if self.vector_index is not None and groups:
+            # Kept rows may have new text: re-embed them
+            self.vector_index.remove(removed + [g.keep_id for g in groups])
+            self._index_memories([(g.keep_id, g.content, g.importance) for g in groups])
+
+        logger.info(
+            "Memory consolidated (groups=%d, removed=%d of %d rows)",
+            len(groups),
+            len(removed),
+            len(rows),
+        )
+
+        return ConsolidationReport(
+            rows_before=len(rows),
+            rows_removed=len(removed),
+            groups=groups,
+        )
+
+    def _find_duplicate(self, conn, content: str, vector) -> int | None:
+        if vector is not None and self.dedup_similarity:
+            hits = self.vector_index.search(vector, k=1)
+            if hits and hits[0][1] >= self.dedup_similarity:
+                logger.debug("Duplicate memory by embedding (id=%d)", hits[0][0])
+                return hits[0][0]
+
+        if not self.dedup_threshold:
+            return None
+
+        target = shingles(content)
+        best_id, best_score = None, 0.0
+
+        for memory_id, candidate in self._dedup_candidates(conn, content):
+            score = jaccard(target, shingles(candidate))
+            if score > best_score:
+                best_id, best_score = memory_id, score
+
+        if best_id is not None and best_score >= self.dedup_threshold:
+            logger.debug(
+                "Duplicate memory by shingles (id=%d, jaccard=%.2f)",
+                best_id,
+                best_score,
+            )
+            return best_id
+
+        return None
+
+    def _dedup_candidates(self, conn, content: str) -> list[tuple[int, str]]:
+        """
+        Lexically closest existing memories, from whichever index is available.
+
+        FTS is preferred: it sees the write transaction's own state, while
+        the index cache only reflects committed writes and must not catch
+        up from inside the transaction.
+        """
+        if not self.db.has_fts:
+            if self.index_cache is None:
+                return []
+            return self.index_cache.search(
+                None,
+                content,
+                limit=self.DEDUP_CANDIDATES,
+                importance_weight=0.0,
+            )
+
+        cursor = conn.execute(
+            """
+            SELECT m.id, m.content
+            FROM memory_fts
+            JOIN memory AS m ON m.id = memory_fts.rowid
+            WHERE memory_fts MATCH ?
+            ORDER BY rank
+            LIMIT ?
+            """,
+            (self._match_expression(content), self.DEDUP_CANDIDATES),
+        )
+        return [(row["id"], row["content"]) for row in cursor.fetchall()]
+
+    def _merge_into(
+        self,
+        conn,
+        memory_id: int,
+        content: str,
+        importance: int,
+        vector,
+        change: IndexChange,
     ) -> None:
-        cursor = self.db.conn.cursor()
-        cursor.execute(
+        # memory_fts_au keeps the full-text index in sync with the new text
+        cursor = conn.execute(
             """
-            INSERT INTO memory (category, content, importance)
-            VALUES (?, ?, ?)
+            UPDATE memory
+            SET content = ?,
+                importance = MIN(MAX(importance, ?) + 1, ?),
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+            RETURNING importance
             """,
-            (category, content, importance),
+            (content, importance, self.MAX_IMPORTANCE, memory_id),
+        )
+        merged_importance = cursor.fetchone()[0]
+
+        change.upsert(memory_id, content, merged_importance)
+
+        if self.vector_index is not None:
+            change.vectors.append((memory_id, vector, merged_importance))
+
+        logger.info(
+            "Memory merged into existing row (id=%d, importance=%d)",
+            memory_id,
+            merged_importance,
         )
-        self.db.conn.commit()
 
     # --------------------------------------------------
     # Read (bulk)
     # --------------------------------------------------
 
     def get_all(self, limit: int = 20) -> list[str]:
-        cursor = self.db.conn.cursor()
-        cursor.execute(
-            """
-            SELECT content
-            FROM memory
-            ORDER BY importance DESC, created_at DESC
-            LIMIT ?
-            """,
-            (limit,),
-        )
-        return [row["content"] for row in cursor.fetchall()]
+        with self.db.read() as conn:
+            cursor = conn.execute(
+                """
+                SELECT content
+                FROM memory
+                ORDER BY importance DESC, created_at DESC
+                LIMIT ?
+                """,
+                (limit,),
+            )
+            return [row["content"] for row in cursor.fetchall()]
 
     # --------------------------------------------------
     # Read (relevance-ranked)
@@ -49,21 +317,136 @@ class MemoryStore:
 
     def get_relevant(self, query: str, limit: int = 5) -> list[str]:
         """
-        Return memories ranked by simple lexical relevance + importance.
+        Return memories ranked by relevance + importance.
+        Memories still queued for the writer are included when they match.
+
+        The read (and with it the shared commit lock) only covers the
+        SQL and the pending-write overlay: in semantic mode the query
+        embedding (an HTTP call) and the vector search happen before it.
+        """
+        if self.vector_index is not None:
+            candidates = self._semantic_candidates(query, limit)
+
+        with self.db.read():
+            if self.vector_index is not None:
+                hits = self._rank_semantic(query, candidates, limit)
+            elif self.index_cache is not None:
+                hits = self._get_relevant_cached(query, limit)
+            elif self.db.has_fts:
+                hits = self._get_relevant_fts(query, limit)
+            else:
+                hits = self._get_relevant_scan(query, limit)
+
+            pending = list(self._pending)
+
+        if self.retention is not None:
+            self.retention.record_hits([memory_id for memory_id, _ in hits])
+
+        contents = [content for _, content in hits]
+
+        if pending:
+            contents = self._with_pending(query, contents, pending, limit)
+
+        return contents
+
+    def _with_pending(
+        self,
+        query: str,
+        contents: list[str],
+        pending: list[tuple[str, int]],
+        limit: int,
+    ) -> list[str]:
+        """
+        Put matching uncommitted memories first, they are the freshest facts.
         """
         query_terms = self._tokenize(query)
 
-        cursor = self.db.conn.cursor()
-        cursor.execute(
-            """
-            SELECT content, importance
-            FROM memory
-            """
-        )
+        fresh = [
+            content
+            for content, importance in reversed(pending)
+            if importance >= 2 or query_terms & self._tokenize(content)
+        ]
+        merged = list(dict.fromkeys(fresh + contents))
+        return merged[:limit]
+
+    def _get_relevant_fts(self, query: str, limit: int = 5) -> list[tuple[int, str]]:
+        """
+        Lexical relevance (BM25) + importance.
+        Ranking happens in SQL, only `limit` rows are fetched.
+        """
+        match = self._match_expression(query)
+
+        with self.db.read() as conn:
+            cursor = conn.execute(
+                """
+                SELECT id, content, MAX(score) AS score
+                FROM (
+                    SELECT m.id, m.content, f.relevance + m.importance * ? AS score
+                    FROM (
+                        SELECT rowid, -rank AS relevance
+                        FROM memory_fts
+                        WHERE memory_fts MATCH ?
+                        ORDER BY rank
+                        LIMIT ?
+                    ) AS f
+                    JOIN memory AS m ON m.id = f.rowid
+
+                    UNION ALL
 
-        scored: list[tuple[float, str]] = []
+                    SELECT id, content, importance * ? AS score
+                    FROM (
+                        SELECT id, content, importance
+                        FROM memory
+                        WHERE importance >= 2
+                        ORDER BY importance DESC, id DESC
+                        LIMIT ?
+                    )
+                )
+                GROUP BY id
+                ORDER BY score DESC, id DESC
+                LIMIT ?
+                """,
+                (
+                    self.IMPORTANCE_WEIGHT,
+                    match,
+                    limit * self.CANDIDATE_FACTOR,
+                    self.IMPORTANCE_WEIGHT,
+                    limit,
+                    limit,
+                ),
+            )
+            return [(row["id"], row["content"]) for row in cursor.fetchall()]
 
-        for row in cursor.fetchall():
+    def _get_relevant_cached(self, query: str, limit: int = 5) -> list[tuple[int, str]]:
+        """
+        Term overlap + importance from the shared in-process index.
+        Only memories sharing a query term are scored.
+        """
+        with self.db.read() as conn:
+            return self.index_cache.search(
+                conn,
+                query,
+                limit=limit,
+                importance_weight=self.IMPORTANCE_WEIGHT,
+            )
+
+    def _get_relevant_scan(self, query: str, limit: int = 5) -> list[tuple[int, str]]:
+        """
+        Full-table fallback used when SQLite lacks FTS5.
+        """
+        query_terms = self._tokenize(query)
+
+        with self.db.read() as conn:
+            rows = conn.execute(
+                """
+                SELECT id, content, importance
+                FROM memory
+                """
+            ).fetchall()
+
+        scored: list[tuple[float, int, str]] = []
+
+        for row in rows:
             content = row["content"]
             importance = row["importance"]
 
@@ -74,15 +457,149 @@ class MemoryStore:
             if overlap == 0 and importance < 2:
                 continue
 
-            score = overlap + importance * 0.3
-            scored.append((score, content))
+            score = overlap + importance * self.IMPORTANCE_WEIGHT
+            scored.append((score, row["id"], content))
+
+        scored.sort(key=lambda x: x[0], reverse=True)
+        return [(memory_id, content) for _, memory_id, content in scored[:limit]]
+
+    def _semantic_candidates(self, query: str, limit: int = 5) -> list[tuple[int, float, float]]:
+        """
+        Cosine similarity + importance over the vector index.
+        No database access, runs outside the read.
+        """
+        query_vector = self.embedder.embed([query])[0]
+
+        hits = self.vector_index.search(
+            query_vector,
+            k=limit * self.CANDIDATE_FACTOR,
+            importance_weight=self.IMPORTANCE_WEIGHT,
+        )
+
+        # Same admission rule as lexical retrieval:
+        # require actual similarity OR high importance
+        return [
+            hit for hit in hits
+            if hit[1] >= self.min_similarity or hit[2] >= 2
+        ]
+
+    def _rank_semantic(
+        self,
+        query: str,
+        hits: list[tuple[int, float, float]],
+        limit: int = 5,
+    ) -> list[tuple[int, str]]:
+        """
+        Fetch the candidates' text and rank them,
+        optionally blended with lexical overlap.
+        """
+        if not hits:
+            return []
+
+        contents = self._fetch_contents([memory_id for memory_id, _, _ in hits])
+        query_terms = self._tokenize(query) if self.lexical_weight else set()
+
+        scored: list[tuple[float, int, str]] = []
+
+        for memory_id, similarity, importance in hits:
+            content = contents.get(memory_id)
+            if content is None:
+                continue
+
+            score = similarity + importance * self.IMPORTANCE_WEIGHT
+
+            if query_terms:
+                overlap = len(query_terms & self._tokenize(content))
+                score += self.lexical_weight * overlap / len(query_terms)
+
+            scored.append((score, memory_id, content))
 
         scored.sort(key=lambda x: x[0], reverse=True)
-        return [content for _, content in scored[:limit]]
+        return [(memory_id, content) for _, memory_id, content in scored[:limit]]
+
+    # --------------------------------------------------
+    # Async
+    # --------------------------------------------------
+
+    async def add_async(
+        self,
+        content: str,
+        category: str = "general",
+        importance: int = 1,
+    ) -> Future:
+        return await self.db.run(self.add, content, category, importance)
+
+    async def get_relevant_async(self, query: str, limit: int = 5) -> list[str]:
+        return await self.db.run(self.get_relevant, query, limit)
+
+    # --------------------------------------------------
+    # Vector index maintenance
+    # --------------------------------------------------
+
+    def _sync_vector_index(self) -> None:
+        """
+        Embed memories written while the index was unavailable
+        (pre-existing databases, lexical-mode runs, failed embeds).
+        """
+        with self.db.read() as conn:
+            cursor = conn.execute(
+                """
+                SELECT id, content, importance
+                FROM memory
+                WHERE id > ?
+                ORDER BY id
+                """,
+                (self.vector_index.max_id,),
+            )
+            rows = [(r["id"], r["content"], r["importance"]) for r in cursor.fetchall()]
+
+        if rows:
+            logger.info("Embedding %d memories missing from vector index", len(rows))
+            self._index_memories(rows)
+
+    def _embed(self, content: str):
+        try:
+            return self.embedder.embed([content])[0]
+        except Exception:
+            logger.exception("Embedding failed, memory not indexed")
+            return None
+
+    def _index_memories(self, rows: list[tuple[int, str, int]], batch_size: int = 64) -> None:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+
+            try:
+                vectors = self.embedder.embed([content for _, content, _ in batch])
+            except Exception:
+                logger.exception("Embedding failed, %d memories not indexed", len(batch))
+                return
+
+            for (memory_id, _, importance), vector in zip(batch, vectors):
+                self.vector_index.add(memory_id, vector, importance)
 
     # --------------------------------------------------
     # Helpers
     # --------------------------------------------------
 
+    def _fetch_contents(self, ids: list[int]) -> dict[int, str]:
+        placeholders = ",".join("?" * len(ids))
+        with self.db.read() as conn:
+            cursor = conn.execute(
+                f"SELECT id, content FROM memory WHERE id IN ({placeholders})",
+                ids,
+            )
+            return {row["id"]: row["content"] for row in cursor.fetchall()}
+
     def _tokenize(self, text: str) -> set[str]:
         return set(re.findall(r"\b\w+\b", text.lower()))
+
+    def _match_expression(self, query: str) -> str:
+        """
+        Build an FTS5 query matching any query term.
+        Terms are quoted so user text can't inject FTS syntax.
+        """
+        terms = sorted(self._tokenize(query))
+        if not terms:
+            # Matches nothing, only the importance fallback applies
+            return '""'
+        return " OR ".join('"' + t.replace('"', '""') + '"' for t in terms)
@@ -0,0 +1,277 @@
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List
+
+from app.memory.memory_index import IndexChange
+
+logger = logging.getLogger("memory_retention")
+
+
+# Retention score, higher = keep. Evaluated entirely in SQLite.
+# Each recency term decays hyperbolically with age in days:
+#   weight / (1 + age / half_life)
+RETENTION_SCORE = """
+    COALESCE(importance, 1) * :importance_weight
+    + :created_weight / (
+        1.0 + (julianday('now') - julianday(COALESCE(updated_at, created_at)))
+        / :half_life_days
+    )
+    + CASE WHEN last_used_at IS NULL THEN 0.0 ELSE :used_weight / (
+        1.0 + (julianday('now') - julianday(last_used_at)) / :half_life_days
+    ) END
+    + :hit_weight * MIN(COALESCE(hit_count, 0), :hit_cap) / :hit_cap
+"""
+
+
+class MemoryRetention:
+    """
+    Keeps the hot `memory` table within a fixed capacity.
+
+    - Retrieval hits are buffered in memory and flushed in batches to
+      `last_used_at` / `hit_count`.
+    - A background thread periodically archives the lowest-scoring rows
+      into `memory_archive`, so retrieval only ever sees the hot set.
+
+    Both go through the database's write path like any other store; the
+    shared in-process indexes (index cache, vector index) are told which
+    rows left the hot set.
+    """
+
+    IMPORTANCE_WEIGHT = 1.0
+    CREATED_WEIGHT = 1.0
+    USED_WEIGHT = 1.5
+    HIT_WEIGHT = 1.0
+    HIT_CAP = 20
+
+    _registry: Dict[str, "MemoryRetention"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(
+        self,
+        db,
+        capacity: int,
+        half_life_days: float = 30.0,
+        interval_s: float = 60.0,
+        index_cache=None,
+        vector_index=None,
+    ):
+        self.db = db
+        self.capacity = capacity
+        self.half_life_days = half_life_days
+        self.interval_s = interval_s
+        self.index_cache = index_cache
+        self.vector_index = vector_index
+
+        self._hits: Counter = Counter()
+        self._last_used: Dict[int, str] = {}
+        self._hits_lock = threading.Lock()
+
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        logger.info(
+            "MemoryRetention initialized (capacity=%d, half_life_days=%.1f, interval_s=%.1f)",
+            capacity,
+            half_life_days,
+            interval_s,
+        )
+
+    @classmethod
+    def for_database(cls, db, **kwargs) -> "MemoryRetention":
+        """
+        One retention worker per database file, started on first use.
+        """
+        key = str(Path(db.path).resolve())
+        with cls._registry_lock:
+            retention = cls._registry.get(key)
+            if retention is None:
+                retention = cls(db, **kwargs)
+                retention.start()
+                cls._registry[key] = retention
+            return retention
+
+    @classmethod
+    def close_shared(cls) -> None:
+        """
+        Close every registered worker. Call before Database.close_shared().
+        """
+        with cls._registry_lock:
+            for retention in cls._registry.values():
+                retention.close()
+            cls._registry.clear()
+
+    # --------------------------------------------------
+    # Hit tracking (turn path, no I/O)
+    # --------------------------------------------------
+
+    def record_hits(self, memory_ids: List[int]) -> None:
+        if not memory_ids:
+            return
+
+        now = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+        with self._hits_lock:
+            self._hits.update(memory_ids)
+            for memory_id in memory_ids:
+                self._last_used[memory_id] = now
+
+    # --------------------------------------------------
+    # Maintenance
+    # --------------------------------------------------
+
+    def flush_hits(self) -> int:
+        with self._hits_lock:
+            hits, self._hits = self._hits, Counter()
+            last_used, self._last_used = self._last_used, {}
+
+        if not hits:
+            return 0
+
+        params = [(count, last_used[memory_id], memory_id) for memory_id, count in hits.items()]
+
+        def update(conn):
+            conn.executemany(
+                """
+                UPDATE memory
+                SET hit_count = COALESCE(hit_count, 0) + ?,
+                    last_used_at = ?
+                WHERE id = ?
+                """,
+                params,
+            )
+
+        self.db.submit_write(update).result()
+
+        logger.debug("Flushed retrieval hits for %d memories", len(hits))
+        return len(hits)
+
+    def enforce(self) -> int:
+        """
+        Archive the lowest-scoring rows until the hot set fits capacity.
+        Returns the number of archived rows.
+        """
+        with self.db.read() as conn:
+            (count,) = conn.execute("SELECT COUNT(*) FROM memory").fetchone()
+        if count <= self.capacity:
+            return 0
+
+        params = {
+            "importance_weight": self.IMPORTANCE_WEIGHT,
+            "created_weight": self.CREATED_WEIGHT,
+            "used_weight": self.USED_WEIGHT,
+            "hit_weight": self.HIT_WEIGHT,
+            "hit_cap": self.HIT_CAP,
+            "half_life_days": self.half_life_days,
+            "capacity": self.capacity,
+        }
+        change = IndexChange()
+
+        def archive(conn) -> list[int]:
+            if self.index_cache is not None:
+                change.begin(conn)
+
+            # Selected inside the write transaction: rows added since the
+            # count above are scored too
+            evicted = [
+                row[0]
+                for row in conn.execute(
+                    f"""
+                    SELECT id
+                    FROM memory
+                    ORDER BY {RETENTION_SCORE} ASC, id ASC
+                    LIMIT MAX((SELECT COUNT(*) FROM memory) - :capacity, 0)
+                    """,
+                    params,
+                )
+            ]
+            ids_json = json.dumps(evicted)
+
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO memory_archive (
+                    id, category, content, importance, created_at,
+                    updated_at, last_used_at, hit_count
+                )
+                SELECT id, category, content, importance, created_at,
+                       updated_at, last_used_at, hit_count
+                FROM memory
+                WHERE id IN (SELECT value FROM json_each(?))
+                """,
+                (ids_json,),
+            )
+            conn.execute(
+                "DELETE FROM memory WHERE id IN (SELECT value FROM json_each(?))",
+                (ids_json,),
+            )
+
+            if self.index_cache is not None:
+                change.remove(evicted)
+                change.end(conn)
+            return evicted
+
+        def done():
+            if self.index_cache is not None:
+                self.index_cache.apply(change)
+
+        evicted = self.db.submit_write(archive, on_done=done).result()
+        if not evicted:
+            return 0
+
+        if self.vector_index is not None:
+            self.vector_index.remove(evicted)
+
+        logger.info(
+            "Archived %d memories (hot set %d -> %d, capacity=%d)",
+            len(evicted),
+            count,
+            count - len(evicted),
+            self.capacity,
+        )
+        return len(evicted)
+
+    # --------------------------------------------------
+    # Background worker
+    # --------------------------------------------------
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+
+        self._thread = threading.Thread(
+            target=self._run,
+            name="memory-retention",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def close(self) -> None:
+        """
+        Stop the worker and flush buffered hits, so no update is lost and
+        nothing touches the database after this returns.
+        """
+        self.stop()
+        self.flush_hits()
+        logger.info("MemoryRetention stopped")
+
+    def _run(self) -> None:
+        while True:
+            stopping = self._stop.wait(self.interval_s)
+
+            try:
+                self.flush_hits()
+                if not stopping:
+                    self.enforce()
+            except Exception:
+                logger.exception("Memory retention pass failed")
+
+            if stopping:
+                break
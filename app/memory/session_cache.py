@@ -0,0 +1,126 @@
+import logging
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from app.observability import metrics
+
+logger = logging.getLogger("session_cache")
+
+
+@dataclass
+class SessionState:
+    """
+    Hot state of one session. `messages` holds the newest messages only;
+    `count` is the session's total message count, `summarized_count`
+    how many of them the summary covers.
+    """
+
+    messages: deque
+    count: int = 0
+    summary: Optional[str] = None
+    summarized_count: int = 0
+    summary_loaded: bool = False
+    history_loaded: bool = False
+
+
+@dataclass
+class _Counters:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class SessionCache:
+    """
+    Process-wide, per-session cache in front of the history and summary stores.
+
+    Every session keeps a bounded ring buffer of recent messages, its
+    message count and its summary. Stores write through on every add/set
+    and seed a session from the database the first time it is read
+    (e.g. a resumed session), so steady-state turns never read SQLite.
+    Sessions are evicted least-recently-used beyond `max_sessions`.
+    """
+
+    _registry: Dict[str, "SessionCache"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, capacity: int = 100, max_sessions: int = 256):
+        self.capacity = capacity
+        self.max_sessions = max_sessions
+
+        # Held by the stores while seeding or writing through
+        self.lock = threading.RLock()
+
+        self._sessions: "OrderedDict[str, SessionState]" = OrderedDict()
+        self._counters = _Counters()
+
+    @classmethod
+    def for_database(cls, db, **kwargs) -> "SessionCache":
+        """
+        One cache per database file, shared by every store instance.
+        Options only apply when the cache is first created.
+        """
+        if db.path == ":memory:":
+            key = f":memory:{id(db)}"
+        else:
+            key = str(Path(db.path).resolve())
+
+        with cls._registry_lock:
+            cache = cls._registry.get(key)
+            if cache is None:
+                cache = cls(**kwargs)
+                cls._registry[key] = cache
+            return cache
+
+    # --------------------------------------------------
+    # Access (caller holds the lock)
+    # --------------------------------------------------
+
+    def get(self, session_id: str) -> Optional[SessionState]:
+        """
+        The session's state if cached, without creating or promoting it.
+        """
+        return self._sessions.get(session_id)
+
+    def session(self, session_id: str) -> SessionState:
+        """
+        Return the session's state, creating an empty (unloaded) one.
+        """
+        state = self._sessions.get(session_id)
+
+        if state is None:
+            state = SessionState(messages=deque(maxlen=self.capacity))
+            self._sessions[session_id] = state
+
+            if len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self._counters.evictions += 1
+        else:
+            self._sessions.move_to_end(session_id)
+
+        return state
+
+    def record(self, hit: bool) -> None:
+        if hit:
+            self._counters.hits += 1
+            metrics.CACHE_HITS.labels("session").inc()
+        else:
+            self._counters.misses += 1
+            metrics.CACHE_MISSES.labels("session").inc()
+
+    # --------------------------------------------------
+    # Metrics
+    # --------------------------------------------------
+
+    def stats(self) -> dict:
+        lookups = self._counters.hits + self._counters.misses
+        return {
+            "sessions": len(self._sessions),
+            "hits": self._counters.hits,
+            "misses": self._counters.misses,
+            "evictions": self._counters.evictions,
+            "hit_rate": self._counters.hits / lookups if lookups else 0.0,
+        }
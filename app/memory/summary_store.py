@@ -1,37 +1,116 @@
+from app.memory.session_cache import SessionCache
 from app.storage.database import Database
 
+# (summary, number of session messages it covers)
+Progress = tuple[str | None, int]
+
 
 class SummaryStore:
-    def __init__(self, db: Database):
+    def __init__(self, db: Database, cache: SessionCache | None = None):
         self.db = db
+        self.cache = cache
+
+        # Latest summary per session not yet committed by the writer,
+        # with a count of in-flight writes so only the last one clears it
+        self._pending: dict[str, tuple[Progress, int]] = {}
 
     def get(self, session_id: str) -> str | None:
-        cursor = self.db.conn.cursor()
-        cursor.execute(
-            """
-            SELECT summary
-            FROM conversation_summary
-            WHERE session_id = ?
-            """,
-            (session_id,)
-        )
-        row = cursor.fetchone()
-        return row["summary"] if row else None
-    
-    def set(self, session_id: str, summary: str) -> None:
-        self._upsert(session_id, summary)
-
-    def _upsert(self, session_id: str, summary: str) -> None:
-        cursor = self.db.conn.cursor()
-        cursor.execute(
-            """
-            INSERT INTO conversation_summary (session_id, summary)
-            VALUES (?, ?)
-            ON CONFLICT(session_id)
-            DO UPDATE SET
-                summary = excluded.summary,
-                updated_at = CURRENT_TIMESTAMP
-            """,
-            (session_id, summary)
-        )
-        self.db.conn.commit()
+        return self.get_progress(session_id)[0]
+
+    def get_progress(self, session_id: str) -> Progress:
+        """
+        The session's summary and how many messages it covers
+        (its high-water mark for rolling summarization).
+        """
+        if self.cache is not None:
+            with self.cache.lock:
+                state = self.cache.session(session_id)
+                if state.summary_loaded:
+                    self.cache.record(hit=True)
+                    return state.summary, state.summarized_count
+
+            self.cache.record(hit=False)
+
+        progress = self._load(session_id)
+
+        if self.cache is not None:
+            with self.db.consistent_read(), self.cache.lock:
+                state = self.cache.session(session_id)
+                if not state.summary_loaded:
+                    # A set() racing with the load wins
+                    pending = self._pending.get(session_id)
+                    state.summary, state.summarized_count = (
+                        pending[0] if pending is not None else progress
+                    )
+                    state.summary_loaded = True
+                progress = state.summary, state.summarized_count
+
+        return progress
+
+    def set(self, session_id: str, summary: str, summarized_count: int = 0) -> None:
+        self._upsert(session_id, summary, summarized_count)
+
+    def _load(self, session_id: str) -> Progress:
+        with self.db.read() as conn:
+            pending = self._pending.get(session_id)
+            if pending is not None:
+                return pending[0]
+
+            cursor = conn.execute(
+                """
+                SELECT summary, summarized_count
+                FROM conversation_summary
+                WHERE session_id = ?
+                """,
+                (session_id,)
+            )
+            row = cursor.fetchone()
+        return (row["summary"], row["summarized_count"]) if row else (None, 0)
+
+    # --------------------------------------------------
+    # Async
+    # --------------------------------------------------
+
+    async def get_async(self, session_id: str) -> str | None:
+        return await self.db.run(self.get, session_id)
+
+    async def get_progress_async(self, session_id: str) -> Progress:
+        return await self.db.run(self.get_progress, session_id)
+
+    async def set_async(self, session_id: str, summary: str, summarized_count: int = 0) -> None:
+        await self.db.run(self.set, session_id, summary, summarized_count)
+
+    def _upsert(self, session_id: str, summary: str, summarized_count: int) -> None:
+        with self.db.consistent_read():
+            _, in_flight = self._pending.get(session_id, (None, 0))
+            self._pending[session_id] = ((summary, summarized_count), in_flight + 1)
+
+            if self.cache is not None:
+                with self.cache.lock:
+                    state = self.cache.session(session_id)
+                    state.summary = summary
+                    state.summarized_count = summarized_count
+                    state.summary_loaded = True
+
+        def upsert(conn):
+            conn.execute(
+                """
+                INSERT INTO conversation_summary (session_id, summary, summarized_count)
+                VALUES (?, ?, ?)
+                ON CONFLICT(session_id)
+                DO UPDATE SET
+                    summary = excluded.summary,
+                    summarized_count = excluded.summarized_count,
+                    updated_at = CURRENT_TIMESTAMP
+                """,
+                (session_id, summary, summarized_count)
+            )
+
+        def done():
+            latest, in_flight = self._pending[session_id]
+            if in_flight == 1:
+                del self._pending[session_id]
+            else:
+                self._pending[session_id] = (latest, in_flight - 1)
+
+        self.db.submit_write(upsert, on_done=done)
@@ -0,0 +1,370 @@
+import bisect
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers a fast DB read up to a slow LLM call
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+class _Shards:
+    """
+    Per-thread value cells. Each thread only ever writes its own cell,
+    so updates need no lock and can't be lost; a scrape sums the cells.
+    The lock is taken once per thread, when its cell is created.
+    """
+
+    __slots__ = ("size", "_cells", "_lock")
+
+    def __init__(self, size: int):
+        self.size = size
+        self._cells: Dict[int, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def cell(self) -> List[float]:
+        ident = threading.get_ident()
+        cell = self._cells.get(ident)
+        if cell is None:
+            with self._lock:
+                cell = self._cells.setdefault(ident, [0.0] * self.size)
+        return cell
+
+    def total(self) -> List[float]:
+        with self._lock:
+            cells = list(self._cells.values())
+        out = [0.0] * self.size
+        for cell in cells:
+            for i, value in enumerate(cell):
+                out[i] += value
+        return out
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), registry: Optional["Registry"] = None):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[LabelValues, "_Metric"] = {}
+        self._lock = threading.Lock()
+
+        if registry is not None:
+            registry.register(self)
+
+    def labels(self, *values, **kwargs):
+        """
+        The child series for these label values. Cache the child where it
+        is used on a hot path; the lookup itself is a dict get.
+        """
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        key = tuple(str(v) for v in values)
+
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._children[key] = self._new_child()
+        return child
+
+    def _new_child(self) -> "_Metric":
+        raise NotImplementedError
+
+    def _series(self) -> Iterable[Tuple[LabelValues, "_Metric"]]:
+        if self.labelnames:
+            with self._lock:
+                return list(self._children.items())
+        return [((), self)]
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        for values, series in self._series():
+            lines.extend(series._render(self._label_text(values)))
+        return lines
+
+    def _label_text(self, values: LabelValues) -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, values)]
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def _render(self, labels: str) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), registry: Optional["Registry"] = None):
+        super().__init__(name, help, labelnames, registry)
+        self._shards = _Shards(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._shards.cell()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self._shards.total()[0]
+
+    def _new_child(self) -> "Counter":
+        return Counter(self.name, self.help)
+
+    def _render(self, labels: str) -> List[str]:
+        return [f"{self.name}{labels} {_number(self.value)}"]
+
+
+class Gauge(_Metric):
+    """
+    inc()/dec() are sharded like counters; set() and set_function() (a
+    callback read at scrape time, for queue depths) replace the value.
+    """
+
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), registry: Optional["Registry"] = None):
+        super().__init__(name, help, labelnames, registry)
+        self._shards = _Shards(1)
+        self._base = 0.0
+        self._function: Optional[Callable[[], float]] = None
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._shards.cell()[0] += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._shards.cell()[0] -= amount
+
+    def set(self, value: float) -> None:
+        self._base = value - self._shards.total()[0]
+
+    def set_function(self, fn: Callable[[], float]) -> None:
+        self._function = fn
+
+    @property
+    def value(self) -> float:
+        if self._function is not None:
+            try:
+                return float(self._function())
+            except Exception:
+                return math.nan
+        return self._base + self._shards.total()[0]
+
+    def _new_child(self) -> "Gauge":
+        return Gauge(self.name, self.help)
+
+    def _render(self, labels: str) -> List[str]:
+        return [f"{self.name}{labels} {_number(self.value)}"]
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        registry: Optional["Registry"] = None,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+        # One cell per bucket (non-cumulative) plus +Inf, sum
+        self._shards = _Shards(len(self.buckets) + 2)
+
+    def observe(self, value: float) -> None:
+        cell = self._shards.cell()
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def time(self) -> "_Timer":
+        """
+        Context manager observing the elapsed seconds.
+        """
+        return _Timer(self)
+
+    def _new_child(self) -> "Histogram":
+        return Histogram(self.name, self.help, buckets=self.buckets)
+
+    def _render(self, labels: str) -> List[str]:
+        total = self._shards.total()
+        lines = []
+        cumulative = 0.0
+
+        bounds = [_number(b) for b in self.buckets] + ["+Inf"]
+        for bound, count in zip(bounds, total[:-1]):
+            cumulative += count
+            le = self._label_text_from(labels, f'le="{bound}"')
+            lines.append(f"{self.name}_bucket{le} {_number(cumulative)}")
+
+        lines.append(f"{self.name}_sum{labels} {_number(total[-1])}")
+        lines.append(f"{self.name}_count{labels} {_number(cumulative)}")
+        return lines
+
+    @staticmethod
+    def _label_text_from(labels: str, extra: str) -> str:
+        if not labels:
+            return "{" + extra + "}"
+        return labels[:-1] + "," + extra + "}"
+
+
+class _Timer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> None:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+# ============================================================
+# Assistant metrics
+# ============================================================
+
+REGISTRY = Registry()
+
+TIME_TO_FIRST_TOKEN = Histogram(
+    "assistant_time_to_first_token_seconds",
+    "From the LLM call to its first streamed chunk.",
+    registry=REGISTRY,
+)
+TIME_TO_FIRST_AUDIO = Histogram(
+    "assistant_time_to_first_audio_seconds",
+    "From receiving user input to sending the first audio clip.",
+    registry=REGISTRY,
+)
+PLANNER_LATENCY = Histogram(
+    "assistant_planner_latency_seconds",
+    "Planner decide() duration.",
+    ["planner"],
+    registry=REGISTRY,
+)
+SEARCH_LATENCY = Histogram(
+    "assistant_search_latency_seconds",
+    "SearXNG request duration.",
+    registry=REGISTRY,
+)
+TTS_REAL_TIME_FACTOR = Histogram(
+    "assistant_tts_real_time_factor",
+    "Synthesis time divided by audio duration (below 1 is faster than real time).",
+    registry=REGISTRY,
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 5.0),
+)
+DB_QUERY_LATENCY = Histogram(
+    "assistant_db_query_latency_seconds",
+    "Database read (connection held) and write transaction duration.",
+    ["op"],
+    registry=REGISTRY,
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+
+TURNS = Counter(
+    "assistant_turns_total",
+    "User turns handled.",
+    registry=REGISTRY,
+)
+CACHE_HITS = Counter(
+    "assistant_cache_hits_total",
+    "Cache hits, by cache.",
+    ["cache"],
+    registry=REGISTRY,
+)
+CACHE_MISSES = Counter(
+    "assistant_cache_misses_total",
+    "Cache misses, by cache.",
+    ["cache"],
+    registry=REGISTRY,
+)
+TOOL_FAILURES = Counter(
+    "assistant_tool_failures_total",
+    "Tool runs that raised.",
+    ["tool"],
+    registry=REGISTRY,
+)
+PLANNER_FALLBACKS = Counter(
+    "assistant_planner_fallbacks_total",
+    "LLM planner outputs replaced by the default respond plan.",
+    ["reason"],
+    registry=REGISTRY,
+)
+
+ACTIVE_SESSIONS = Gauge(
+    "assistant_active_sessions",
+    "Open WebSocket sessions.",
+    registry=REGISTRY,
+)
+EXECUTOR_QUEUE_DEPTH = Gauge(
+    "assistant_executor_queue_depth",
+    "Work items waiting for a thread, by executor.",
+    ["executor"],
+    registry=REGISTRY,
+)
+PENDING_TTS_JOBS = Gauge(
+    "assistant_pending_tts_jobs",
+    "Sentences waiting for or in synthesis.",
+    registry=REGISTRY,
+)
+
+
+def executor_queue_depth(executor) -> float:
+    """
+    Queued work items of a ThreadPoolExecutor (not the running ones).
+    """
+    work_queue = getattr(executor, "_work_queue", None)
+    return float(work_queue.qsize()) if work_queue is not None else 0.0
+
+
+def render() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,385 @@
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import requests
+
+logger = logging.getLogger("tracing")
+
+# Innermost open span of the current task / thread
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """
+    One timed stage of a turn. Use as a context manager; nested
+    `span(...)` calls become its children.
+    """
+
+    __slots__ = (
+        "tracer", "name", "trace_id", "span_id", "parent_id",
+        "start_ns", "end_ns", "attributes", "error", "_token",
+    )
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str],
+        attributes: Dict[str, Any],
+        start_ns: Optional[int] = None,
+    ):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = start_ns if start_ns is not None else time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self._token = None
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def add(self, key: str, value: float) -> None:
+        self.attributes[key] = self.attributes.get(key, 0) + value
+
+    def child(self, name: str, start_ns: Optional[int] = None, **attributes) -> "Span":
+        """
+        A child span that is not made current; end() it explicitly. For
+        stages measured from inside a loop (e.g. time to first token).
+        """
+        return Span(self.tracer, name, self.trace_id, self.span_id, attributes, start_ns)
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = end_ns if end_ns is not None else time.time_ns()
+        self.tracer.processor.on_end(self)
+
+    def __enter__(self) -> "Span":
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        try:
+            _current.reset(self._token)
+        except ValueError:
+            # Exited in a different context than it was entered in
+            _current.set(None)
+        self.end()
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """
+    Returned whenever the turn isn't sampled; every operation is free.
+    """
+
+    __slots__ = ()
+
+    trace_id = None
+    span_id = None
+    duration_ms = 0.0
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def add(self, key: str, value: float) -> None:
+        pass
+
+    def child(self, name: str, start_ns: Optional[int] = None, **attributes) -> "_NoopSpan":
+        return self
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def span(name: str, **attributes):
+    """
+    A child of the current span, or a no-op when there is none (tracing
+    off or the turn not sampled).
+    """
+    parent = _current.get()
+    if parent is None:
+        return NOOP_SPAN
+    return Span(parent.tracer, name, parent.trace_id, parent.span_id, attributes)
+
+
+def current_span():
+    return _current.get() or NOOP_SPAN
+
+
+def use_span(parent) -> "_Activation":
+    """
+    Make `parent` current, e.g. in a background job started by a turn.
+    """
+    return _Activation(parent if isinstance(parent, Span) else None)
+
+
+class _Activation:
+    __slots__ = ("span", "_token")
+
+    def __init__(self, span: Optional[Span]):
+        self.span = span
+        self._token = None
+
+    def __enter__(self):
+        self._token = _current.set(self.span)
+        return self.span or NOOP_SPAN
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _current.reset(self._token)
+
+
+# ============================================================
+# Exporters
+# ============================================================
+
+
+class JsonlExporter:
+    """
+    One JSON object per span, appended to a file.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, spans: List[Span]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            for s in spans:
+                f.write(json.dumps(s.to_dict(), default=str) + "\n")
+
+    def close(self) -> None:
+        pass
+
+
+class OtlpHttpExporter:
+    """
+    OTLP/HTTP with the JSON encoding (POST {endpoint}), as accepted by
+    the OpenTelemetry Collector and scripts/trace_collector.py.
+    """
+
+    def __init__(self, endpoint: str, service_name: str = "local-assistant", timeout: float = 2.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def export(self, spans: List[Span]) -> None:
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+                "scopeSpans": [{
+                    "scope": {"name": "app"},
+                    "spans": [self._span(s) for s in spans],
+                }],
+            }]
+        }
+        r = self.session.post(self.endpoint, json=payload, timeout=self.timeout)
+        r.raise_for_status()
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _span(self, s: Span) -> dict:
+        out = {
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": 1,  # INTERNAL
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns),
+            "attributes": _otlp_attributes(s.attributes),
+            "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+        }
+        if s.parent_id:
+            out["parentSpanId"] = s.parent_id
+        return out
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[dict]:
+    out = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        out.append({"key": key, "value": typed})
+    return out
+
+
+class BatchProcessor:
+    """
+    Hands finished spans to the exporter on a background thread, in
+    batches, so exporting never blocks a turn. When the queue is full,
+    spans are dropped and counted.
+    """
+
+    def __init__(self, exporter, max_queue: int = 4096, max_batch: int = 256, interval_s: float = 1.0):
+        self.exporter = exporter
+        self.max_batch = max_batch
+        self.interval_s = interval_s
+
+        self._queue: "queue.Queue[Optional[Span]]" = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="trace-export", daemon=True)
+        self._thread.start()
+
+        # Metrics
+        self.exported = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def on_end(self, s: Span) -> None:
+        try:
+            self._queue.put_nowait(s)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        self.exporter.close()
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            batch: List[Span] = []
+            deadline = time.monotonic() + self.interval_s
+
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0.001))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            if not batch:
+                continue
+
+            try:
+                self.exporter.export(batch)
+                self.exported += len(batch)
+            except Exception:
+                self.failed += len(batch)
+                logger.warning("Exporting %d spans failed", len(batch), exc_info=True)
+
+
+# ============================================================
+# Tracer
+# ============================================================
+
+
+class Tracer:
+    """
+    Starts turn traces. Each trace is sampled with `sample_rate`; an
+    unsampled (or disabled) trace is the no-op span, and every span()
+    under it is a no-op too.
+
+    Trace ids start with the WebSocket session id, so one session's turns
+    are easy to find in any backend.
+    """
+
+    def __init__(self, exporter=None, sample_rate: float = 1.0, **batch_kwargs):
+        self.sample_rate = sample_rate if exporter is not None else 0.0
+        self.processor = BatchProcessor(exporter, **batch_kwargs) if exporter is not None else None
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    def trace(self, name: str, session_id: Optional[str] = None, **attributes):
+        if self.sample_rate <= 0 or (self.sample_rate < 1 and random.random() >= self.sample_rate):
+            return NOOP_SPAN
+
+        prefix = "".join(c for c in (session_id or "") if c in "0123456789abcdef")[:16]
+        trace_id = prefix + os.urandom(16).hex()[len(prefix):]
+
+        if session_id is not None:
+            attributes["session.id"] = session_id
+        return Span(self, name, trace_id, None, attributes)
+
+    def close(self) -> None:
+        if self.processor is not None:
+            self.processor.close()
+
+    def stats(self) -> dict:
+        if self.processor is None:
+            return {"enabled": False}
+        return {
+            "enabled": True,
+            "sample_rate": self.sample_rate,
+            "exported": self.processor.exported,
+            "dropped": self.processor.dropped,
+            "failed": self.processor.failed,
+        }
+
+
+def build_tracer(cfg: Optional[dict]) -> Tracer:
+    cfg = cfg or {}
+    if not cfg.get("enabled", False):
+        return Tracer()
+
+    exporter_name = cfg.get("exporter", "jsonl")
+    if exporter_name == "jsonl":
+        exporter = JsonlExporter(cfg.get("path", "logs/traces.jsonl"))
+    elif exporter_name == "otlp":
+        exporter = OtlpHttpExporter(
+            cfg.get("endpoint", "http://localhost:4318/v1/traces"),
+            service_name=cfg.get("service_name", "local-assistant"),
+        )
+    else:
+        raise ValueError(f"Unknown trace exporter: {exporter_name}")
+
+    logger.info(
+        "Tracing enabled (exporter=%s, sample_rate=%.2f)",
+        exporter_name,
+        cfg.get("sample_rate", 1.0),
+    )
+    return Tracer(exporter, sample_rate=cfg.get("sample_rate", 1.0))
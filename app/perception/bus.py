@@ -0,0 +1,268 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Deque, Dict, Iterable, Mapping, Optional, Tuple
+
+from app.perception.state import PerceptionEntry
+
+logger = logging.getLogger("perception_bus")
+
+_EMPTY: Mapping[str, PerceptionEntry] = MappingProxyType({})
+
+
+@dataclass
+class KeyPolicy:
+    """
+    Per-key settings. `ttl_s`: entry disappears from snapshots this long
+    after its last update. `rate`/`burst`: token bucket, publishes beyond
+    it are rejected.
+    """
+    ttl_s: Optional[float] = None
+    rate: Optional[float] = None
+    burst: int = 1
+
+
+class _Bucket:
+    __slots__ = ("tokens", "last")
+
+    def __init__(self, burst: int):
+        self.tokens = float(burst)
+        self.last = time.monotonic()
+
+
+class Subscription:
+    """
+    Async iterator of (key, entry) updates.
+
+    Pending updates are coalesced per key: a subscriber that falls behind
+    gets the newest entry of each changed key, never an unbounded backlog.
+    """
+
+    def __init__(self, bus: "PerceptionBus", keys: Optional[Iterable[str]], prefix: Optional[str]):
+        self.bus = bus
+        self.keys = frozenset(keys) if keys is not None else None
+        self.prefix = prefix
+        self.loop = asyncio.get_running_loop()
+
+        self._pending: Dict[str, PerceptionEntry] = {}
+        self._lock = threading.Lock()
+        self._event = asyncio.Event()
+        self._signalled = False
+        self._closed = False
+
+        # Metrics
+        self.delivered = 0
+        self.coalesced = 0
+
+    def wants(self, key: str) -> bool:
+        if self.keys is not None and key not in self.keys:
+            return False
+        return self.prefix is None or key.startswith(self.prefix)
+
+    def _offer(self, key: str, entry: PerceptionEntry) -> None:
+        with self._lock:
+            if key in self._pending:
+                self.coalesced += 1
+            self._pending[key] = entry
+            if self._signalled:
+                return
+            self._signalled = True
+
+        try:
+            self.loop.call_soon_threadsafe(self._event.set)
+        except RuntimeError:
+            # Loop closed, subscriber is gone
+            self.close()
+
+    def close(self) -> None:
+        self._closed = True
+        self.bus._unsubscribe(self)
+        try:
+            self.loop.call_soon_threadsafe(self._event.set)
+        except RuntimeError:
+            pass
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Tuple[str, PerceptionEntry]:
+        while True:
+            with self._lock:
+                if self._pending:
+                    key = next(iter(self._pending))
+                    entry = self._pending.pop(key)
+                    self.delivered += 1
+                    return key, entry
+                if self._closed:
+                    raise StopAsyncIteration
+                self._signalled = False
+                self._event.clear()
+
+            await self._event.wait()
+
+
+class PerceptionBus:
+    """
+    Perception store and event bus for continuous producers (input,
+    screen, clipboard, audio level, ...).
+
+    - Snapshots are immutable mappings swapped in on every publish
+      (copy-on-write), so readers never take a lock.
+    - Each key keeps a bounded ring buffer of its recent entries.
+    - Per-key TTL drops stale entries from snapshots.
+    - Per-key token-bucket rate limits reject publishes from noisy
+      producers (publish returns False).
+    - Async subscribers receive updates coalesced per key.
+
+    Drop-in for PerceptionState: update / get / snapshot keep their
+    signatures.
+    """
+
+    def __init__(self, history: int = 32, default_policy: Optional[KeyPolicy] = None):
+        self.history_size = history
+        self.default_policy = default_policy or KeyPolicy()
+
+        self._lock = threading.Lock()
+        self._snapshot: Mapping[str, PerceptionEntry] = _EMPTY
+        self._history: Dict[str, Deque[PerceptionEntry]] = {}
+        self._policies: Dict[str, KeyPolicy] = {}
+        self._buckets: Dict[str, _Bucket] = {}
+        self._subscribers: Tuple[Subscription, ...] = ()
+
+        # Wall-clock time of the earliest TTL expiry in the snapshot
+        self._next_expiry = float("inf")
+
+        # Metrics
+        self.published = 0
+        self.rejected = 0
+        self.expired = 0
+
+    def configure(self, key: str, ttl_s: Optional[float] = None, rate: Optional[float] = None, burst: int = 1) -> None:
+        with self._lock:
+            self._policies[key] = KeyPolicy(ttl_s=ttl_s, rate=rate, burst=burst)
+            self._buckets.pop(key, None)
+
+    # --------------------------------------------------
+    # Producers
+    # --------------------------------------------------
+
+    def publish(self, key: str, value: Any) -> bool:
+        entry = PerceptionEntry(value=value, timestamp=time.time())
+        policy = self._policies.get(key, self.default_policy)
+
+        with self._lock:
+            if policy.rate is not None and not self._take_token(key, policy):
+                self.rejected += 1
+                return False
+
+            entries = dict(self._snapshot)
+            entries[key] = entry
+            self._snapshot = MappingProxyType(entries)
+
+            history = self._history.get(key)
+            if history is None:
+                history = self._history[key] = deque(maxlen=self.history_size)
+            history.append(entry)
+
+            if policy.ttl_s is not None:
+                self._next_expiry = min(self._next_expiry, entry.timestamp + policy.ttl_s)
+
+            self.published += 1
+            subscribers = self._subscribers
+
+        for subscription in subscribers:
+            if subscription.wants(key):
+                subscription._offer(key, entry)
+
+        return True
+
+    # PerceptionState compatibility
+    def update(self, key: str, value: Any) -> None:
+        self.publish(key, value)
+
+    # --------------------------------------------------
+    # Readers
+    # --------------------------------------------------
+
+    def snapshot(self) -> Mapping[str, PerceptionEntry]:
+        """
+        Immutable view of the current entries. Lock-free unless a TTL
+        expiry is due.
+        """
+        if time.time() >= self._next_expiry:
+            self._expire()
+        return self._snapshot
+
+    def get(self, key: str) -> Optional[PerceptionEntry]:
+        return self.snapshot().get(key)
+
+    def history(self, key: str) -> Tuple[PerceptionEntry, ...]:
+        """
+        Recent entries of `key`, oldest first.
+        """
+        with self._lock:
+            return tuple(self._history.get(key, ()))
+
+    def subscribe(self, keys: Optional[Iterable[str]] = None, prefix: Optional[str] = None) -> Subscription:
+        """
+        Subscribe from a running event loop; iterate with `async for`.
+        """
+        subscription = Subscription(self, keys, prefix)
+        with self._lock:
+            self._subscribers = self._subscribers + (subscription,)
+        return subscription
+
+    def stats(self) -> dict:
+        return {
+            "keys": len(self._snapshot),
+            "published": self.published,
+            "rejected": self.rejected,
+            "expired": self.expired,
+            "subscribers": len(self._subscribers),
+        }
+
+    # --------------------------------------------------
+    # Internals
+    # --------------------------------------------------
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers = tuple(s for s in self._subscribers if s is not subscription)
+
+    def _take_token(self, key: str, policy: KeyPolicy) -> bool:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket(policy.burst)
+
+        now = time.monotonic()
+        bucket.tokens = min(policy.burst, bucket.tokens + (now - bucket.last) * policy.rate)
+        bucket.last = now
+
+        if bucket.tokens < 1.0:
+            return False
+        bucket.tokens -= 1.0
+        return True
+
+    def _expire(self) -> None:
+        with self._lock:
+            now = time.time()
+            entries = {}
+            next_expiry = float("inf")
+
+            for key, entry in self._snapshot.items():
+                ttl = self._policies.get(key, self.default_policy).ttl_s
+                if ttl is None:
+                    entries[key] = entry
+                elif entry.timestamp + ttl > now:
+                    entries[key] = entry
+                    next_expiry = min(next_expiry, entry.timestamp + ttl)
+                else:
+                    self.expired += 1
+
+            if len(entries) != len(self._snapshot):
+                self._snapshot = MappingProxyType(entries)
+            self._next_expiry = next_expiry
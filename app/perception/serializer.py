@@ -0,0 +1,202 @@
+import fnmatch
+import json
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional, Sequence, Tuple
+
+from app.services.tokens import TokenCounter
+
+logger = logging.getLogger("perception_serializer")
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Upper bounds (seconds) and labels of the age buckets
+DEFAULT_AGE_BUCKETS: Tuple[Tuple[float, str], ...] = (
+    (10, "just now"),
+    (60, "<1m"),
+    (600, "<10m"),
+    (3600, "<1h"),
+)
+
+
+@dataclass
+class RenderPolicy:
+    include: bool = True
+    max_tokens: int = 48
+    show_age: bool = True
+
+
+def render_full(perception: Mapping) -> str:
+    """
+    The planner's original rendering: every entry, full value, exact age.
+    """
+    if not perception:
+        return "No additional perception available."
+
+    lines = []
+    for key, entry in perception.items():
+        try:
+            age = f"{entry.age:.1f}s"
+            value = entry.value
+        except Exception:
+            age = "unknown"
+            value = entry
+
+        lines.append(f"- {key}: {value} (age: {age})")
+
+    return "\n".join(lines)
+
+
+class PerceptionSerializer:
+    """
+    Compact, stable perception text for planner prompts.
+
+    Only keys whose policy includes them are rendered (policies match by
+    exact key or glob, e.g. "screen.*"), in key order. Ages are bucketed
+    ("<1m") so the text doesn't change every turn just because time
+    passed, values are flattened and cut to the policy's token budget,
+    and the whole block is capped at `budget_tokens`.
+
+    With `delta`, values that are the same as in the previous render (this
+    serializer is per planner, so per session) are rendered without their
+    age, so a value that just sits there doesn't change the text as its
+    age bucket moves. The value itself is always rendered in full: each
+    planner prompt is built from scratch. Stats compare every render
+    against `render_full`.
+    """
+
+    def __init__(
+        self,
+        policies: Optional[Dict[str, RenderPolicy]] = None,
+        default_policy: Optional[RenderPolicy] = None,
+        budget_tokens: int = 256,
+        delta: bool = False,
+        age_buckets: Sequence[Tuple[float, str]] = DEFAULT_AGE_BUCKETS,
+        token_counter: Optional[TokenCounter] = None,
+    ):
+        self.policies = policies or {}
+        self.default_policy = default_policy or RenderPolicy()
+        self.budget_tokens = budget_tokens
+        self.delta = delta
+        self.age_buckets = tuple(sorted(age_buckets))
+        self.tokens = token_counter or TokenCounter()
+
+        self._last: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.calls = 0
+        self.tokens_full = 0
+        self.tokens_rendered = 0
+
+    @classmethod
+    def from_config(cls, cfg: dict, token_counter: Optional[TokenCounter] = None) -> "PerceptionSerializer":
+        return cls(
+            policies={
+                key: RenderPolicy(**policy)
+                for key, policy in (cfg.get("keys") or {}).items()
+            },
+            default_policy=RenderPolicy(**(cfg.get("default") or {})),
+            budget_tokens=cfg.get("budget_tokens", 256),
+            delta=cfg.get("delta", False),
+            age_buckets=[tuple(bucket) for bucket in cfg["age_buckets"]] if cfg.get("age_buckets") else DEFAULT_AGE_BUCKETS,
+            token_counter=token_counter,
+        )
+
+    def render(self, perception: Mapping) -> str:
+        values: Dict[str, str] = {}
+        ages: Dict[str, Optional[str]] = {}
+
+        for key in sorted(perception):
+            policy = self._policy(key)
+            if not policy.include:
+                continue
+
+            entry = perception[key]
+            values[key] = self._value(getattr(entry, "value", entry), policy.max_tokens)
+            age = getattr(entry, "age", None)
+            ages[key] = self._age(age) if policy.show_age and age is not None else None
+
+        with self._lock:
+            previous, self._last = self._last, values
+
+        out = []
+        used = 0
+        dropped = 0
+        for key, value in values.items():
+            age = ages[key]
+            if self.delta and previous.get(key) == value:
+                age = None
+
+            line = f"- {key}: {value} ({age})" if age else f"- {key}: {value}"
+            cost = self.tokens.count(line)
+            if used + cost > self.budget_tokens:
+                dropped += 1
+                continue
+            out.append(line)
+            used += cost
+
+        if dropped:
+            out.append(f"- ({dropped} more omitted)")
+
+        text = "\n".join(out) if out else "No additional perception available."
+        self._record(perception, text)
+        return text
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "tokens_full": self.tokens_full,
+            "tokens_rendered": self.tokens_rendered,
+            "tokens_saved_per_call": (
+                (self.tokens_full - self.tokens_rendered) / self.calls
+                if self.calls else 0.0
+            ),
+        }
+
+    # --------------------------------------------------
+    # Helpers
+    # --------------------------------------------------
+
+    def _policy(self, key: str) -> RenderPolicy:
+        policy = self.policies.get(key)
+        if policy is not None:
+            return policy
+
+        for pattern, policy in self.policies.items():
+            if fnmatch.fnmatchcase(key, pattern):
+                return policy
+
+        return self.default_policy
+
+    def _value(self, value, max_tokens: int) -> str:
+        if isinstance(value, (dict, list, tuple)):
+            text = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str, ensure_ascii=False)
+        else:
+            text = str(value)
+
+        text = _WHITESPACE.sub(" ", text).strip()
+        return self.tokens.truncate(text, max_tokens)
+
+    def _age(self, age: float) -> str:
+        for bound, label in self.age_buckets:
+            if age < bound:
+                return label
+        return "older"
+
+    def _record(self, perception: Mapping, text: str) -> None:
+        full = self.tokens.count(render_full(perception))
+        rendered = self.tokens.count(text)
+
+        self.calls += 1
+        self.tokens_full += full
+        self.tokens_rendered += rendered
+
+        logger.info(
+            "Perception rendered: %d tokens (full %d, saved %d)",
+            rendered,
+            full,
+            full - rendered,
+        )
@@ -1,26 +1,51 @@
 from app.planners.rule_planner import Planner
 from app.planners.llm_planner import LLMPlanner
 from app.planners.hybrid_planner import HybridPlanner
+from app.planners.intent_classifier import load_optional
+from app.planners.plan_cache import CachedPlanner
+from app.perception.serializer import PerceptionSerializer
 
 
 def build_planner(config, llm):
+    planner = _build_planner(config, llm)
+
+    cache_cfg = config.planner.get("cache") or {}
+    if cache_cfg.get("enabled", False):
+        return CachedPlanner(
+            planner,
+            max_entries=cache_cfg.get("max_entries", 512),
+            ttl_s=cache_cfg.get("ttl_s", 600),
+        )
+
+    return planner
+
+
+def _build_planner(config, llm):
     mode = config.planner.get("mode", "rule")
     llm_enabled = config.planner.get("llm_enabled", False)
 
-    rule_planner = Planner()
+    rule_planner = Planner(rules_path=config.planner.get("rules_path"))
 
     if mode == "rule" or not llm_enabled:
         return rule_planner
 
-    llm_planner = LLMPlanner(llm)
+    perception_cfg = config.planner.get("perception")
+    llm_planner = LLMPlanner(
+        llm,
+        serializer=PerceptionSerializer.from_config(perception_cfg) if perception_cfg else None,
+    )
 
     if mode == "llm":
         return llm_planner
 
     if mode == "hybrid":
+        classifier_cfg = config.planner.get("classifier") or {}
         return HybridPlanner(
             rule_planner=rule_planner,
             llm_planner=llm_planner,
+            classifier=load_optional(classifier_cfg.get("model_path")),
+            threshold=classifier_cfg.get("threshold", 0.8),
+            turn_log=classifier_cfg.get("turn_log"),
         )
 
     raise ValueError(f"Unknown planner mode: {mode}")
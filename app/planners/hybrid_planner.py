@@ -1,10 +1,47 @@
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+
 from app.core.plan import Plan
+from app.planners.intent_classifier import IntentClassifier, plan_label
+
+logger = logging.getLogger("hybrid_planner")
 
 
 class HybridPlanner:
-    def __init__(self, rule_planner, llm_planner):
+    """
+    Rules first, then the local intent classifier (when one is loaded),
+    then the LLM planner for whatever neither is confident about.
+
+    The classifier only decides respond / web_search. When it predicts
+    write_memory the rules have already failed to extract the content,
+    so the LLM planner decides (and writes the memory text).
+
+    LLM decisions can be appended to `turn_log` (JSONL of text + label) to
+    train the classifier offline.
+    """
+
+    def __init__(
+        self,
+        rule_planner,
+        llm_planner,
+        classifier: Optional[IntentClassifier] = None,
+        threshold: float = 0.8,
+        turn_log: Optional[str] = None,
+    ):
         self.rule_planner = rule_planner
         self.llm_planner = llm_planner
+        self.classifier = classifier
+        self.threshold = threshold
+        self.turn_log = Path(turn_log) if turn_log else None
+        self._log_lock = threading.Lock()
+
+        # Metrics
+        self.rule_decisions = 0
+        self.classifier_decisions = 0
+        self.llm_decisions = 0
 
     def decide(self, user_text: str, perception: dict) -> Plan:
         # 1. Let rules try first
@@ -12,10 +49,43 @@ class HybridPlanner:
 
         # 2. If rules detected a specific intent, trust them
         if self._is_confident(rule_plan):
+            self.rule_decisions += 1
             return rule_plan
 
-        # 3. Otherwise, ask the LLM
-        return self.llm_planner.decide(user_text, perception)
+        # 3. Then the local classifier, if it is sure enough (never for writes)
+        if self.classifier is not None:
+            label, confidence = self.classifier.predict(user_text)
+            if label in IntentClassifier.DECIDES and confidence >= self.threshold:
+                self.classifier_decisions += 1
+                logger.info(
+                    "Classifier decision: %s (confidence=%.2f, llm calls avoided=%d)",
+                    label,
+                    confidence,
+                    self.classifier_decisions,
+                )
+                return self.classifier.plan(label, user_text)
+
+            logger.debug(
+                "Classifier undecided (%s, %.2f), asking LLM planner",
+                label,
+                confidence,
+            )
+
+        # 4. Otherwise, ask the LLM
+        self.llm_decisions += 1
+        plan = self.llm_planner.decide(user_text, perception)
+        self._log_turn(user_text, plan)
+        return plan
+
+    def stats(self) -> dict:
+        total = self.rule_decisions + self.classifier_decisions + self.llm_decisions
+        return {
+            "rule_decisions": self.rule_decisions,
+            "classifier_decisions": self.classifier_decisions,
+            "llm_decisions": self.llm_decisions,
+            "llm_calls_avoided": self.classifier_decisions,
+            "llm_share": self.llm_decisions / total if total else 0.0,
+        }
 
     def _is_confident(self, plan: Plan) -> bool:
         """
@@ -31,3 +101,15 @@ class HybridPlanner:
 
         return True
 
+    def _log_turn(self, user_text: str, plan: Plan) -> None:
+        if self.turn_log is None:
+            return
+
+        line = json.dumps({"text": user_text, "label": plan_label(plan), "source": "llm"})
+        try:
+            with self._log_lock:
+                self.turn_log.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.turn_log, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+        except OSError:
+            logger.warning("Could not append planner turn to %s", self.turn_log, exc_info=True)
@@ -0,0 +1,213 @@
+import logging
+import re
+import zlib
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.actions import Action
+from app.core.plan import Plan
+
+logger = logging.getLogger("intent_classifier")
+
+_WORD = re.compile(r"[\w']+")
+
+
+def plan_label(plan: Plan) -> str:
+    """
+    The intent label a plan corresponds to, for training data.
+    """
+    types = {action.type for action in plan.actions}
+    if "write_memory" in types:
+        return "write_memory"
+    if "web_search" in types:
+        return "web_search"
+    return "respond"
+
+
+class IntentClassifier:
+    """
+    Small in-process intent classifier: hashed word uni/bigrams and
+    character trigrams, a linear layer and softmax, all in NumPy.
+
+    Trained offline (scripts/train_intent_classifier.py) and stored as a
+    .npz of the weight matrix (feature size x labels), bias and labels, so
+    loading is one file read.
+
+    It predicts write_memory too, but only plans the labels in DECIDES:
+    a label says nothing about what to remember, so writes need a planner
+    that extracts the content.
+    """
+
+    LABELS = ("respond", "web_search", "write_memory")
+
+    # Labels plan() can turn into a plan from the label alone
+    DECIDES = ("respond", "web_search")
+
+    def __init__(
+        self,
+        weights: np.ndarray,
+        bias: np.ndarray,
+        labels: Sequence[str] = LABELS,
+    ):
+        self.weights = weights.astype(np.float32, copy=False)
+        self.bias = bias.astype(np.float32, copy=False)
+        self.labels = tuple(labels)
+        self.dim = weights.shape[0]
+
+    @classmethod
+    def empty(cls, dim: int = 1 << 15, labels: Sequence[str] = LABELS) -> "IntentClassifier":
+        return cls(
+            np.zeros((dim, len(labels)), dtype=np.float32),
+            np.zeros(len(labels), dtype=np.float32),
+            labels,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "IntentClassifier":
+        with np.load(Path(path), allow_pickle=False) as data:
+            model = cls(data["weights"], data["bias"], [str(label) for label in data["labels"]])
+        logger.info(
+            "IntentClassifier loaded (path=%s, dim=%d, labels=%s)",
+            path,
+            model.dim,
+            ",".join(model.labels),
+        )
+        return model
+
+    def save(self, path: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        np.savez(
+            path,
+            weights=self.weights,
+            bias=self.bias,
+            labels=np.array(self.labels),
+        )
+
+    # --------------------------------------------------
+    # Features
+    # --------------------------------------------------
+
+    def features(self, text: str) -> np.ndarray:
+        """
+        Hashed feature indices of `text` (with repeats).
+        """
+        words = _WORD.findall(text.lower())
+        grams = [f"w:{w}" for w in words]
+        grams += [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+        if words:
+            grams.append(f"first:{words[0]}")
+
+        padded = f" {' '.join(words)} "
+        grams += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+
+        return np.fromiter(
+            (zlib.crc32(g.encode()) % self.dim for g in grams),
+            dtype=np.int64,
+            count=len(grams),
+        )
+
+    def vectorize(self, texts: Iterable[str]) -> np.ndarray:
+        """
+        Dense L2-normalized feature rows. Meant for small batches.
+        """
+        texts = list(texts)
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            np.add.at(matrix[row], self.features(text), 1.0)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-9)
+
+    # --------------------------------------------------
+    # Inference
+    # --------------------------------------------------
+
+    def probabilities(self, text: str) -> np.ndarray:
+        index, counts = np.unique(self.features(text), return_counts=True)
+        values = counts.astype(np.float32)
+        values /= max(float(np.linalg.norm(values)), 1e-9)
+
+        logits = values @ self.weights[index] + self.bias
+        return _softmax(logits[None, :])[0]
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        probs = self.probabilities(text)
+        best = int(np.argmax(probs))
+        return self.labels[best], float(probs[best])
+
+    def plan(self, label: str, user_text: str) -> Plan:
+        if label == "web_search":
+            return Plan(actions=[
+                Action(type="web_search", payload={"query": user_text}),
+                Action(type="respond"),
+            ])
+        if label == "respond":
+            return Plan(actions=[Action(type="respond")])
+        raise ValueError(f"Classifier does not plan {label!r} on its own")
+
+    # --------------------------------------------------
+    # Training
+    # --------------------------------------------------
+
+    def fit(
+        self,
+        texts: List[str],
+        labels: List[str],
+        epochs: int = 20,
+        lr: float = 2.0,
+        l2: float = 1e-5,
+        batch_size: int = 64,
+        seed: int = 0,
+    ) -> List[float]:
+        """
+        Mini-batch softmax regression with class-balanced weights.
+        Returns the mean loss per epoch.
+        """
+        targets = np.array([self.labels.index(label) for label in labels])
+        counts = np.bincount(targets, minlength=len(self.labels)).astype(np.float32)
+        class_weight = len(targets) / (len(self.labels) * np.maximum(counts, 1.0))
+
+        rng = np.random.default_rng(seed)
+        losses = []
+
+        for _ in range(epochs):
+            order = rng.permutation(len(texts))
+            total = 0.0
+
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                x = self.vectorize(texts[i] for i in batch)
+                y = targets[batch]
+                w = class_weight[y]
+
+                probs = _softmax(x @ self.weights + self.bias)
+                total += float(-(w * np.log(probs[np.arange(len(y)), y] + 1e-9)).sum())
+
+                grad = probs
+                grad[np.arange(len(y)), y] -= 1.0
+                grad *= w[:, None] / len(y)
+
+                self.weights -= lr * (x.T @ grad + l2 * self.weights)
+                self.bias -= lr * grad.sum(axis=0)
+
+            losses.append(total / len(texts))
+
+        return losses
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return shifted / shifted.sum(axis=1, keepdims=True)
+
+
+def load_optional(path: Optional[str]) -> Optional[IntentClassifier]:
+    """
+    The classifier at `path`, or None (with a warning) if it is missing.
+    """
+    if not path:
+        return None
+    if not Path(path).exists():
+        logger.warning("Intent classifier model not found at %s, tier disabled", path)
+        return None
+    return IntentClassifier.load(path)
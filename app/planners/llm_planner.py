@@ -6,14 +6,22 @@ from typing import Dict, Optional
 
 from app.core.actions import Action
 from app.core.plan import Plan
+from app.observability import metrics
+from app.perception.serializer import PerceptionSerializer, render_full
 
 logger = logging.getLogger("llm_planner")
 
 
 class LLMPlanner:
-    def __init__(self, llm, timeout_ms: int = 1500):
+    def __init__(
+        self,
+        llm,
+        timeout_ms: int = 1500,
+        serializer: Optional[PerceptionSerializer] = None,
+    ):
         self.llm = llm
         self.timeout_ms = timeout_ms
+        self.serializer = serializer
 
         logger.info(
             "LLMPlanner initialized (timeout_ms=%d)",
@@ -101,15 +109,17 @@ class LLMPlanner:
                 return Plan(actions=actions)
 
             logger.warning("LLMPlanner parsed JSON but produced no actions")
+            metrics.PLANNER_FALLBACKS.labels("no_actions").inc()
 
         except Exception:
+            metrics.PLANNER_FALLBACKS.labels("parse_error").inc()
             logger.exception(
                 "LLMPlanner failed to parse output as JSON. Raw output: %r",
                 buffer,
             )
 
         logger.info("LLMPlanner fallback to default respond")
-        return Plan(actions=[Action(type="respond")])
+        return Plan(actions=[Action(type="respond")], fallback=True)
 
     # ============================================================
     # Helpers
@@ -133,18 +143,7 @@ class LLMPlanner:
             return None
 
     def _format_perception(self, perception: dict) -> str:
-        if not perception:
-            return "No additional perception available."
+        if self.serializer is not None:
+            return self.serializer.render(perception)
 
-        lines = []
-        for key, entry in perception.items():
-            try:
-                age = f"{entry.age:.1f}s"
-                value = entry.value
-            except Exception:
-                age = "unknown"
-                value = entry
-
-            lines.append(f"- {key}: {value} (age: {age})")
-
-        return "\n".join(lines)
+        return render_full(perception)
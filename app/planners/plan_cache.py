@@ -0,0 +1,168 @@
+import copy
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Iterable, Tuple
+
+from app.core.plan import Plan
+from app.observability import metrics
+
+logger = logging.getLogger("plan_cache")
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+_CONTRACTIONS = re.compile(r"\b(what|who|where|when|how|it|that|there)'s\b")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Cache-key form of user input: case, punctuation, spacing and the
+    common "'s" contractions don't change the plan.
+    """
+    text = unicodedata.normalize("NFKC", text).lower().replace("’", "'")
+    text = _CONTRACTIONS.sub(r"\1 is", text)
+    text = _PUNCTUATION.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class CachedPlanner:
+    """
+    Plan memoization in front of any planner.
+
+    Keyed by the normalized user text and a fingerprint of the perception
+    snapshot's values (entry ages/timestamps are ignored, as are
+    `ignore_keys` such as the raw input itself). LRU with a TTL.
+
+    Only plans made of `cacheable` actions are stored: a cached web_search
+    plan still runs its search when executed, but memory writes are
+    always planned fresh from the exact input. Fallback plans (the inner
+    planner couldn't decide) aren't stored either, so one bad or failed
+    LLM reply isn't replayed for the whole TTL.
+    """
+
+    def __init__(
+        self,
+        planner,
+        max_entries: int = 512,
+        ttl_s: float = 600.0,
+        ignore_keys: Iterable[str] = ("user.input",),
+        cacheable: Iterable[str] = ("respond", "web_search"),
+    ):
+        self.planner = planner
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.ignore_keys = frozenset(ignore_keys)
+        self.cacheable = frozenset(cacheable)
+
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Plan]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.uncacheable = 0
+        self.fallbacks = 0
+        self.saved_s = 0.0
+        self._plan_s: Dict[Tuple[str, str], float] = {}
+
+        logger.info(
+            "CachedPlanner initialized (planner=%s, max_entries=%d, ttl_s=%.0f)",
+            planner.__class__.__name__,
+            max_entries,
+            ttl_s,
+        )
+
+    def decide(self, user_text: str, perception: dict) -> Plan:
+        key = (normalize_text(user_text), self._fingerprint(perception))
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, plan = entry
+                if now - stored_at <= self.ttl_s:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    metrics.CACHE_HITS.labels("plan").inc()
+                    self.saved_s += self._plan_s.get(key, 0.0)
+                    logger.info("Plan cache hit (hits=%d, misses=%d)", self.hits, self.misses)
+                    return copy.deepcopy(plan)
+
+                del self._entries[key]
+                self._plan_s.pop(key, None)
+                self.expired += 1
+
+            self.misses += 1
+            metrics.CACHE_MISSES.labels("plan").inc()
+
+        start = time.perf_counter()
+        plan = self.planner.decide(user_text, perception)
+        elapsed = time.perf_counter() - start
+
+        if plan.fallback:
+            self.fallbacks += 1
+            logger.info("Planner fell back, plan not cached (fallbacks=%d)", self.fallbacks)
+            return plan
+
+        if not all(action.type in self.cacheable for action in plan.actions):
+            self.uncacheable += 1
+            return plan
+
+        with self._lock:
+            self._entries[key] = (now, copy.deepcopy(plan))
+            self._entries.move_to_end(key)
+            self._plan_s[key] = elapsed
+
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._plan_s.pop(evicted, None)
+                self.evictions += 1
+
+        return plan
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._plan_s.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "uncacheable": self.uncacheable,
+            "fallbacks": self.fallbacks,
+            "planner_ms_saved": self.saved_s * 1000,
+        }
+
+    # --------------------------------------------------
+    # Helpers
+    # --------------------------------------------------
+
+    def _fingerprint(self, perception: dict) -> str:
+        """
+        Hash of the perception values only; an entry refreshed with the
+        same value (new timestamp, different age) keeps the key.
+        """
+        digest = hashlib.blake2b(digest_size=12)
+        for key in sorted(perception):
+            if key in self.ignore_keys:
+                continue
+            entry = perception[key]
+            value = getattr(entry, "value", entry)
+            digest.update(key.encode())
+            digest.update(b"\x00")
+            digest.update(json.dumps(value, sort_keys=True, default=str).encode())
+            digest.update(b"\x01")
+        return digest.hexdigest()
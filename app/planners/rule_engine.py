@@ -0,0 +1,256 @@
+import logging
+import re
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+
+from app.core.actions import Action
+
+logger = logging.getLogger("rule_engine")
+
+# Patterns made only of words and spaces are whole-word literal phrases;
+# anything else is a regular expression
+_LITERAL = re.compile(r"^[\w' ]+$")
+
+# Words are \w runs, so an apostrophe is a boundary as it is for \b
+# ("today's" has the word "today")
+_WORD = re.compile(r"\w+")
+
+# Leading literal word of a regex that can only match from a word start
+# ("\bset\s+alarm" -> "set", but not "news?" or "\bnew\w*")
+_LEAD = re.compile(r"^\\b(\w+)(?=\\s|\\b| )")
+
+
+@dataclass
+class Rule:
+    """
+    One planner intent: its trigger patterns and the actions it plans.
+
+    Action payload values are templates filled from the match:
+    {text} (the user's input), {match} (the matched span), {before} and
+    {after} (the input around the span, trimmed of " :.-").
+    """
+    intent: str
+    patterns: List[str]
+    actions: List[dict]
+    priority: int = 0
+
+    def plan(self, fields: Dict[str, str]) -> List[Action]:
+        return [
+            Action(
+                type=template["type"],
+                payload=(
+                    {
+                        key: value.format_map(fields) if isinstance(value, str) else value
+                        for key, value in template["payload"].items()
+                    }
+                    if template.get("payload") is not None
+                    else None
+                ),
+            )
+            for template in self.actions
+        ]
+
+
+@dataclass
+class RuleMatch:
+    rule: Rule
+    start: int
+    end: int
+    text: str
+
+    @property
+    def intent(self) -> str:
+        return self.rule.intent
+
+    def fields(self) -> Dict[str, str]:
+        return {
+            "text": self.text,
+            "match": self.text[self.start:self.end],
+            "before": self.text[:self.start].strip(" :.-"),
+            "after": self.text[self.end:].strip(" :.-"),
+        }
+
+    def actions(self) -> List[Action]:
+        return self.rule.plan(self.fields())
+
+
+class _PhraseAutomaton:
+    """
+    Aho-Corasick over words: every literal phrase found in one pass over
+    the input's words, whole-word and case-insensitive by construction.
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # (rule index, phrase length in words) ending at each state
+        self._out: List[List[Tuple[int, int]]] = [[]]
+
+    def add(self, phrase: str, rule_index: int) -> None:
+        words = phrase.lower().split()
+        state = 0
+        for word in words:
+            nxt = self._goto[state].get(word)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][word] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((rule_index, len(words)))
+
+    def build(self) -> None:
+        # Breadth-first, so a state's failure link is final before its children's
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and word not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(word, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def scan(self, words: List[re.Match]):
+        """
+        Yields (rule index, start, end) character spans.
+        """
+        state = 0
+        for i, word in enumerate(words):
+            token = word.group().lower()
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            for rule_index, length in self._out[state]:
+                yield rule_index, words[i - length + 1].start(), word.end()
+
+
+class RuleEngine:
+    """
+    Compiled intent matcher.
+
+    The input is split into words once. Literal phrases from all rules go
+    into one Aho-Corasick automaton over those words. Regex patterns that
+    start with a literal word are indexed by it and only tried where that
+    word occurs; the rest are compiled into a single case-insensitive
+    alternation (highest priority first, so it wins when two patterns
+    match at the same position). So one pass finds every matching intent,
+    and the winning match's span fills the payload. Patterns must not
+    define their own named groups.
+
+    A single alternation of many grouped patterns is tried alternative by
+    alternative at every position, which is why leading words are indexed
+    rather than everything going into it.
+    """
+
+    def __init__(self, rules: List[Rule]):
+        self.rules = rules
+
+        self._phrases = _PhraseAutomaton()
+        self._keyed: Dict[str, List[Tuple[re.Pattern, int]]] = {}
+        alternatives = []
+        phrases = keyed = 0
+
+        order = sorted(range(len(rules)), key=lambda i: -rules[i].priority)
+        for index in order:
+            regexes = []
+            for pattern in rules[index].patterns:
+                if _LITERAL.match(pattern):
+                    if "'" not in pattern:
+                        self._phrases.add(pattern, index)
+                        phrases += 1
+                        continue
+                    # "don't" spans two words, match it as a bounded regex
+                    pattern = rf"\b{pattern}\b"
+
+                lead = _LEAD.match(pattern) if "|" not in pattern else None
+                if lead:
+                    self._keyed.setdefault(lead.group(1).lower(), []).append(
+                        (re.compile(pattern, re.IGNORECASE), index)
+                    )
+                    keyed += 1
+                else:
+                    regexes.append(f"(?:{pattern})")
+
+            if regexes:
+                alternatives.append(f"(?P<r{index}>{'|'.join(regexes)})")
+
+        self._phrases.build()
+        self._regex = re.compile("|".join(alternatives), re.IGNORECASE) if alternatives else None
+
+        logger.info(
+            "RuleEngine compiled (rules=%d, phrases=%d, keyed=%d, alternation=%d)",
+            len(rules),
+            phrases,
+            keyed,
+            sum(len(r.patterns) for r in rules) - phrases - keyed,
+        )
+
+    @classmethod
+    def from_config(cls, entries: List[dict]) -> "RuleEngine":
+        return cls([
+            Rule(
+                intent=entry["intent"],
+                patterns=list(entry["patterns"]),
+                actions=list(entry["actions"]),
+                priority=entry.get("priority", 0),
+            )
+            for entry in entries
+        ])
+
+    @classmethod
+    def from_file(cls, path: str) -> "RuleEngine":
+        with open(Path(path), "r") as f:
+            data = yaml.safe_load(f) or {}
+        return cls.from_config(data.get("rules", []))
+
+    def match_all(self, text: str) -> List[RuleMatch]:
+        """
+        The first match of every intent found in `text`.
+        """
+        found: Dict[int, Tuple[int, int]] = {}
+
+        def record(index: int, start: int, end: int) -> None:
+            current = found.get(index)
+            if current is None or end < current[0]:
+                found[index] = (start, end)
+            elif start <= current[1]:
+                # Overlapping patterns of one intent ("please remember" /
+                # "remember that") count as one span
+                found[index] = (min(start, current[0]), max(end, current[1]))
+
+        words = list(_WORD.finditer(text))
+
+        for index, start, end in self._phrases.scan(words):
+            record(index, start, end)
+
+        if self._keyed:
+            for word in words:
+                for regex, index in self._keyed.get(word.group().lower(), ()):
+                    m = regex.match(text, word.start())
+                    if m:
+                        record(index, m.start(), m.end())
+
+        if self._regex is not None:
+            for m in self._regex.finditer(text):
+                record(int(m.lastgroup[1:]), m.start(), m.end())
+
+        return [
+            RuleMatch(rule=self.rules[index], start=start, end=end, text=text)
+            for index, (start, end) in found.items()
+        ]
+
+    def match(self, text: str) -> Optional[RuleMatch]:
+        """
+        The winning match: highest priority, then earliest in the text.
+        """
+        matches = self.match_all(text)
+        if not matches:
+            return None
+        return min(matches, key=lambda m: (-m.rule.priority, m.start))
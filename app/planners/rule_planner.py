@@ -1,36 +1,25 @@
-import re
 import logging
-from typing import Dict, Optional
+from pathlib import Path
+from typing import Optional
 
 from app.core.actions import Action
 from app.core.plan import Plan
+from app.planners.rule_engine import RuleEngine
 
 logger = logging.getLogger("planner")
 
+DEFAULT_RULES_PATH = Path(__file__).resolve().parent.parent / "config" / "planner_rules.yaml"
 
-class Planner:
-    # ============================================================
-    # Pattern definitions (rule-based heuristics)
-    # ============================================================
 
-    SEARCH_PATTERNS = [
-        r"\blatest\b",
-        r"\bcurrent\b",
-        r"\btoday\b",
-        r"\bnews\b",
-        r"^what is\b",
-        r"^who is\b",
-        r"^when did\b",
-        r"^where is\b",
-    ]
+class Planner:
+    """
+    Rule-based planner. Intents, their patterns and action templates come
+    from a rules file (see app/config/planner_rules.yaml) and are matched
+    in a single compiled pass by RuleEngine.
+    """
 
-    MEMORY_PATTERNS = [
-        r"\bremember that\b",
-        r"\bremember this\b",
-        r"\bplease remember\b",
-        r"\bnote that\b",
-        r"\bsave this\b",
-    ]
+    def __init__(self, engine: Optional[RuleEngine] = None, rules_path: Optional[str] = None):
+        self.engine = engine or RuleEngine.from_file(rules_path or DEFAULT_RULES_PATH)
 
     # ============================================================
     # Public API
@@ -45,79 +34,17 @@ class Planner:
             list(perception.keys()),
         )
 
-        text = user_text.lower().strip()
-
-        # --------------------------------------------------
-        # 1. Explicit memory command
-        # --------------------------------------------------
-        memory_content = self._extract_memory_content(user_text)
-        if memory_content is not None:
-            logger.info("Memory command detected")
+        match = self.engine.match(user_text)
 
-            actions = [
-                Action(
-                    type="write_memory",
-                    payload={"content": memory_content},
-                ),
-                Action(type="respond"),
-            ]
+        if match is None:
+            logger.info("Planner decision: default respond")
+            return Plan(actions=[Action(type="respond")])
 
-            logger.info(
-                "Planner decision: memory_write + respond (%d actions)",
-                len(actions),
-            )
-            return Plan(actions=actions)
+        actions = match.actions()
 
-        # --------------------------------------------------
-        # 2. Web search intent
-        # --------------------------------------------------
-        if self._is_search_query(text):
-            logger.info("Web search intent detected")
-
-            return Plan(
-                actions=[
-                    Action(
-                        type="web_search",
-                        payload={"query": user_text},
-                    ),
-                    Action(type="respond"),
-                ]
-            )
-
-        # --------------------------------------------------
-        # 3. Default response
-        # --------------------------------------------------
-        logger.info("Planner decision: default respond")
-        return Plan(actions=[Action(type="respond")])
-
-    # ============================================================
-    # Intent detection helpers (private)
-    # ============================================================
-
-    def _is_search_query(self, text: str) -> bool:
-        return any(re.search(pattern, text) for pattern in self.SEARCH_PATTERNS)
-
-    def _extract_memory_content(self, text: str) -> Optional[str]:
-        """
-        If the text is a memory command, return the extracted content.
-        Otherwise return None.
-        """
-        lowered = text.lower()
-
-        for pattern in self.MEMORY_PATTERNS:
-            match = re.search(pattern, lowered)
-            if match:
-                start = match.end()
-                content = text[start:].strip(" :.-")
-
-                if content:
-                    logger.debug(
-                        "Extracted memory content (%d chars)",
-                        len(content),
-                    )
-                    return content
-
-                logger.warning("Memory command detected but no content extracted")
-                return ""
-
-        return None
+        logger.info(
+            "Planner decision: intent=%s (%s)",
+            match.intent,
+            " + ".join(a.type for a in actions),
+        )
+        return Plan(actions=actions)
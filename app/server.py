@@ -1,22 +1,32 @@
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 import asyncio
-from typing import Iterator, Any
 import json
 import logging
 import uuid
 import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from app.config import Config
 
+from app.core.aio import run_blocking
 from app.core.orchestrator_factory import build_orchestrator
 from app.core.events import AssistantSpeechEvent, AssistantStateEvent
-from app.logging import setup_logging
-from app.tts.piper_tts import PiperTTS
+from app.storage.database import Database
+from app.memory.retention import MemoryRetention
+from app.memory.vector_index import VectorIndex
+from app.services.summary_worker import SummaryWorker
+from app.logging import bind_log_context, setup_logging_from_config, shutdown_logging, unbind_log_context
+from app.observability import metrics, tracing
+from app.observability.tracing import build_tracer
+from app.tts.factory import build_tts
 from app.services.sentence_splitter import split_sentences
 
-setup_logging()
+config = Config()
+
+setup_logging_from_config(config.logging)
 logger = logging.getLogger("server")
 
 app = FastAPI()
@@ -27,44 +37,83 @@ AUDIO_DIR = Path("static/audio")
 AUDIO_DIR.mkdir(parents=True, exist_ok=True)
 logger.debug("Audio directory ready at %s", AUDIO_DIR.resolve())
 
-config = Config()
+tracer = build_tracer(config.raw.get("tracing"))
 
-tts = PiperTTS(
-    model_path=Path(config.tts["model_path"]),
-    use_cuda=config.tts["use_cuda"],
-)
+tts = build_tts(config.tts)
 
 logger.info("Starting FastAPI server")
 
-_SENTINEL = object()
+# Default executor for planner / tool / LLM calls (run_blocking), kept
+# here so its queue depth can be exported
+blocking_executor = ThreadPoolExecutor(thread_name_prefix="blocking")
 
+metrics.EXECUTOR_QUEUE_DEPTH.labels("default").set_function(
+    lambda: metrics.executor_queue_depth(blocking_executor)
+)
+metrics.EXECUTOR_QUEUE_DEPTH.labels("db").set_function(Database.shared_queue_depth)
+
+# Synthesis runs off the event loop on its own pool, so one session's TTS
+# doesn't stall every other socket. Piper isn't documented as safe to call
+# from several threads at once, hence a single worker by default.
+tts_executor = ThreadPoolExecutor(
+    max_workers=config.tts.get("workers", 1),
+    thread_name_prefix="tts",
+)
 
-def _next_or_sentinel(iterator: Iterator[Any]):
-    try:
-        return next(iterator)
-    except StopIteration:
-        return _SENTINEL
+metrics.EXECUTOR_QUEUE_DEPTH.labels("tts").set_function(
+    lambda: metrics.executor_queue_depth(tts_executor)
+)
 
 
-async def run_generator(gen: Iterator[Any]):
+async def send(ws: WebSocket, message: dict) -> None:
     """
-    Run a blocking generator in an executor and re-yield items async.
+    Send one message. Each send is a span except the per-token chunks,
+    which are summed on the enclosing span instead.
     """
-    loop = asyncio.get_running_loop()
-    iterator = iter(gen)
+    parent = tracing.current_span()
+    if parent is tracing.NOOP_SPAN:
+        await ws.send_text(json.dumps(message))
+        return
 
-    logger.debug("Starting generator bridge")
+    if message["type"] == "assistant_chunk":
+        start = time.perf_counter()
+        await ws.send_text(json.dumps(message))
+        parent.add("ws.chunk_sends", 1)
+        parent.add("ws.chunk_send_ms", (time.perf_counter() - start) * 1000)
+        return
 
-    while True:
-        item = await loop.run_in_executor(
-            None, _next_or_sentinel, iterator
-        )
+    with tracing.span("ws.send", **{"ws.type": message["type"]}):
+        await ws.send_text(json.dumps(message))
 
-        if item is _SENTINEL:
-            logger.debug("Generator exhausted")
-            break
 
-        yield item
+async def synthesize(text: str, audio_path: Path, **attributes) -> None:
+    """
+    Synthesize one clip on the TTS executor. The pending gauge covers
+    the time queued for a worker as well as the synthesis itself.
+    """
+    metrics.PENDING_TTS_JOBS.inc()
+    try:
+        await run_blocking(_synthesize, text, audio_path, attributes, executor=tts_executor)
+    finally:
+        metrics.PENDING_TTS_JOBS.dec()
+
+
+def _synthesize(text: str, audio_path: Path, attributes: dict) -> None:
+    """
+    Synthesize one clip, recording the TTS span and real-time factor.
+    """
+    start = time.perf_counter()
+    with tracing.span("tts", **{"tts.chars": len(text)}, **attributes):
+        tts.synthesize(text, audio_path)
+
+    elapsed = time.perf_counter() - start
+    try:
+        with wave.open(str(audio_path), "rb") as wav:
+            duration = wav.getnframes() / wav.getframerate()
+    except (OSError, wave.Error, ZeroDivisionError):
+        return
+    if duration > 0:
+        metrics.TTS_REAL_TIME_FACTOR.observe(elapsed / duration)
 
 
 @app.websocket("/ws")
@@ -73,104 +122,124 @@ async def websocket_endpoint(ws: WebSocket):
     start_ts = time.perf_counter()
 
     await ws.accept()
+    metrics.ACTIVE_SESSIONS.inc()
     logger.info("[%s] WebSocket connected", session_id)
 
-    orchestrator = build_orchestrator()
+    orchestrator = build_orchestrator(session_id=session_id)
     logger.debug("[%s] Orchestrator created", session_id)
+    turn = 0
 
     try:
         while True:
             user_text = await ws.receive_text()
-
-            logger.info(
-                "[%s] Received user input (len=%d)",
-                session_id,
-                len(user_text),
-            )
-            logger.debug("[%s] User input text: %r", session_id, user_text)
-
-            # Buffer for sentence-based TTS
-            text_buffer = ""
-
-            async for event in run_generator(
-                orchestrator.handle_user_input(user_text)
-            ):
-                # --- STATE EVENTS ---
-                if isinstance(event, AssistantStateEvent):
-                    logger.debug(
-                        "[%s] Assistant state -> %s",
-                        session_id,
-                        event.state,
-                    )
-                    await ws.send_text(json.dumps({
-                        "type": "assistant_state",
-                        "state": event.state,
-                    }))
-                    continue
-
-                # --- SPEECH EVENTS ---
-                if isinstance(event, AssistantSpeechEvent):
-                    if not event.is_final:
-                        text_buffer += event.text
-
-                        await ws.send_text(json.dumps({
-                            "type": "assistant_chunk",
-                            "content": event.text,
-                        }))
-
-                        sentences, text_buffer = split_sentences(text_buffer)
-
-                        for sentence in sentences:
-                            audio_id = uuid.uuid4().hex
-                            audio_path = AUDIO_DIR / f"{audio_id}.wav"
-
+            turn += 1
+            received_ts = time.perf_counter()
+            first_audio = True
+            log_token = bind_log_context(session_id=session_id, turn=turn)
+
+            try:
+                logger.info(
+                    "[%s] Received user input (len=%d)",
+                    session_id,
+                    len(user_text),
+                )
+                logger.debug("[%s] User input text: %r", session_id, user_text)
+
+                with tracer.trace(
+                    "turn",
+                    session_id=session_id,
+                    **{"turn.index": turn, "input.chars": len(user_text)},
+                ):
+                    # Buffer for sentence-based TTS
+                    text_buffer = ""
+
+                    async for event in orchestrator.handle_user_input_async(user_text):
+                        # --- STATE EVENTS ---
+                        if isinstance(event, AssistantStateEvent):
                             logger.debug(
-                                "[%s] TTS synth sentence (%d chars)",
+                                "[%s] Assistant state -> %s",
                                 session_id,
-                                len(sentence),
+                                event.state,
                             )
-
-                            tts_start = time.perf_counter()
-                            tts.synthesize(sentence, audio_path)
-
-                            logger.debug(
-                                "[%s] TTS complete (%.2f ms)",
-                                session_id,
-                                (time.perf_counter() - tts_start) * 1000,
-                            )
-
-                            await ws.send_text(json.dumps({
-                                "type": "assistant_audio",
-                                "url": f"/static/audio/{audio_id}.wav",
-                            }))
-
-                    else:
-                        if text_buffer.strip():
-                            audio_id = uuid.uuid4().hex
-                            audio_path = AUDIO_DIR / f"{audio_id}.wav"
-
-                            logger.debug(
-                                "[%s] TTS final fragment (%d chars)",
-                                session_id,
-                                len(text_buffer),
-                            )
-
-                            tts.synthesize(text_buffer, audio_path)
-
-                            await ws.send_text(json.dumps({
-                                "type": "assistant_audio",
-                                "url": f"/static/audio/{audio_id}.wav",
-                            }))
-
-                        await ws.send_text(json.dumps({
-                            "type": "assistant_end",
-                            "content": event.text,
-                        }))
-
-                        logger.info(
-                            "[%s] Assistant turn completed",
-                            session_id,
-                        )
+                            await send(ws, {
+                                "type": "assistant_state",
+                                "state": event.state,
+                            })
+                            continue
+
+                        # --- SPEECH EVENTS ---
+                        if isinstance(event, AssistantSpeechEvent):
+                            if not event.is_final:
+                                text_buffer += event.text
+
+                                await send(ws, {
+                                    "type": "assistant_chunk",
+                                    "content": event.text,
+                                })
+
+                                sentences, text_buffer = split_sentences(text_buffer)
+
+                                for sentence in sentences:
+                                    audio_id = uuid.uuid4().hex
+                                    audio_path = AUDIO_DIR / f"{audio_id}.wav"
+
+                                    logger.debug(
+                                        "[%s] TTS synth sentence (%d chars)",
+                                        session_id,
+                                        len(sentence),
+                                    )
+
+                                    tts_start = time.perf_counter()
+                                    await synthesize(sentence, audio_path)
+
+                                    logger.debug(
+                                        "[%s] TTS complete (%.2f ms)",
+                                        session_id,
+                                        (time.perf_counter() - tts_start) * 1000,
+                                    )
+
+                                    if first_audio:
+                                        first_audio = False
+                                        metrics.TIME_TO_FIRST_AUDIO.observe(time.perf_counter() - received_ts)
+
+                                    await send(ws, {
+                                        "type": "assistant_audio",
+                                        "url": f"/static/audio/{audio_id}.wav",
+                                    })
+
+                            else:
+                                if text_buffer.strip():
+                                    audio_id = uuid.uuid4().hex
+                                    audio_path = AUDIO_DIR / f"{audio_id}.wav"
+
+                                    logger.debug(
+                                        "[%s] TTS final fragment (%d chars)",
+                                        session_id,
+                                        len(text_buffer),
+                                    )
+
+                                    await synthesize(text_buffer, audio_path, **{"tts.final": True})
+
+                                    if first_audio:
+                                        first_audio = False
+                                        metrics.TIME_TO_FIRST_AUDIO.observe(time.perf_counter() - received_ts)
+
+                                    await send(ws, {
+                                        "type": "assistant_audio",
+                                        "url": f"/static/audio/{audio_id}.wav",
+                                    })
+
+                                await send(ws, {
+                                    "type": "assistant_end",
+                                    "content": event.text,
+                                })
+
+                                logger.info(
+                                    "[%s] Assistant turn completed",
+                                    session_id,
+                                )
+            finally:
+                unbind_log_context(log_token)
 
     except WebSocketDisconnect:
         logger.info(
@@ -183,9 +252,33 @@ async def websocket_endpoint(ws: WebSocket):
         logger.exception("[%s] WebSocket handler crashed", session_id)
 
     finally:
+        metrics.ACTIVE_SESSIONS.dec()
         logger.debug("[%s] WebSocket cleanup complete", session_id)
 
 
+@app.on_event("startup")
+async def startup():
+    asyncio.get_running_loop().set_default_executor(blocking_executor)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    tts_executor.shutdown(wait=True)
+    SummaryWorker.close_shared()
+    MemoryRetention.close_shared()
+    tracer.close()
+    logger.info("Flushing pending database writes")
+    Database.close_shared()
+    # After the database: queued writes update the index from on_done
+    VectorIndex.close_shared()
+    shutdown_logging()
+
+
+@app.get("/metrics")
+async def get_metrics():
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
 @app.get("/")
 async def get_index():
     logger.debug("Serving index.html")
@@ -1,9 +1,36 @@
+import asyncio
 import logging
 
+from app.services.tokens import MESSAGE_OVERHEAD, TokenCounter
+
 logger = logging.getLogger("context_builder")
 
+_MEMORY_HEADER = (
+    "The following information is known about the user "
+    "and should be considered when responding:"
+)
+_SUMMARY_HEADER = "Summary of previous conversation:\n"
+
 
 class ContextBuilder:
+    """
+    Assembles the prompt for a turn.
+
+    With a `budget_tokens`, blocks are packed by priority until the budget
+    is used: current input, system prompt, tool context, summary, memories
+    (best first), history (newest first). `history_limit` / `memory_limit`
+    only bound how many candidates are fetched. Long blocks are trimmed
+    to their share of the budget. Without a budget, everything fetched
+    is included.
+    """
+
+    # Largest share of the budget a single block may take
+    TOOL_SHARE = 0.4
+    SUMMARY_SHARE = 0.25
+    INPUT_SHARE = 0.5
+    MEMORY_LINE_SHARE = 0.1
+    HISTORY_MESSAGE_SHARE = 0.2
+
     def __init__(
         self,
         system_prompt: str,
@@ -12,6 +39,8 @@ class ContextBuilder:
         history_limit: int = 6,
         memory_limit: int = 5,
         summary_store=None,
+        budget_tokens: int | None = None,
+        token_counter: TokenCounter | None = None,
     ):
         self.system_prompt = system_prompt
         self.history_store = history_store
@@ -19,12 +48,15 @@ class ContextBuilder:
         self.history_limit = history_limit
         self.memory_limit = memory_limit
         self.summary_store = summary_store
+        self.budget_tokens = budget_tokens
+        self.tokens = token_counter or TokenCounter()
 
         logger.info(
-            "ContextBuilder initialized (history_limit=%d, memory_limit=%d, summary=%s)",
+            "ContextBuilder initialized (history_limit=%d, memory_limit=%d, summary=%s, budget_tokens=%s)",
             history_limit,
             memory_limit,
             summary_store is not None,
+            budget_tokens,
         )
 
     def build(
@@ -34,27 +66,118 @@ class ContextBuilder:
         tool_context: str | None = None,
     ) -> list[dict]:
         logger.info("[%s] Building context", session_id)
+
+        memories = self.memory_store.get_relevant(
+            query=user_text,
+            limit=self.memory_limit,
+        )
+        summary, summarized_count = (
+            self.summary_store.get_progress(session_id) if self.summary_store else (None, 0)
+        )
+        history_limit = self._history_window(
+            summary,
+            summarized_count,
+            self.history_store.count(session_id) if summary else 0,
+        )
+        history = self.history_store.get_recent(
+            session_id=session_id,
+            limit=history_limit,
+        )
+
+        return self._assemble(
+            session_id, user_text, tool_context, memories, summary, history, history_limit
+        )
+
+    async def build_async(
+        self,
+        session_id: str,
+        user_text: str,
+        tool_context: str | None = None,
+    ) -> list[dict]:
+        """
+        Same as build(), with the three storage reads awaited concurrently.
+        """
+        logger.info("[%s] Building context (async)", session_id)
+
+        memories, (summary, summarized_count), message_count, history = await asyncio.gather(
+            self.memory_store.get_relevant_async(
+                query=user_text,
+                limit=self.memory_limit,
+            ),
+            self.summary_store.get_progress_async(session_id) if self.summary_store else _no_summary(),
+            self.history_store.count_async(session_id),
+            self.history_store.get_recent_async(
+                session_id=session_id,
+                limit=self.history_limit,
+            ),
+        )
+
+        # Fetched before the summary was known, trim to the same window as build()
+        history_limit = self._history_window(summary, summarized_count, message_count)
+        history = history[-history_limit:]
+
+        return self._assemble(
+            session_id, user_text, tool_context, memories, summary, history, history_limit
+        )
+
+    def _history_window(self, summary: str | None, summarized_count: int, message_count: int) -> int:
+        """
+        Without a summary: the last `history_limit` messages. With one: only
+        messages after its high-water mark (not yet folded into it), at least
+        the last exchange and at most `history_limit`.
+        """
+        if not summary:
+            return self.history_limit
+
+        unsummarized = message_count - summarized_count
+        return min(self.history_limit, max(unsummarized, 2))
+
+    def _assemble(
+        self,
+        session_id: str,
+        user_text: str,
+        tool_context: str | None,
+        memories: list[str],
+        summary: str | None,
+        history: list,
+        history_limit: int,
+    ) -> list[dict]:
         logger.debug("[%s] User input len=%d", session_id, len(user_text))
 
-        messages: list[dict] = []
+        budget = self.budget_tokens
+        remaining = budget if budget is not None else float("inf")
+        allocation: dict[str, int] = {}
+
+        def take(name: str, text: str, share: float | None = None) -> str:
+            """
+            Fit one block into what's left (and its share), charge it.
+            """
+            nonlocal remaining
+            if budget is not None:
+                limit = remaining - MESSAGE_OVERHEAD
+                if share is not None:
+                    limit = min(limit, int(budget * share))
+                text = self.tokens.truncate(text, int(limit))
+
+            cost = self.tokens.count(text) + MESSAGE_OVERHEAD if text else 0
+            remaining -= cost
+            allocation[name] = allocation.get(name, 0) + cost
+            return text
 
         # --------------------------------------------------
-        # 1. Base system prompt
+        # 1. Current input and base system prompt (always kept)
+        #
+        # The input is charged first, capped at its share, so a long
+        # system prompt is the one trimmed to fit, never the input.
         # --------------------------------------------------
-        messages.append({
-            "role": "system",
-            "content": self.system_prompt,
-        })
-        logger.debug("[%s] Added base system prompt", session_id)
+        current_input = take("input", user_text, self.INPUT_SHARE)
+        system_prompt = take("system", self.system_prompt)
 
         # --------------------------------------------------
         # 2. Tool-provided context (optional, system-level)
         # --------------------------------------------------
         if tool_context:
-            messages.append({
-                "role": "system",
-                "content": tool_context,
-            })
+            tool_context = take("tool", tool_context, self.TOOL_SHARE)
             logger.info(
                 "[%s] Added tool context (len=%d)",
                 session_id,
@@ -64,12 +187,26 @@ class ContextBuilder:
             logger.debug("[%s] No tool context provided", session_id)
 
         # --------------------------------------------------
-        # 3. Relevant long-term memory
+        # 3. Conversation summary (if present)
         # --------------------------------------------------
-        memories = self.memory_store.get_relevant(
-            query=user_text,
-            limit=self.memory_limit,
-        )
+        if summary:
+            summary = take(
+                "summary",
+                _SUMMARY_HEADER + summary,
+                self.SUMMARY_SHARE,
+            ).removeprefix(_SUMMARY_HEADER)
+            logger.info(
+                "[%s] Added conversation summary (len=%d)",
+                session_id,
+                len(summary),
+            )
+        else:
+            logger.debug("[%s] No conversation summary available", session_id)
+
+        # --------------------------------------------------
+        # 4. Relevant long-term memory (best first)
+        # --------------------------------------------------
+        memory_lines: list[str] = []
 
         if memories:
             logger.info(
@@ -78,54 +215,31 @@ class ContextBuilder:
                 len(memories),
             )
 
-            memory_block = (
-                "The following information is known about the user "
-                "and should be considered when responding:\n"
-            )
+            header_cost = self.tokens.count(_MEMORY_HEADER) + MESSAGE_OVERHEAD
+
             for m in memories:
-                memory_block += f"- {m}\n"
+                line = f"- {m}"
+                if budget is not None:
+                    line = self.tokens.truncate(line, int(budget * self.MEMORY_LINE_SHARE))
 
-            messages.append({
-                "role": "system",
-                "content": memory_block.strip(),
-            })
-        else:
-            logger.debug("[%s] No relevant memories found", session_id)
+                # The header is only paid for once a line fits
+                cost = self.tokens.count(line) + (0 if memory_lines else header_cost)
+                if cost > remaining:
+                    break
 
-        # --------------------------------------------------
-        # 4. Conversation summary (if present)
-        # --------------------------------------------------
-        summary = self.summary_store.get(session_id) if self.summary_store else None
-        if summary:
-            messages.append({
-                "role": "system",
-                "content": (
-                    "Summary of previous conversation:\n"
-                    f"{summary}"
-                ),
-            })
-            logger.info(
-                "[%s] Added conversation summary (len=%d)",
-                session_id,
-                len(summary),
-            )
+                remaining -= cost
+                allocation["memories"] = allocation.get("memories", 0) + cost
+                memory_lines.append(line)
         else:
-            logger.debug("[%s] No conversation summary available", session_id)
+            logger.debug("[%s] No relevant memories found", session_id)
 
         # --------------------------------------------------
-        # 5. Recent user history (deduplicated)
+        # 5. Recent user history (deduplicated, newest first)
         # --------------------------------------------------
-        history_limit = 2 if summary else self.history_limit
-
-        history = self.history_store.get_recent(
-            session_id=session_id,
-            limit=history_limit,
-        )
-
-        added_history = 0
+        history_messages: list[str] = []
         seen = set()
 
-        for row in history:
+        for row in reversed(history):
             if row["role"] != "user":
                 continue
 
@@ -141,33 +255,55 @@ class ContextBuilder:
                 logger.debug("[%s] Skipping current input from history", session_id)
                 continue
 
-            seen.add(content)
-            added_history += 1
+            if budget is not None:
+                content = self.tokens.truncate(content, int(budget * self.HISTORY_MESSAGE_SHARE))
+            cost = self.tokens.count(content) + MESSAGE_OVERHEAD
+            if cost > remaining:
+                break
 
-            messages.append({
-                "role": "user",
-                "content": content,
-            })
+            seen.add(row["content"].strip())
+            remaining -= cost
+            allocation["history"] = allocation.get("history", 0) + cost
+            history_messages.append(content)
+
+        history_messages.reverse()
 
         logger.info(
             "[%s] Added %d history messages (limit=%d)",
             session_id,
-            added_history,
+            len(history_messages),
             history_limit,
         )
 
         # --------------------------------------------------
-        # 6. Current user input (always last)
+        # 6. Assemble in prompt order (current input last)
         # --------------------------------------------------
-        messages.append({
-            "role": "user",
-            "content": user_text,
-        })
+        messages: list[dict] = [{"role": "system", "content": system_prompt}]
+
+        if tool_context:
+            messages.append({"role": "system", "content": tool_context})
+
+        if memory_lines:
+            messages.append({
+                "role": "system",
+                "content": _MEMORY_HEADER + "\n" + "\n".join(memory_lines),
+            })
+
+        if summary:
+            messages.append({"role": "system", "content": _SUMMARY_HEADER + summary})
 
-        logger.debug(
-            "[%s] Final context built (total_messages=%d)",
+        messages += [{"role": "user", "content": content} for content in history_messages]
+        messages.append({"role": "user", "content": current_input})
+
+        logger.info(
+            "[%s] Token allocation: %s total=%d budget=%s",
             session_id,
-            len(messages),
+            " ".join(f"{name}={tokens}" for name, tokens in allocation.items()),
+            sum(allocation.values()),
+            budget,
         )
 
         return messages
+
+async def _no_summary():
+    return None, 0
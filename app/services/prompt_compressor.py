@@ -0,0 +1,183 @@
+import logging
+import re
+import time
+import zlib
+
+import numpy as np
+
+from app.services.tokens import TokenCounter
+
+logger = logging.getLogger("prompt_compressor")
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+_TOKEN_RE = re.compile(r"\b\w+\b")
+_WHITESPACE = re.compile(r"[ \t\r\f\v]+")
+
+# Web/tool boilerplate that never helps an answer
+_BOILERPLATE = re.compile(
+    r"(accept (all )?cookies|cookie (policy|settings)|all rights reserved|"
+    r"subscribe to (our|the) newsletter|sign up for|click here|read more|"
+    r"terms of (use|service)|privacy policy|advertisement|share this)",
+    re.IGNORECASE,
+)
+
+
+class PromptCompressor:
+    """
+    Extractive, LLM-free prompt compression.
+
+    Runs on the built messages before they go to the LLM. The base system
+    prompt and the current input are never touched; every other block above
+    `min_tokens` is reduced to about `target_ratio` of its tokens:
+    whitespace collapsed, boilerplate and near-duplicate sentences dropped,
+    then the sentences most relevant to the user's input are kept
+    (TF-IDF weighted hashed term vectors, cosine to the query) in their
+    original order. A leading "Header:" line is always kept.
+    """
+
+    DIM = 4096
+    DUPLICATE_SIMILARITY = 0.9
+    # Small preference for earlier sentences, breaks ties when nothing matches
+    POSITION_WEIGHT = 0.05
+
+    def __init__(
+        self,
+        target_ratio: float = 0.6,
+        min_tokens: int = 48,
+        token_counter: TokenCounter | None = None,
+    ):
+        self.target_ratio = target_ratio
+        self.min_tokens = min_tokens
+        self.tokens = token_counter or TokenCounter()
+
+        # Metrics
+        self.tokens_in = 0
+        self.tokens_out = 0
+
+        logger.info(
+            "PromptCompressor initialized (target_ratio=%.2f, min_tokens=%d)",
+            target_ratio,
+            min_tokens,
+        )
+
+    def compress(self, messages: list[dict], user_text: str) -> list[dict]:
+        if len(messages) <= 2:
+            return messages
+
+        start = time.perf_counter()
+        query = self._term_frequencies([_terms(user_text)])
+
+        before = after = 0
+        compressed = [messages[0]]
+
+        for message in messages[1:-1]:
+            content = message["content"]
+            tokens = self.tokens.count(content)
+            before += tokens
+
+            if tokens >= self.min_tokens:
+                content = self._compress_block(content, query, tokens)
+
+            after += self.tokens.count(content)
+            compressed.append({**message, "content": content})
+
+        compressed.append(messages[-1])
+
+        self.tokens_in += before
+        self.tokens_out += after
+
+        logger.info(
+            "Prompt compressed %d -> %d tokens (%.0f%%) in %.2f ms",
+            before,
+            after,
+            100 * after / before if before else 100,
+            (time.perf_counter() - start) * 1000,
+        )
+        return compressed
+
+    def stats(self) -> dict:
+        return {
+            "tokens_in": self.tokens_in,
+            "tokens_out": self.tokens_out,
+            "ratio": self.tokens_out / self.tokens_in if self.tokens_in else 1.0,
+        }
+
+    # --------------------------------------------------
+    # Internals
+    # --------------------------------------------------
+
+    def _compress_block(self, text: str, query: np.ndarray, tokens: int) -> str:
+        header = ""
+        first, sep, rest = text.partition("\n")
+        if sep and first.rstrip().endswith(":"):
+            header, text = first.strip(), rest
+
+        sentences = [
+            s for s in (
+                _WHITESPACE.sub(" ", part).strip()
+                for part in _SENTENCE_SPLIT.split(text)
+            )
+            if s and not _BOILERPLATE.search(s)
+        ]
+        if not sentences:
+            return header
+
+        # IDF over this block's sentences, applied to the query too
+        tf = self._term_frequencies([_terms(s) for s in sentences])
+        idf = np.log((len(sentences) + 1) / (np.count_nonzero(tf, axis=0) + 1)) + 1.0
+
+        vectors = _normalize(tf * idf)
+        keep = self._deduplicate(vectors)
+
+        relevance = vectors @ _normalize(query * idf)[0]
+        position = 1.0 - np.arange(len(sentences)) / len(sentences)
+        scores = relevance + self.POSITION_WEIGHT * position
+
+        target = max(int(tokens * self.target_ratio), 1)
+        chosen: list[int] = []
+        used = self.tokens.count(header) if header else 0
+
+        for i in np.argsort(-scores, kind="stable"):
+            if not keep[i]:
+                continue
+            cost = self.tokens.count(sentences[i])
+            if chosen and used + cost > target:
+                continue
+            chosen.append(int(i))
+            used += cost
+
+        chosen.sort()
+        body = " ".join(sentences[i] for i in chosen)
+        return f"{header}\n{body}" if header else body
+
+    def _deduplicate(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        Mask of sentences to keep: later near-duplicates of an earlier
+        sentence are dropped.
+        """
+        similarity = vectors @ vectors.T
+        np.fill_diagonal(similarity, 0.0)
+        earlier = np.tril(similarity, k=-1)
+        return earlier.max(axis=1, initial=0.0) < self.DUPLICATE_SIMILARITY
+
+    def _term_frequencies(self, documents: list[list[int]]) -> np.ndarray:
+        """
+        Hashed term counts, one row per document.
+        """
+        matrix = np.zeros((len(documents), self.DIM), dtype=np.float32)
+        for row, terms in enumerate(documents):
+            if terms:
+                np.add.at(matrix[row], terms, 1.0)
+        return matrix
+
+
+def _terms(text: str) -> list[int]:
+    return [
+        zlib.crc32(term.encode()) % PromptCompressor.DIM
+        for term in _TOKEN_RE.findall(text.lower())
+    ]
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return (matrix / np.maximum(norms, 1e-9)).astype(np.float32)
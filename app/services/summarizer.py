@@ -1,37 +1,241 @@
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.tokens import (
+    MESSAGE_OVERHEAD,
+    estimate_message_tokens,
+    estimate_tokens,
+    truncate_to_tokens,
+)
+
+logger = logging.getLogger("summarizer")
+
+_RULES = (
+    "Rules:\n"
+    "- Summarize ONLY information that was explicitly stated.\n"
+    "- Do NOT add new facts, advice, ideas, or interpretations.\n"
+    "- Do NOT infer intentions or preferences unless explicitly stated.\n"
+    "- Do NOT include opinions, tone, or conversational filler.\n"
+    "- Do NOT include instructions, recipes, recommendations, or steps.\n"
+    "- Do NOT include internal reasoning, explanations, or meta-commentary.\n"
+    "- Do NOT include markup, tags, or special tokens.\n"
+    "- Use plain, neutral English.\n"
+    "- Write in complete sentences.\n"
+    "- Keep the summary concise (3–6 sentences).\n"
+    "- The summary must remain correct even if read out of context.\n\n"
+    "Output only the summary text."
+)
+
+_SENTENCE_END = re.compile(r"[.!?](?=\s|$)")
+
+
 class HistorySummarizer:
-    def __init__(self, llm):
+    """
+    Conversation summarizer.
+
+    Inputs that fit `chunk_tokens` are summarized in one call. Longer ones
+    go through map-reduce: the messages are cut into token-budgeted
+    chunks, chunks are summarized concurrently (at most `max_concurrency`
+    calls in flight), and the partial summaries are merged, recursively
+    if they still don't fit.
+
+    Chunk summaries aren't cached: rolling summarization only ever passes
+    messages that haven't been summarized yet, so no chunk repeats.
+    """
+
+    def __init__(
+        self,
+        llm,
+        max_chars: int = 1200,
+        chunk_tokens: int = 1500,
+        max_concurrency: int = 2,
+    ):
         self.llm = llm
+        self.max_chars = max_chars
+        self.chunk_tokens = chunk_tokens
+        self.max_concurrency = max_concurrency
 
     def summarize(self, messages: list[dict]) -> str:
+        messages = self._conversation(messages)
+
+        if estimate_message_tokens(messages) <= self.chunk_tokens:
+            return self._summarize_chunk(messages)
+
+        return self._reduce(self._map(messages))
+
+    def fold(self, summary: str, messages: list[dict]) -> str:
+        """
+        Update an existing summary with messages that came after it.
+        Only the new messages are sent, not the whole conversation.
+        """
+        messages = self._conversation(messages)
+
+        if estimate_message_tokens(messages) > self.chunk_tokens:
+            partials = self._map(messages)
+            return self._reduce([summary] + partials)
+
+        prompt = [
+            {
+                "role": "system",
+                "content": (
+                    "You are updating a factual summary of a conversation.\n"
+                    "Merge the new messages into the existing summary. Keep earlier "
+                    "facts unless the new messages contradict them, and drop "
+                    "details that no longer matter.\n\n"
+                    + _RULES
+                )
+            },
+            {
+                "role": "system",
+                "content": f"Existing summary:\n{summary}",
+            },
+        ]
+
+        return self._cap(self._complete(prompt + messages))
+
+    # --------------------------------------------------
+    # Map-reduce
+    # --------------------------------------------------
+
+    def _chunks(self, messages: list[dict]) -> list[list[dict]]:
+        """
+        Greedy token-budgeted chunks on message boundaries. Oversized
+        messages are cut down to fit a chunk on their own.
+        """
+        chunks: list[list[dict]] = []
+        current: list[dict] = []
+        used = 0
+        budget = self.chunk_tokens
+
+        for m in messages:
+            cost = estimate_tokens(m["content"]) + MESSAGE_OVERHEAD
+
+            if cost > budget:
+                m = {"role": m["role"], "content": truncate_to_tokens(m["content"], budget - MESSAGE_OVERHEAD)}
+                cost = budget
+
+            if current and used + cost > budget:
+                chunks.append(current)
+                current, used = [], 0
+
+            current.append(m)
+            used += cost
+
+        if current:
+            chunks.append(current)
+
+        return chunks
+
+    def _map(self, messages: list[dict]) -> list[str]:
+        chunks = self._chunks(messages)
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_concurrency, len(chunks)),
+            thread_name_prefix="summary-map",
+        ) as pool:
+            partials = list(pool.map(self._summarize_chunk, chunks))
+
+        logger.info(
+            "Summarized %d messages in %d chunks",
+            len(messages),
+            len(chunks),
+        )
+        return partials
+
+    def _reduce(self, partials: list[str]) -> str:
+        """
+        Merge partial summaries, in groups that fit the budget.
+        """
+        while len(partials) > 1:
+            groups: list[list[str]] = [[]]
+            used = 0
+
+            for partial in partials:
+                cost = estimate_tokens(partial) + MESSAGE_OVERHEAD
+                if groups[-1] and used + cost > self.chunk_tokens:
+                    groups.append([])
+                    used = 0
+                groups[-1].append(partial)
+                used += cost
+
+            if len(groups) == len(partials):
+                # Partials too large to pair up, merge everything at once
+                groups = [partials]
+
+            if len(groups) == 1:
+                return self._merge(groups[0])
+
+            with ThreadPoolExecutor(
+                max_workers=min(self.max_concurrency, len(groups)),
+                thread_name_prefix="summary-reduce",
+            ) as pool:
+                partials = list(pool.map(self._merge, groups))
+
+        return self._cap(partials[0])
+
+    def _merge(self, partials: list[str]) -> str:
+        prompt = [
+            {
+                "role": "system",
+                "content": (
+                    "You are merging partial summaries of consecutive parts of one "
+                    "conversation, oldest first, into a single summary.\n\n"
+                    + _RULES
+                )
+            }
+        ]
+        prompt += [
+            {"role": "user", "content": f"Part {i}:\n{partial}"}
+            for i, partial in enumerate(partials, start=1)
+        ]
+        return self._cap(self._complete(prompt))
+
+    def _summarize_chunk(self, messages: list[dict]) -> str:
         prompt = [
             {
                 "role": "system",
                 "content": (
                     "You are generating a factual summary of a conversation.\n\n"
-                    "Rules:\n"
-                    "- Summarize ONLY information that was explicitly stated.\n"
-                    "- Do NOT add new facts, advice, ideas, or interpretations.\n"
-                    "- Do NOT infer intentions or preferences unless explicitly stated.\n"
-                    "- Do NOT include opinions, tone, or conversational filler.\n"
-                    "- Do NOT include instructions, recipes, recommendations, or steps.\n"
-                    "- Do NOT include internal reasoning, explanations, or meta-commentary.\n"
-                    "- Do NOT include markup, tags, or special tokens.\n"
-                    "- Use plain, neutral English.\n"
-                    "- Write in complete sentences.\n"
-                    "- Keep the summary concise (3–6 sentences).\n"
-                    "- The summary must remain correct even if read out of context.\n\n"
-                    "Output only the summary text."
+                    + _RULES
                 )
             }
         ]
 
+        return self._cap(self._complete(prompt + messages))
+
+    # --------------------------------------------------
+    # Helpers
+    # --------------------------------------------------
+
+    def _conversation(self, messages: list[dict]) -> list[dict]:
         # Only include user + assistant messages
-        for m in messages:
-            if m["role"] in ("user", "assistant"):
-                prompt.append(m)
+        return [
+            {"role": m["role"], "content": m["content"]}
+            for m in messages
+            if m["role"] in ("user", "assistant")
+        ]
 
+    def _complete(self, prompt: list[dict]) -> str:
         buffer = ""
         for chunk in self.llm.stream_chat(prompt):
             buffer += chunk
 
         return buffer.strip()
+
+    def _cap(self, summary: str) -> str:
+        """
+        Keep the rolling summary bounded: cut at the last sentence end
+        within max_chars (or hard-cut if there is none in the second half).
+        """
+        if len(summary) <= self.max_chars:
+            return summary
+
+        head = summary[:self.max_chars]
+        ends = [m.end() for m in _SENTENCE_END.finditer(head)]
+
+        if ends and ends[-1] >= self.max_chars // 2:
+            return head[:ends[-1]]
+
+        return head.rstrip()
+
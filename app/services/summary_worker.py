@@ -0,0 +1,162 @@
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger("summary_worker")
+
+_STOP = object()
+
+
+class SummaryWorker:
+    """
+    Runs conversation summarization off the turn's critical path.
+
+    Requests are de-duplicated per session and coalesced: while a session
+    is queued, further requests only replace its job, and a request that
+    arrives while the session is being summarized schedules exactly one
+    re-run. Jobs re-read the session's counters when they run, so one run
+    covers every message that triggered it.
+
+    Jobs call the LLM through a background-priority client, so they yield
+    to user-facing calls (see LLMPriorityGate).
+    """
+
+    _shared: Optional["SummaryWorker"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue()
+
+        # Latest job per queued session, sessions currently running,
+        # and running sessions that got a new request meanwhile
+        self._jobs: Dict[str, Callable[[], None]] = {}
+        self._running: set[str] = set()
+        self._rerun: Dict[str, Callable[[], None]] = {}
+
+        # Metrics
+        self.requested = 0
+        self.coalesced = 0
+        self.completed = 0
+        self.failed = 0
+        self.busy_s = 0.0
+
+        self._thread = threading.Thread(
+            target=self._run,
+            name="summary-worker",
+            daemon=True,
+        )
+        self._thread.start()
+
+        logger.info("SummaryWorker started")
+
+    @classmethod
+    def shared(cls) -> "SummaryWorker":
+        """
+        One worker for the whole process, shared by every session.
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @classmethod
+    def close_shared(cls) -> None:
+        with cls._shared_lock:
+            if cls._shared is not None:
+                cls._shared.close()
+                cls._shared = None
+
+    # --------------------------------------------------
+    # Public API
+    # --------------------------------------------------
+
+    def submit(self, session_id: str, job: Callable[[], None]) -> None:
+        """
+        Request a summarization pass for the session. Never blocks.
+        """
+        with self._lock:
+            self.requested += 1
+
+            if session_id in self._running:
+                if session_id in self._rerun:
+                    self.coalesced += 1
+                self._rerun[session_id] = job
+                return
+
+            if session_id in self._jobs:
+                self.coalesced += 1
+                self._jobs[session_id] = job
+                return
+
+            self._jobs[session_id] = job
+
+        self._queue.put(session_id)
+
+    def close(self) -> None:
+        """
+        Stop after the current job. Queued sessions are dropped; their
+        counters persist, so they are summarized on their next trigger.
+        """
+        if not self._thread.is_alive():
+            return
+
+        with self._lock:
+            dropped = len(self._jobs)
+            self._jobs.clear()
+            self._rerun.clear()
+
+        self._queue.put(_STOP)
+        self._thread.join()
+
+        logger.info("SummaryWorker stopped (dropped=%d, %s)", dropped, self.stats())
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._jobs)
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth,
+            "requested": self.requested,
+            "coalesced": self.coalesced,
+            "completed": self.completed,
+            "failed": self.failed,
+            "busy_ms_avg": self.busy_s / self.completed * 1000 if self.completed else 0.0,
+        }
+
+    # --------------------------------------------------
+    # Worker thread
+    # --------------------------------------------------
+
+    def _run(self) -> None:
+        while True:
+            session_id = self._queue.get()
+            if session_id is _STOP:
+                break
+
+            with self._lock:
+                job = self._jobs.pop(session_id, None)
+                if job is None:
+                    continue
+                self._running.add(session_id)
+
+            start = time.perf_counter()
+            try:
+                job()
+                self.completed += 1
+            except Exception:
+                self.failed += 1
+                logger.exception("[%s] Background summarization failed", session_id)
+            self.busy_s += time.perf_counter() - start
+
+            with self._lock:
+                self._running.discard(session_id)
+                rerun = self._rerun.pop(session_id, None)
+                if rerun is not None:
+                    self._jobs[session_id] = rerun
+
+            if rerun is not None:
+                self._queue.put(session_id)
@@ -0,0 +1,98 @@
+import logging
+import math
+import re
+from functools import lru_cache
+from typing import Callable
+
+logger = logging.getLogger("tokens")
+
+# Rough chars-per-token for English text with BPE tokenizers
+CHARS_PER_TOKEN = 4.0
+
+# Chat template overhead per message (role markers, separators)
+MESSAGE_OVERHEAD = 4
+
+
+@lru_cache(maxsize=8192)
+def estimate_tokens(text: str) -> int:
+    """
+    Fast token estimate, no tokenizer needed.
+    Takes the larger of a character- and a word-based guess, so both
+    long words and punctuation-heavy text are counted conservatively.
+    """
+    if not text:
+        return 0
+
+    by_chars = len(text) / CHARS_PER_TOKEN
+    by_words = len(text.split()) * 1.3
+    return math.ceil(max(by_chars, by_words))
+
+
+def estimate_message_tokens(messages: list[dict]) -> int:
+    return sum(estimate_tokens(m["content"]) + MESSAGE_OVERHEAD for m in messages)
+
+
+_SENTENCE_END = re.compile(r"[.!?](?=\s|$)")
+
+
+def truncate_to_tokens(text: str, tokens: int, count: Callable[[str], int] = estimate_tokens) -> str:
+    """
+    Cut `text` to fit `tokens`, at the last sentence end when there is one
+    in the kept part's second half, else at a word boundary.
+    """
+    if tokens <= 0:
+        return ""
+    if count(text) <= tokens:
+        return text
+
+    # Start from the proportional cut and shrink until it fits
+    head = text[: max(int(len(text) * tokens / count(text)), 1)]
+    while head and count(head) > tokens:
+        head = head[: int(len(head) * 0.9)]
+
+    ends = [m.end() for m in _SENTENCE_END.finditer(head)]
+    if ends and ends[-1] >= len(head) // 2:
+        return head[: ends[-1]]
+
+    cut = head.rfind(" ")
+    return (head[:cut] if cut > len(head) // 2 else head).rstrip() + "…"
+
+
+class TokenCounter:
+    """
+    Cached token counts for prompt budgeting.
+
+    Uses the model's own tokenizer when `tokenizer` names one and the
+    optional `tokenizers` package is installed, else the fast estimate.
+    """
+
+    def __init__(self, tokenizer: str | None = None, cache_size: int = 8192):
+        self.exact = False
+        encode = None
+
+        if tokenizer:
+            try:
+                from tokenizers import Tokenizer
+
+                model = Tokenizer.from_pretrained(tokenizer)
+
+                def encode(text: str) -> int:
+                    return len(model.encode(text, add_special_tokens=False).ids)
+
+                self.exact = True
+            except Exception:
+                logger.warning(
+                    "Tokenizer '%s' unavailable, using token estimate",
+                    tokenizer,
+                    exc_info=True,
+                )
+
+        self.count = lru_cache(maxsize=cache_size)(encode or estimate_tokens)
+
+        logger.info("TokenCounter ready (exact=%s)", self.exact)
+
+    def count_messages(self, messages: list[dict]) -> int:
+        return sum(self.count(m["content"]) + MESSAGE_OVERHEAD for m in messages)
+
+    def truncate(self, text: str, tokens: int) -> str:
+        return truncate_to_tokens(text, tokens, self.count)
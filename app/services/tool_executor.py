@@ -5,6 +5,7 @@ from typing import Generator, Optional
 from app.core.actions import Action
 from app.core.events import AssistantStateEvent
 from app.core.assistant_state import AssistantState
+from app.observability import metrics
 
 logger = logging.getLogger("tool_executor")
 
@@ -71,6 +72,7 @@ class ToolExecutor:
             return context
 
         except Exception:
+            metrics.TOOL_FAILURES.labels(action.type).inc()
             logger.exception(
                 "Tool '%s' failed during execution",
                 action.type,
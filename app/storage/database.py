@@ -1,44 +1,267 @@
 import sqlite3
+import asyncio
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
 
+from app.observability import metrics
+from app.storage.migrations import migrate
+from app.storage.pool import ConnectionPool, ReadWriteLock
+from app.storage.writer import BackgroundWriter, WriteCommand
+
+logger = logging.getLogger("database")
+
+_READ_LATENCY = metrics.DB_QUERY_LATENCY.labels("read")
+_WRITE_LATENCY = metrics.DB_QUERY_LATENCY.labels("write")
 
 
 class Database:
-    def __init__(self, path: str = "data/assistant.db"):
-        Path("data").mkdir(exist_ok=True)
-        self.conn = sqlite3.connect(path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
-        self._init_schema()
-
-    def _init_schema(self):
-        cursor = self.conn.cursor()
-
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS chat_history (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            session_id TEXT NOT NULL,
-            role TEXT NOT NULL,
-            content TEXT NOT NULL,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+    """
+    Storage entry point for all stores.
+
+    Reads go through `read()` (a pooled read-only connection), writes
+    through `submit_write()` (the single writer connection, inline or
+    via the background writer). Stores never hold connections themselves.
+
+    Async callers use `run()`, which executes a blocking store call on
+    the database's own thread pool instead of the event loop's default
+    executor.
+    """
+
+    # Applied to every connection. WAL lets readers run alongside the
+    # writer; synchronous=NORMAL only fsyncs at checkpoints in WAL mode.
+    PRAGMAS = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,       # KiB (negative), i.e. 16 MB page cache
+        "mmap_size": 268435456,     # 256 MB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,       # ms
+    }
+
+    _shared: Dict[str, "Database"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        path: str = "data/assistant.db",
+        pragmas: dict | None = None,
+        write_behind: bool = False,
+        commit_window_ms: float = 20.0,
+        max_batch: int = 256,
+        readers: int = 4,
+        cached_statements: int = 256,
+        async_workers: int | None = None,
+    ):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.pragmas = {**self.PRAGMAS, **(pragmas or {})}
+
+        self.pool = ConnectionPool(
+            path,
+            self.pragmas,
+            readers=readers,
+            cached_statements=cached_statements,
         )
-        """)
-
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS memory (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            category TEXT,
-            content TEXT NOT NULL,
-            importance INTEGER DEFAULT 1,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+
+        with self.pool.writer() as conn:
+            self.schema_version = migrate(conn)
+
+        self.pool.open_readers()
+        self.has_fts = self._table_exists("memory_fts")
+
+        # Commits take it exclusively, reads shared: a read sees the DB
+        # and the stores' pending-write overlays from the same instant.
+        self.commit_lock = ReadWriteLock()
+        self._local = threading.local()
+
+        self.writer = (
+            BackgroundWriter(self, window_ms=commit_window_ms, max_batch=max_batch)
+            if write_behind
+            else None
         )
-        """)
 
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS conversation_summary (
-            session_id TEXT PRIMARY KEY,
-            summary TEXT NOT NULL,
-            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        # Sized to the reader pool by default: more threads would only
+        # queue on reader checkout
+        self.executor = ThreadPoolExecutor(
+            max_workers=async_workers or max(readers, 1),
+            thread_name_prefix="db",
         )
-        """)
 
-        self.conn.commit()
+        logger.debug(
+            "Database ready (path=%s, schema_version=%d, fts=%s, write_behind=%s)",
+            path,
+            self.schema_version,
+            self.has_fts,
+            write_behind,
+        )
+
+    @classmethod
+    def shared(cls, path: str = "data/assistant.db", **kwargs) -> "Database":
+        """
+        One Database (pool and writer thread) per file for the whole process.
+        Options only apply when the instance is first created.
+        """
+        key = str(Path(path).resolve())
+        with cls._shared_lock:
+            db = cls._shared.get(key)
+            if db is None:
+                db = cls(path, **kwargs)
+                cls._shared[key] = db
+            return db
+
+    @classmethod
+    def shared_queue_depth(cls) -> int:
+        """
+        Calls waiting for a thread on the shared databases' executors.
+        """
+        with cls._shared_lock:
+            dbs = list(cls._shared.values())
+        return sum(int(metrics.executor_queue_depth(db.executor)) for db in dbs)
+
+    @classmethod
+    def close_shared(cls) -> None:
+        with cls._shared_lock:
+            for db in cls._shared.values():
+                db.close()
+            cls._shared.clear()
+
+    # --------------------------------------------------
+    # Reads
+    # --------------------------------------------------
+
+    @contextmanager
+    def read(self) -> Iterator[sqlite3.Connection]:
+        """
+        Check out a reader connection for this thread (re-entrant).
+        Also hold it while reading a store's pending-write overlay.
+        """
+        if getattr(self._local, "depth", 0):
+            self._local.depth += 1
+            try:
+                yield self._local.conn
+            finally:
+                self._local.depth -= 1
+            return
+
+        start = time.perf_counter()
+        with self.pool.reader() as conn, self.commit_lock.shared():
+            self._local.conn = conn
+            self._local.depth = 1
+            try:
+                yield conn
+            finally:
+                self._local.depth = 0
+                self._local.conn = None
+                _READ_LATENCY.observe(time.perf_counter() - start)
+
+    def consistent_read(self):
+        """
+        Hold off commits without checking out a connection,
+        for stores touching only their pending-write overlay.
+        """
+        if getattr(self._local, "depth", 0):
+            return nullcontext()
+        return self.commit_lock.shared()
+
+    # --------------------------------------------------
+    # Writes
+    # --------------------------------------------------
+
+    def submit_write(
+        self,
+        command: WriteCommand,
+        on_done: Optional[Callable[[], None]] = None,
+        on_commit: Optional[Callable[[], None]] = None,
+    ) -> Future:
+        """
+        Run `command(conn)` in a write transaction.
+
+        With write-behind enabled it is queued for the writer thread and
+        the returned future resolves after the group commit. Otherwise it
+        runs and commits inline, and errors propagate to the caller.
+
+        `on_done` runs under the exclusive commit lock once the command is
+        settled either way; `on_commit` runs just before it, only if the
+        command was committed.
+        """
+        if self.writer is not None:
+            return self.writer.submit(command, on_done, on_commit)
+
+        future: Future = Future()
+        start = time.perf_counter()
+
+        with self.pool.writer() as conn:
+            try:
+                conn.execute("BEGIN")
+                result = command(conn)
+            except Exception:
+                conn.execute("ROLLBACK")
+                if on_done is not None:
+                    with self.commit_lock.exclusive():
+                        on_done()
+                raise
+
+            with self.commit_lock.exclusive():
+                conn.execute("COMMIT")
+                if on_commit is not None:
+                    on_commit()
+                if on_done is not None:
+                    on_done()
+
+        _WRITE_LATENCY.observe(time.perf_counter() - start)
+        future.set_result(result)
+        return future
+
+    # --------------------------------------------------
+    # Async
+    # --------------------------------------------------
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Await a blocking storage call on the database thread pool.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor,
+            functools.partial(fn, *args, **kwargs),
+        )
+
+    # --------------------------------------------------
+    # Lifecycle
+    # --------------------------------------------------
+
+    def open_connection(self) -> sqlite3.Connection:
+        """
+        Extra read-write connection outside the pool, for maintenance tools.
+        """
+        return self.pool.connect()
+
+    def flush(self) -> None:
+        if self.writer is not None:
+            self.writer.flush()
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
+        if self.writer is not None:
+            self.writer.close()
+        self.pool.close()
+
+    def stats(self) -> dict:
+        stats = {"pool": self.pool.stats()}
+        if self.writer is not None:
+            stats["writer"] = self.writer.stats()
+        return stats
+
+    def _table_exists(self, name: str) -> bool:
+        with self.pool.reader() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = ?",
+                (name,),
+            ).fetchone()
+        return row is not None
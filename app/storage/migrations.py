@@ -0,0 +1,262 @@
+import logging
+import sqlite3
+from dataclasses import dataclass
+from typing import Callable, List
+
+logger = logging.getLogger("migrations")
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    apply: Callable[[sqlite3.Connection], None]
+
+
+# ============================================================
+# Steps
+#
+# Databases created before versioning already contain some of these
+# objects, so every step must be idempotent.
+# ============================================================
+
+def _base_schema(conn: sqlite3.Connection) -> None:
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS chat_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id TEXT NOT NULL,
+        role TEXT NOT NULL,
+        content TEXT NOT NULL,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS memory (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        category TEXT,
+        content TEXT NOT NULL,
+        importance INTEGER DEFAULT 1,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS conversation_summary (
+        session_id TEXT PRIMARY KEY,
+        summary TEXT NOT NULL,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+
+def _memory_fts(conn: sqlite3.Connection) -> None:
+    """
+    Full-text index over memory.content, kept in sync by triggers.
+    Existing rows are backfilled when the index is first created.
+    """
+    exists = _table_exists(conn, "memory_fts")
+
+    try:
+        conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS memory_fts USING fts5(
+            content,
+            content='memory',
+            content_rowid='id'
+        )
+        """)
+    except sqlite3.OperationalError:
+        logger.warning("SQLite built without FTS5, memory retrieval falls back to full scan")
+        return
+
+    conn.execute("""
+    CREATE TRIGGER IF NOT EXISTS memory_fts_ai AFTER INSERT ON memory BEGIN
+        INSERT INTO memory_fts (rowid, content) VALUES (new.id, new.content);
+    END
+    """)
+
+    conn.execute("""
+    CREATE TRIGGER IF NOT EXISTS memory_fts_ad AFTER DELETE ON memory BEGIN
+        INSERT INTO memory_fts (memory_fts, rowid, content)
+        VALUES ('delete', old.id, old.content);
+    END
+    """)
+
+    conn.execute("""
+    CREATE TRIGGER IF NOT EXISTS memory_fts_au AFTER UPDATE OF content ON memory BEGIN
+        INSERT INTO memory_fts (memory_fts, rowid, content)
+        VALUES ('delete', old.id, old.content);
+        INSERT INTO memory_fts (rowid, content) VALUES (new.id, new.content);
+    END
+    """)
+
+    if not exists:
+        logger.info("Building memory full-text index")
+        conn.execute("INSERT INTO memory_fts (memory_fts) VALUES ('rebuild')")
+
+
+def _memory_updated_at(conn: sqlite3.Connection) -> None:
+    _ensure_column(conn, "memory", "updated_at", "DATETIME")
+
+
+def _memory_retention(conn: sqlite3.Connection) -> None:
+    _ensure_column(conn, "memory", "last_used_at", "DATETIME")
+    _ensure_column(conn, "memory", "hit_count", "INTEGER DEFAULT 0")
+
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS memory_archive (
+        id INTEGER PRIMARY KEY,
+        category TEXT,
+        content TEXT NOT NULL,
+        importance INTEGER,
+        created_at DATETIME,
+        updated_at DATETIME,
+        last_used_at DATETIME,
+        hit_count INTEGER,
+        archived_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+
+def _query_indexes(conn: sqlite3.Connection) -> None:
+    # ChatHistoryStore.get_recent: WHERE session_id = ? ORDER BY id DESC LIMIT ?
+    # Seeks straight to the session's newest rows instead of scanning the table.
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_chat_history_session
+    ON chat_history (session_id, id)
+    """)
+
+    # MemoryStore importance fallback: WHERE importance >= 2
+    # ORDER BY importance DESC, id DESC LIMIT ?
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_memory_importance
+    ON memory (importance, id)
+    """)
+
+
+def _summary_progress(conn: sqlite3.Connection) -> None:
+    # Number of session messages folded into the summary (rolling summarization).
+    # Existing one-shot summaries are treated as up to date.
+    if _ensure_column(conn, "conversation_summary", "summarized_count", "INTEGER NOT NULL DEFAULT 0"):
+        conn.execute("""
+        UPDATE conversation_summary
+        SET summarized_count = (
+            SELECT COUNT(*)
+            FROM chat_history
+            WHERE chat_history.session_id = conversation_summary.session_id
+        )
+        """)
+
+
+def _memory_changes(conn: sqlite3.Connection) -> None:
+    # Change counters for in-process memory indexes: `inserted` counts new
+    # rows, `modified` counts deletes and content / importance updates.
+    # Retention hit tracking (hit_count, last_used_at) doesn't count.
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS memory_changes (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        inserted INTEGER NOT NULL DEFAULT 0,
+        modified INTEGER NOT NULL DEFAULT 0
+    )
+    """)
+    conn.execute("INSERT OR IGNORE INTO memory_changes (id) VALUES (1)")
+
+    conn.execute("""
+    CREATE TRIGGER IF NOT EXISTS memory_changes_ai AFTER INSERT ON memory BEGIN
+        UPDATE memory_changes SET inserted = inserted + 1 WHERE id = 1;
+    END
+    """)
+
+    conn.execute("""
+    CREATE TRIGGER IF NOT EXISTS memory_changes_ad AFTER DELETE ON memory BEGIN
+        UPDATE memory_changes SET modified = modified + 1 WHERE id = 1;
+    END
+    """)
+
+    conn.execute("""
+    CREATE TRIGGER IF NOT EXISTS memory_changes_au AFTER UPDATE OF content, importance ON memory BEGIN
+        UPDATE memory_changes SET modified = modified + 1 WHERE id = 1;
+    END
+    """)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "base schema", _base_schema),
+    Migration(2, "memory full-text index", _memory_fts),
+    Migration(3, "memory.updated_at", _memory_updated_at),
+    Migration(4, "memory retention columns and archive", _memory_retention),
+    Migration(5, "query indexes", _query_indexes),
+    Migration(6, "conversation_summary.summarized_count", _summary_progress),
+    Migration(7, "memory change counters", _memory_changes),
+]
+
+
+# ============================================================
+# Runner
+# ============================================================
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """
+    Apply pending migrations in order, each in its own transaction.
+    Returns the resulting schema version.
+    """
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    conn.commit()
+
+    (current,) = conn.execute(
+        "SELECT COALESCE(MAX(version), 0) FROM schema_version"
+    ).fetchone()
+
+    for migration in MIGRATIONS:
+        if migration.version <= current:
+            continue
+
+        logger.info(
+            "Applying migration %d: %s",
+            migration.version,
+            migration.name,
+        )
+
+        try:
+            conn.execute("BEGIN")
+            migration.apply(conn)
+            conn.execute(
+                "INSERT INTO schema_version (version, name) VALUES (?, ?)",
+                (migration.version, migration.name),
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logger.exception("Migration %d failed", migration.version)
+            raise
+
+        current = migration.version
+
+    return current
+
+
+def _table_exists(conn: sqlite3.Connection, name: str) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = ?",
+        (name,),
+    ).fetchone()
+    return row is not None
+
+
+def _ensure_column(conn: sqlite3.Connection, table: str, column: str, definition: str) -> bool:
+    """
+    Add the column if missing. Returns True when it was added.
+    """
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if column in columns:
+        return False
+
+    logger.info("Adding column %s.%s", table, column)
+    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    return True
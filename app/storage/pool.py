@@ -0,0 +1,232 @@
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+logger = logging.getLogger("db_pool")
+
+
+class ReadWriteLock:
+    """
+    Many readers or one writer. Writers are preferred: once a writer
+    waits, new readers queue behind it so commits can't be starved.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def shared(self) -> Iterator[None]:
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+class _Contention:
+    """
+    Checkout counters for one connection class (reader or writer).
+    """
+
+    def __init__(self):
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_s = 0.0
+        self.max_wait_s = 0.0
+
+    def record(self, waited_s: float, blocked: bool) -> None:
+        self.checkouts += 1
+        if blocked:
+            self.waits += 1
+            self.wait_s += waited_s
+            self.max_wait_s = max(self.max_wait_s, waited_s)
+
+    def stats(self) -> dict:
+        return {
+            "checkouts": self.checkouts,
+            "waits": self.waits,
+            "wait_ms_total": self.wait_s * 1000,
+            "wait_ms_max": self.max_wait_s * 1000,
+        }
+
+
+class ConnectionPool:
+    """
+    One writer connection plus N read-only connections.
+
+    - writer(): exclusive checkout of the single write connection
+      (autocommit mode, callers issue BEGIN / COMMIT)
+    - reader(): a read-only WAL connection. Checkouts are per thread and
+      re-entrant, so nested reads on one thread reuse the same connection.
+
+    Every connection caches prepared statements (`cached_statements`).
+    In-memory databases can't be shared between connections, so there
+    reads go through the writer connection.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        pragmas: dict,
+        readers: int = 4,
+        cached_statements: int = 256,
+    ):
+        self.path = path
+        self.pragmas = pragmas
+        self.cached_statements = cached_statements
+
+        self._writer_conn = self._connect(path, read_only=False)
+        self._writer_lock = threading.RLock()
+
+        self.in_memory = path == ":memory:"
+        self.size = 0 if self.in_memory else readers
+
+        self._idle: queue.Queue = queue.Queue()
+        self._local = threading.local()
+
+        self.writer_contention = _Contention()
+        self.reader_contention = _Contention()
+
+        logger.info(
+            "ConnectionPool ready (path=%s, readers=%d, cached_statements=%d)",
+            path,
+            self.size,
+            cached_statements,
+        )
+
+    def open_readers(self) -> None:
+        """
+        Open reader connections. Called once the schema exists,
+        read-only connections can't create it.
+        """
+        for _ in range(self.size):
+            self._idle.put(self._connect(self.path, read_only=True))
+
+    # --------------------------------------------------
+    # Checkout
+    # --------------------------------------------------
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        start = time.perf_counter()
+        blocked = not self._writer_lock.acquire(blocking=False)
+        if blocked:
+            self._writer_lock.acquire()
+        self.writer_contention.record(time.perf_counter() - start, blocked)
+
+        try:
+            yield self._writer_conn
+        finally:
+            self._writer_lock.release()
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        if self.size == 0:
+            with self.writer() as conn:
+                yield conn
+            return
+
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            # Re-entrant checkout on the same thread
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+
+        start = time.perf_counter()
+        try:
+            conn = self._idle.get_nowait()
+            blocked = False
+        except queue.Empty:
+            conn = self._idle.get()
+            blocked = True
+        self.reader_contention.record(time.perf_counter() - start, blocked)
+
+        self._local.conn = conn
+        self._local.depth = 1
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._local.depth = 0
+            self._idle.put(conn)
+
+    # --------------------------------------------------
+    # Lifecycle
+    # --------------------------------------------------
+
+    def connect(self) -> sqlite3.Connection:
+        """
+        Extra read-write connection outside the pool (maintenance tools).
+        """
+        return self._connect(self.path, read_only=False)
+
+    def close(self) -> None:
+        for _ in range(self.size):
+            self._idle.get().close()
+        self.size = 0
+        with self._writer_lock:
+            self._writer_conn.close()
+
+    def stats(self) -> dict:
+        return {
+            "readers": self.size,
+            "readers_idle": self._idle.qsize(),
+            "reader": self.reader_contention.stats(),
+            "writer": self.writer_contention.stats(),
+        }
+
+    def _connect(self, path: str, read_only: bool) -> sqlite3.Connection:
+        if read_only:
+            conn = sqlite3.connect(
+                f"{Path(path).resolve().as_uri()}?mode=ro",
+                uri=True,
+                check_same_thread=False,
+                cached_statements=self.cached_statements,
+            )
+        else:
+            conn = sqlite3.connect(
+                path,
+                check_same_thread=False,
+                cached_statements=self.cached_statements,
+                isolation_level=None,
+            )
+
+        conn.row_factory = sqlite3.Row
+
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+
+        return conn
@@ -0,0 +1,215 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+
+from app.observability import metrics
+
+logger = logging.getLogger("db_writer")
+
+# A write command runs on the writer thread with the writer's connection
+WriteCommand = Callable[[Any], Any]
+
+_STOP = object()
+
+_BATCH_LATENCY = metrics.DB_QUERY_LATENCY.labels("write_batch")
+
+
+@dataclass
+class _Pending:
+    command: WriteCommand
+    on_done: Optional[Callable[[], None]]
+    future: Future
+    on_commit: Optional[Callable[[], None]] = None
+
+
+class BackgroundWriter:
+    """
+    Write-behind persistence on a dedicated thread.
+
+    Uses the pool's single write connection. Commands are taken from a
+    queue and group-committed: after the first command arrives, more are collected
+    for up to `window_ms` (or `max_batch` commands) and committed in one
+    transaction, i.e. one fsync per batch instead of per write. Each
+    command runs in its own savepoint so one failure doesn't sink the batch.
+
+    Read-your-writes: stores keep their own overlay of pending writes and
+    clear it from `on_done`, which runs under the database's exclusive
+    commit lock together with the COMMIT. Reads hold the commit lock
+    shared while reading the DB and the overlay, so they never see a
+    write twice or miss it. `on_commit` runs just before it, under the
+    same lock, and only if the command's changes were committed.
+    """
+
+    def __init__(self, db, window_ms: float = 20.0, max_batch: int = 256):
+        self.db = db
+        self.window_s = window_ms / 1000
+        self.max_batch = max_batch
+
+        self._queue: queue.Queue = queue.Queue()
+
+        # Metrics
+        self.batches = 0
+        self.commands = 0
+        self.last_batch_size = 0
+        self.max_batch_size = 0
+
+        self._thread = threading.Thread(
+            target=self._run,
+            name="db-writer",
+            daemon=True,
+        )
+        self._thread.start()
+
+        logger.info(
+            "BackgroundWriter started (window_ms=%.1f, max_batch=%d)",
+            window_ms,
+            max_batch,
+        )
+
+    # --------------------------------------------------
+    # Public API
+    # --------------------------------------------------
+
+    def submit(
+        self,
+        command: WriteCommand,
+        on_done: Optional[Callable[[], None]] = None,
+        on_commit: Optional[Callable[[], None]] = None,
+    ) -> Future:
+        future: Future = Future()
+        self._queue.put(_Pending(command, on_done, future, on_commit))
+        return future
+
+    def flush(self, timeout: float | None = None) -> None:
+        """
+        Block until everything submitted so far is committed.
+        """
+        self.submit(lambda conn: None).result(timeout)
+
+    def close(self) -> None:
+        if not self._thread.is_alive():
+            return
+
+        self.flush()
+        self._queue.put(_STOP)
+        self._thread.join()
+
+        logger.info("BackgroundWriter stopped (%s)", self.stats())
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth,
+            "batches": self.batches,
+            "commands": self.commands,
+            "last_batch_size": self.last_batch_size,
+            "max_batch_size": self.max_batch_size,
+            "avg_batch_size": self.commands / self.batches if self.batches else 0.0,
+        }
+
+    # --------------------------------------------------
+    # Writer thread
+    # --------------------------------------------------
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            batch, stopping = self._collect(item)
+
+            start = time.perf_counter()
+            with self.db.pool.writer() as conn:
+                self._commit(conn, batch)
+            _BATCH_LATENCY.observe(time.perf_counter() - start)
+
+            if stopping:
+                break
+
+    def _collect(self, first: _Pending) -> tuple[List[_Pending], bool]:
+        batch = [first]
+        deadline = time.monotonic() + self.window_s
+
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+
+            if item is _STOP:
+                return batch, True
+
+            batch.append(item)
+
+        return batch, False
+
+    def _commit(self, conn, batch: List[_Pending]) -> None:
+        results: list[tuple[_Pending, Any, BaseException | None]] = []
+
+        try:
+            conn.execute("BEGIN")
+
+            for item in batch:
+                conn.execute("SAVEPOINT command")
+                try:
+                    result = item.command(conn)
+                    conn.execute("RELEASE command")
+                    results.append((item, result, None))
+                except Exception as e:
+                    conn.execute("ROLLBACK TO command")
+                    conn.execute("RELEASE command")
+                    logger.exception("Write command failed, skipped")
+                    results.append((item, None, e))
+
+            with self.db.commit_lock.exclusive():
+                conn.execute("COMMIT")
+                self._settle(results)
+
+        except Exception as e:
+            logger.exception("Batch commit failed (%d commands lost)", len(batch))
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            results = [(item, None, e) for item in batch]
+            with self.db.commit_lock.exclusive():
+                self._settle(results)
+
+        for item, result, error in results:
+            if error is None:
+                item.future.set_result(result)
+            else:
+                item.future.set_exception(error)
+
+        self.batches += 1
+        self.commands += len(batch)
+        self.last_batch_size = len(batch)
+        self.max_batch_size = max(self.max_batch_size, len(batch))
+
+        if len(batch) > 1:
+            logger.debug("Group-committed %d writes", len(batch))
+
+    def _settle(self, results: List[tuple[_Pending, Any, BaseException | None]]) -> None:
+        """
+        Apply committed commands' side effects and clear read overlays
+        (caller holds the lock).
+        """
+        for item, _, error in results:
+            callbacks = (item.on_commit if error is None else None, item.on_done)
+            for callback in callbacks:
+                if callback is None:
+                    continue
+                try:
+                    callback()
+                except Exception:
+                    logger.exception("Write completion callback failed")
@@ -1,6 +1,8 @@
 import requests
 import logging
 
+from app.observability import metrics
+
 logger = logging.getLogger(__name__)
 
 
@@ -49,14 +51,15 @@ class SearXNGClient:
             "format": "json",
         }
 
-        response = requests.get(
-            f"{self.base_url}/search",
-            params=params,
-            timeout=self.timeout,
-        )
-        response.raise_for_status()
+        with metrics.SEARCH_LATENCY.time():
+            response = requests.get(
+                f"{self.base_url}/search",
+                params=params,
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
 
-        data = response.json()
+            data = response.json()
         results = []
 
         for r in data.get("results", [])[:limit]:
@@ -0,0 +1,32 @@
+import logging
+from pathlib import Path
+
+from app.tts.base import TTS
+
+logger = logging.getLogger("tts")
+
+
+def build_tts(cfg: dict) -> TTS:
+    backend = cfg.get("backend", "piper")
+
+    if backend == "stub":
+        from app.tts.stub_tts import StubTTS
+
+        stub_cfg = cfg.get("stub") or {}
+        logger.info("TTS backend: stub (real_time_factor=%.2f)", stub_cfg.get("real_time_factor", 0.2))
+        return StubTTS(
+            real_time_factor=stub_cfg.get("real_time_factor", 0.2),
+            chars_per_second=stub_cfg.get("chars_per_second", 15.0),
+        )
+
+    if backend == "piper":
+        # Imported here so the stub backend runs without piper installed
+        from app.tts.piper_tts import PiperTTS
+
+        logger.info("TTS backend: piper (model=%s)", cfg["model_path"])
+        return PiperTTS(
+            model_path=Path(cfg["model_path"]),
+            use_cuda=cfg.get("use_cuda", False),
+        )
+
+    raise ValueError(f"Unknown TTS backend: {backend}")
@@ -0,0 +1,37 @@
+import time
+import wave
+from pathlib import Path
+
+from app.tts.base import TTS
+
+
+class StubTTS(TTS):
+    """
+    Writes silent WAV clips as long as `text` would take to speak and
+    takes `real_time_factor` times that long to do it. Stands in for
+    Piper in load tests, without a voice model or GPU. It blocks its
+    thread like Piper does (the server runs it on the TTS executor) and
+    is safe to call concurrently.
+    """
+
+    def __init__(
+        self,
+        real_time_factor: float = 0.2,
+        chars_per_second: float = 15.0,
+        sample_rate: int = 16000,
+    ):
+        self.real_time_factor = real_time_factor
+        self.chars_per_second = chars_per_second
+        self.sample_rate = sample_rate
+
+    def synthesize(self, text: str, output_path: Path) -> None:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        duration = max(len(text), 1) / self.chars_per_second
+        time.sleep(duration * self.real_time_factor)
+
+        with wave.open(str(output_path), "wb") as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(self.sample_rate)
+            wav_file.writeframes(b"\x00\x00" * int(duration * self.sample_rate))
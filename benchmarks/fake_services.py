@@ -0,0 +1,224 @@
+"""
+Local stand-ins for the assistant's backends, for load tests.
+
+FakeLLM      OpenAI-compatible /v1/chat/completions (streaming SSE and
+             plain), as served by Ollama, plus /api/embed. Streams at
+             `tokens_per_s` after `first_token_ms`. Planner prompts get a
+             JSON plan (web_search for inputs that ask to search, else
+             respond); other calls get filler text.
+FakeSearXNG  /search?format=json with canned results after `latency_ms`.
+
+Both run on ThreadingHTTPServer threads. benchmarks/load_test.py starts
+them in-process; to point a manually started server at them:
+
+Usage:
+    python -m benchmarks.fake_services
+    python -m benchmarks.fake_services --llm-port 11500 --tokens-per-s 40 --first-token-ms 250
+"""
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+WORDS = (
+    "the local assistant answers from its own context and keeps replies short "
+    "enough to speak. results depend on the question, the history of the "
+    "session and whatever the search returned. that is the gist of it."
+).split()
+
+SEARCH_HINT = re.compile(r"\b(search|look up|latest|news|weather|price)\b", re.IGNORECASE)
+
+
+class _Server:
+    def __init__(self, handler, host: str, port: int):
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "_Server":
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _json(self, payload: dict, status: int = 200) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeLLM(_Server):
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        tokens_per_s: float = 30.0,
+        first_token_ms: float = 200.0,
+        response_tokens: int = 60,
+        planner_ms: float = 150.0,
+    ):
+        self.tokens_per_s = tokens_per_s
+        self.first_token_ms = first_token_ms
+        self.response_tokens = response_tokens
+        self.planner_ms = planner_ms
+        self.requests = 0
+
+        fake = self
+
+        class Handler(_Handler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                fake.requests += 1
+
+                path = urlparse(self.path).path
+                if path == "/api/embed":
+                    self._json({"embeddings": [fake.embed(text) for text in _as_list(payload.get("input"))]})
+                elif path == "/v1/chat/completions":
+                    fake.complete(self, payload)
+                else:
+                    self._json({"error": "not found"}, 404)
+
+            def do_GET(self):
+                self._json({"models": []})
+
+        super().__init__(Handler, host, port)
+
+    def complete(self, handler: _Handler, payload: dict) -> None:
+        messages = payload.get("messages") or []
+        system = next((m["content"] for m in messages if m.get("role") == "system"), "")
+        user = next((m["content"] for m in reversed(messages) if m.get("role") == "user"), "")
+
+        if system.startswith("You are a planner"):
+            time.sleep(self.planner_ms / 1000)
+            action = {"type": "web_search", "query": user} if SEARCH_HINT.search(user) else {"type": "respond"}
+            handler._json(_completion(json.dumps({"actions": [action]})))
+            return
+
+        tokens = [WORDS[i % len(WORDS)] + " " for i in range(self.response_tokens)]
+
+        if not payload.get("stream"):
+            time.sleep(self.first_token_ms / 1000 + len(tokens) / self.tokens_per_s)
+            handler._json(_completion("".join(tokens)))
+            return
+
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream")
+        handler.send_header("Transfer-Encoding", "chunked")
+        handler.end_headers()
+
+        time.sleep(self.first_token_ms / 1000)
+        interval = 1.0 / self.tokens_per_s
+        start = time.perf_counter()
+        for i, token in enumerate(tokens):
+            delay = start + i * interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            chunk = {"choices": [{"index": 0, "delta": {"content": token}}]}
+            _write_chunk(handler, f"data: {json.dumps(chunk)}\n\n")
+
+        _write_chunk(handler, "data: [DONE]\n\n")
+        _write_chunk(handler, "")
+
+    @staticmethod
+    def embed(text: str, dim: int = 64) -> list:
+        digest = hashlib.sha256(text.encode()).digest() * (dim // 32)
+        return [(b - 128) / 128 for b in digest[:dim]]
+
+
+class FakeSearXNG(_Server):
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 300.0, results: int = 5):
+        self.latency_ms = latency_ms
+        self.results = results
+        self.requests = 0
+
+        fake = self
+
+        class Handler(_Handler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path != "/search":
+                    self._json({"error": "not found"}, 404)
+                    return
+
+                fake.requests += 1
+                query = parse_qs(url.query).get("q", [""])[0]
+                time.sleep(fake.latency_ms / 1000)
+                self._json({
+                    "query": query,
+                    "results": [
+                        {
+                            "title": f"Result {i} for {query}",
+                            "url": f"https://example.org/{i}",
+                            "content": " ".join(WORDS[i:i + 30]),
+                        }
+                        for i in range(fake.results)
+                    ],
+                })
+
+        super().__init__(Handler, host, port)
+
+
+def _completion(content: str) -> dict:
+    return {"choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}]}
+
+
+def _write_chunk(handler: BaseHTTPRequestHandler, text: str) -> None:
+    data = text.encode()
+    handler.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+    handler.wfile.flush()
+
+
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--llm-port", type=int, default=11500)
+    parser.add_argument("--searxng-port", type=int, default=8500)
+    parser.add_argument("--tokens-per-s", type=float, default=30.0)
+    parser.add_argument("--first-token-ms", type=float, default=200.0)
+    parser.add_argument("--search-ms", type=float, default=300.0)
+    args = parser.parse_args()
+
+    llm = FakeLLM(args.host, args.llm_port, args.tokens_per_s, args.first_token_ms).start()
+    searxng = FakeSearXNG(args.host, args.searxng_port, args.search_ms).start()
+    print(f"fake LLM      {llm.url}  (llm.host)")
+    print(f"fake SearXNG  {searxng.url}  (tools.web.base_url)")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        llm.stop()
+        searxng.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark ChatHistoryStore.get_recent / add against history table size,
+before and after migration 5 (session index) and the tuned PRAGMAs.
+
+"before" = rollback journal, synchronous=FULL, no session index
+"after"  = Database defaults (WAL, synchronous=NORMAL, session index)
+
+Usage:
+    python -m benchmarks.history_recent
+    python -m benchmarks.history_recent --sizes 10000 100000 --sessions 500
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from app.storage.database import Database
+from app.memory.chat_history import ChatHistoryStore
+
+
+LEGACY_PRAGMAS = {
+    "journal_mode": "DELETE",
+    "synchronous": "FULL",
+    "cache_size": -2000,
+    "mmap_size": 0,
+    "temp_store": "DEFAULT",
+}
+
+
+def seed(db: Database, size: int, sessions: list[str], rng: random.Random) -> None:
+    rows = [
+        (
+            rng.choice(sessions),
+            "user" if i % 2 == 0 else "assistant",
+            f"message {i} " + "lorem ipsum " * rng.randint(2, 30),
+        )
+        for i in range(size)
+    ]
+    db.submit_write(
+        lambda conn: conn.executemany(
+            "INSERT INTO chat_history (session_id, role, content) VALUES (?, ?, ?)",
+            rows,
+        )
+    )
+
+
+def timed(fn, calls) -> list[float]:
+    timings = []
+    for args in calls:
+        start = time.perf_counter()
+        fn(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summary(timings: list[float]) -> str:
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    return f"p50={statistics.median(timings):8.3f} ms  p95={p95:8.3f} ms"
+
+
+def run(label: str, db: Database, sessions: list[str], args, rng: random.Random) -> None:
+    store = ChatHistoryStore(db)
+
+    reads = [(rng.choice(sessions), 6) for _ in range(args.reads)]
+    store.get_recent(*reads[0])  # warm
+
+    writes = [(rng.choice(sessions), "user", "benchmark write") for _ in range(args.writes)]
+
+    print(f"  {label:<6} get_recent {summary(timed(store.get_recent, reads))}")
+    print(f"  {label:<6} add        {summary(timed(store.add, writes))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 500_000])
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--reads", type=int, default=200)
+    parser.add_argument("--writes", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    sessions = [f"s{i:05d}" for i in range(args.sessions)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            print(f"history rows={size}")
+
+            before = Database(str(Path(tmp) / f"before_{size}.db"), pragmas=LEGACY_PRAGMAS)
+            before.submit_write(
+                lambda conn: conn.execute("DROP INDEX IF EXISTS idx_chat_history_session")
+            )
+            seed(before, size, sessions, rng)
+            run("before", before, sessions, args, rng)
+            before.close()
+
+            after = Database(str(Path(tmp) / f"after_{size}.db"))
+            seed(after, size, sessions, rng)
+            run("after", after, sessions, args, rng)
+            after.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+"""
+End-to-end load test of the /ws endpoint against local stand-ins.
+
+Starts the fake LLM and SearXNG (benchmarks/fake_services.py), writes a
+copy of the config pointing at them (stub TTS, throwaway database, no
+tracing), starts the server with uvicorn in a subprocess, then drives N
+concurrent sessions through a scripted conversation.
+
+Per turn it records time to first chunk, time to first audio and turn
+duration (input sent -> assistant_end); the server's CPU and RSS are
+sampled from /proc while the load runs (Linux). Results are printed
+and written as JSON; with --baseline, p95s are compared to an earlier
+run and regressions beyond --tolerance are flagged (exit code 1).
+
+Speech synthesis is a shared pool of --tts-workers threads (tts.workers,
+1 like the shipped config). With fewer workers than sessions, first
+audio and turn times mostly measure queueing for TTS, not LLM or
+database throughput; the report says so. Raise --tts-workers (the stub
+only sleeps) to take TTS out of the picture.
+
+Usage:
+    python -m benchmarks.load_test
+    python -m benchmarks.load_test --sessions 16 --turns 6 --tokens-per-s 40
+    python -m benchmarks.load_test --out runs/after.json --baseline runs/before.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import websockets
+import yaml
+
+from benchmarks.fake_services import FakeLLM, FakeSearXNG
+
+
+CONVERSATION = [
+    "Hi, what can you help me with today?",
+    "Search the web for the latest news on local speech models.",
+    "Summarize that in two sentences.",
+    "Remember that I prefer short answers.",
+    "What's the weather like for a walk this evening?",
+    "Thanks, that's all for now.",
+]
+
+METRICS = ("first_chunk_ms", "first_audio_ms", "turn_ms")
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+
+def summarize(values: list[float]) -> dict:
+    if not values:
+        return {"n": 0}
+    return {
+        "n": len(values),
+        "p50": round(statistics.median(values), 1),
+        "p95": round(percentile(values, 0.95), 1),
+        "p99": round(percentile(values, 0.99), 1),
+        "max": round(max(values), 1),
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# ============================================================
+# Server under test
+# ============================================================
+
+
+def write_config(base: Path, workdir: Path, llm_url: str, searxng_url: str, args) -> Path:
+    with open(base, "r") as f:
+        cfg = yaml.safe_load(f)
+
+    cfg["llm"]["host"] = llm_url
+    cfg["tools"]["web"].update({"enabled": True, "base_url": searxng_url})
+    cfg["tts"] = {
+        "backend": "stub",
+        "workers": args.tts_workers,
+        "stub": {"real_time_factor": args.tts_rtf, "chars_per_second": 15},
+    }
+    cfg["storage"]["path"] = str(workdir / "assistant.db")
+    cfg["memory"]["embedder"] = "hashing"
+    cfg["memory"]["index_path"] = str(workdir / "memory_vectors")
+    cfg["planner"]["mode"] = args.planner
+    cfg["planner"].setdefault("classifier", {})["turn_log"] = None
+    cfg["tracing"] = {"enabled": False}
+
+    path = workdir / "assistant.yaml"
+    with open(path, "w") as f:
+        yaml.safe_dump(cfg, f, sort_keys=False)
+    return path
+
+
+def start_server(config_path: Path, port: int, log_path: Path) -> subprocess.Popen:
+    env = {**os.environ, "ASSISTANT_CONFIG": str(config_path)}
+    log = open(log_path, "w")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.server:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+
+
+async def wait_ready(port: int, server: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("Server exited during startup, see its log")
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise TimeoutError("Server did not start listening")
+
+
+class ProcessSampler:
+    """
+    CPU (% of one core) and RSS of a process, from /proc.
+    """
+
+    def __init__(self, pid: int, interval_s: float = 0.5):
+        self.pid = pid
+        self.interval_s = interval_s
+        self.cpu: list[float] = []
+        self.rss_mb: list[float] = []
+        self._ticks = os.sysconf("SC_CLK_TCK")
+
+    def _read(self) -> tuple[float, float]:
+        with open(f"/proc/{self.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        cpu_s = (int(fields[11]) + int(fields[12])) / self._ticks
+        with open(f"/proc/{self.pid}/statm") as f:
+            rss_pages = int(f.read().split()[1])
+        return cpu_s, rss_pages * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+    async def run(self, stop: asyncio.Event) -> None:
+        try:
+            last_cpu, _ = self._read()
+        except OSError:
+            return
+        last = time.monotonic()
+
+        while not stop.is_set():
+            await asyncio.sleep(self.interval_s)
+            try:
+                cpu_s, rss = self._read()
+            except OSError:
+                return
+            now = time.monotonic()
+            self.cpu.append(100 * (cpu_s - last_cpu) / (now - last))
+            self.rss_mb.append(rss)
+            last_cpu, last = cpu_s, now
+
+    def summary(self) -> dict:
+        if not self.cpu:
+            return {}
+        return {
+            "cpu_pct_mean": round(statistics.mean(self.cpu), 1),
+            "cpu_pct_max": round(max(self.cpu), 1),
+            "rss_mb_start": round(self.rss_mb[0], 1),
+            "rss_mb_max": round(max(self.rss_mb), 1),
+        }
+
+
+# ============================================================
+# Load generator
+# ============================================================
+
+
+async def run_session(url: str, index: int, turns: int, think_s: float, results: list[dict]) -> None:
+    async with websockets.connect(url, max_size=None) as ws:
+        for turn in range(turns):
+            text = CONVERSATION[(index + turn) % len(CONVERSATION)]
+            sent = time.perf_counter()
+            first_chunk = first_audio = None
+
+            await ws.send(text)
+            while True:
+                message = json.loads(await ws.recv())
+                elapsed = (time.perf_counter() - sent) * 1000
+
+                if message["type"] == "assistant_chunk" and first_chunk is None:
+                    first_chunk = elapsed
+                elif message["type"] == "assistant_audio" and first_audio is None:
+                    first_audio = elapsed
+                elif message["type"] == "assistant_end":
+                    break
+
+            results.append({
+                "session": index,
+                "turn": turn,
+                "first_chunk_ms": first_chunk,
+                "first_audio_ms": first_audio,
+                "turn_ms": elapsed,
+            })
+
+            if think_s:
+                await asyncio.sleep(think_s)
+
+
+async def drive(args, port: int, pid: int) -> dict:
+    url = f"ws://127.0.0.1:{port}/ws"
+    results: list[dict] = []
+    sampler = ProcessSampler(pid)
+    stop = asyncio.Event()
+    sampling = asyncio.create_task(sampler.run(stop))
+
+    async def session(i: int) -> None:
+        # Stagger connects so sessions don't all start in lockstep
+        await asyncio.sleep(i * args.ramp_s / max(args.sessions, 1))
+        await run_session(url, i, args.turns, args.think_s, results)
+
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*(session(i) for i in range(args.sessions)), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await sampling
+
+    errors = [repr(o) for o in outcomes if isinstance(o, BaseException)]
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "turns_completed": len(results),
+        "turns_per_s": round(len(results) / elapsed, 2),
+        "errors": errors,
+        "latency_ms": {
+            metric: summarize([r[metric] for r in results if r[metric] is not None])
+            for metric in METRICS
+        },
+        "server": sampler.summary(),
+    }
+
+
+# ============================================================
+# Reporting
+# ============================================================
+
+
+def report(result: dict, args) -> None:
+    print(
+        f"{result['turns_completed']} turns in {result['elapsed_s']} s "
+        f"({result['turns_per_s']} turns/s), errors={len(result['errors'])}"
+    )
+    for metric, s in result["latency_ms"].items():
+        if s.get("n"):
+            print(f"  {metric:<15} p50={s['p50']:8.1f}  p95={s['p95']:8.1f}  p99={s['p99']:8.1f}  max={s['max']:8.1f} ms")
+        else:
+            print(f"  {metric:<15} (no samples)")
+    server = result["server"]
+    if server:
+        print(
+            f"  server cpu mean={server['cpu_pct_mean']}% max={server['cpu_pct_max']}%  "
+            f"rss {server['rss_mb_start']} -> max {server['rss_mb_max']} MB"
+        )
+    for error in result["errors"][:5]:
+        print(f"  error: {error}")
+    if args.tts_workers < args.sessions:
+        print(
+            f"  note: {args.tts_workers} TTS worker(s) shared by {args.sessions} sessions; "
+            f"first_audio / turn include waiting for synthesis (see --tts-workers)"
+        )
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> bool:
+    """
+    Print p95 changes against the baseline; True when none regressed
+    beyond `tolerance` (a fraction).
+    """
+    ok = True
+    print(f"vs baseline ({baseline['run']['started']}):")
+    for metric in METRICS:
+        now = result["latency_ms"].get(metric, {}).get("p95")
+        before = baseline["result"]["latency_ms"].get(metric, {}).get("p95")
+        if now is None or not before:
+            continue
+        change = (now - before) / before
+        flag = "REGRESSION" if change > tolerance else ""
+        ok = ok and not flag
+        print(f"  {metric:<15} p95 {before:8.1f} -> {now:8.1f} ms ({change:+.1%}) {flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--turns", type=int, default=4)
+    parser.add_argument("--think-s", type=float, default=0.5, help="pause between a session's turns")
+    parser.add_argument("--ramp-s", type=float, default=2.0, help="spread session starts over this long")
+    parser.add_argument("--tokens-per-s", type=float, default=30.0)
+    parser.add_argument("--first-token-ms", type=float, default=200.0)
+    parser.add_argument("--response-tokens", type=int, default=60)
+    parser.add_argument("--search-ms", type=float, default=300.0)
+    parser.add_argument("--tts-rtf", type=float, default=0.2)
+    parser.add_argument("--tts-workers", type=int, default=1, help="server TTS threads shared by all sessions")
+    parser.add_argument("--planner", default="llm", choices=("rule", "llm", "hybrid"))
+    parser.add_argument("--config", default="app/config/assistant.yaml")
+    parser.add_argument("--out", default=None, help="results JSON (default benchmarks/results/load_<time>.json)")
+    parser.add_argument("--baseline", default=None, help="earlier results JSON to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed p95 increase vs baseline")
+    args = parser.parse_args()
+
+    llm = FakeLLM(
+        tokens_per_s=args.tokens_per_s,
+        first_token_ms=args.first_token_ms,
+        response_tokens=args.response_tokens,
+    ).start()
+    searxng = FakeSearXNG(latency_ms=args.search_ms).start()
+
+    with tempfile.TemporaryDirectory(prefix="load_test_") as tmp:
+        workdir = Path(tmp)
+        config_path = write_config(Path(args.config), workdir, llm.url, searxng.url, args)
+        port = free_port()
+        server = start_server(config_path, port, workdir / "server.log")
+
+        try:
+            asyncio.run(wait_ready(port, server))
+            print(
+                f"{args.sessions} sessions x {args.turns} turns "
+                f"(llm {args.tokens_per_s:.0f} tok/s, first token {args.first_token_ms:.0f} ms, "
+                f"tts rtf {args.tts_rtf} x {args.tts_workers} worker(s))"
+            )
+            result = asyncio.run(drive(args, port, server.pid))
+        except Exception:
+            print((workdir / "server.log").read_text()[-4000:], file=sys.stderr)
+            raise
+        finally:
+            server.terminate()
+            server.wait(timeout=15)
+            llm.stop()
+            searxng.stop()
+
+    report(result, args)
+
+    started = time.strftime("%Y%m%d-%H%M%S")
+    output = {
+        "run": {
+            "started": started,
+            "host": platform.node(),
+            "python": platform.python_version(),
+            "args": vars(args),
+        },
+        "result": result,
+    }
+    out = Path(args.out or f"benchmarks/results/load_{started}.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(output, indent=2))
+    print(f"results written to {out}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        if not compare(result, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark per-turn logging overhead on the turn's own thread.
+
+A turn is emulated by the log calls the server path makes (about 20
+INFO lines across server, orchestrator, planner and context builder;
+in debug mode also the raw user input, planner output and context
+details). Console output goes to a file, as it does for a service.
+
+"sync"   = handlers run inline (the previous setup)
+"queued" = QueueHandler / QueueListener, I/O on a background thread
+"json"   = queued, JSON formatter with session_id / turn
+"limited"= queued, DEBUG, with the config's per-logger limits
+
+Turns are spaced by --gap-ms (real turns are seconds apart; with no
+gap the listener competes with the next turn for the GIL). Reports
+caller-side time per turn (median, p99, max) and, for the queued
+setups, how long the listener took to drain afterwards.
+
+Usage:
+    python -m benchmarks.logging_overhead
+    python -m benchmarks.logging_overhead --turns 5000 --gap-ms 0
+"""
+import argparse
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.logging import bind_log_context, setup_logging, shutdown_logging, unbind_log_context
+
+
+USER_TEXT = "what's the weather like in Berlin tomorrow evening, and should I take the train " * 3
+PLANNER_OUTPUT = '{"actions": [{"type": "web_search", "query": "weather Berlin tomorrow"}, {"type": "respond"}]}'
+
+LIMITS = {
+    "llm_planner": {"rate": 2, "burst": 5},
+    "context_builder": {"sample": 0.1},
+}
+
+
+def turn(loggers: dict, session_id: str) -> None:
+    server, orch, planner, context = loggers["server"], loggers["orchestrator"], loggers["llm_planner"], loggers["context_builder"]
+
+    server.info("[%s] Received user input (len=%d)", session_id, len(USER_TEXT))
+    server.debug("[%s] User input text: %r", session_id, USER_TEXT)
+    orch.info("[%s] User input received (len=%d)", session_id, len(USER_TEXT))
+    orch.debug("[%s] User input text: %r", session_id, USER_TEXT)
+    orch.debug("[%s] User input persisted to history", session_id)
+    orch.info("[%s] Running planner", session_id)
+    planner.info("LLMPlanner invoked (len=%d)", len(USER_TEXT))
+    planner.debug("LLMPlanner raw output: %r", PLANNER_OUTPUT)
+    planner.info("LLMPlanner produced %d actions", 2)
+    orch.info("[%s] Planner produced %d actions", session_id, 2)
+    orch.debug("[%s] Plan actions: %s", session_id, ["web_search", "respond"])
+    orch.info("[%s] Executing action '%s'", session_id, "web_search")
+    orch.info("[%s] Executing action '%s'", session_id, "respond")
+    orch.info("[%s] Building context", session_id)
+    context.info("[%s] Building context (async)", session_id)
+    for i in range(6):
+        context.debug("[%s] History message %d: %r", session_id, i, USER_TEXT[:120])
+    context.info("[%s] Added %d history messages (limit=%d)", session_id, 6, 6)
+    context.info("[%s] Token allocation: system=%d input=%d total=%d budget=%d", session_id, 352, 40, 1800, 3072)
+    orch.info("[%s] Calling LLM (streaming)", session_id)
+    orch.info("[%s] LLM response complete (chars=%d, duration=%.2f ms)", session_id, 812, 2350.4)
+    orch.debug("[%s] Assistant response persisted to history", session_id)
+    for _ in range(4):
+        server.debug("[%s] TTS synth sentence (%d chars)", session_id, 96)
+        server.debug("[%s] TTS complete (%.2f ms)", session_id, 180.3)
+    server.info("[%s] Assistant turn completed", session_id)
+    orch.info("[%s] Turn completed (duration=%.2f ms)", session_id, 3120.7)
+
+
+def run(label: str, args, tmp: Path, **options) -> None:
+    stdout = sys.stdout
+    console = open(tmp / f"{label}.console", "w")
+    sys.stdout = console
+    try:
+        setup_logging(log_dir=str(tmp / label), **options)
+    finally:
+        sys.stdout = stdout
+
+    loggers = {name: logging.getLogger(name) for name in ("server", "orchestrator", "llm_planner", "context_builder")}
+
+    timings = []
+    for i in range(args.turns):
+        token = bind_log_context(session_id="a1b2c3d4", turn=i)
+        start = time.perf_counter()
+        turn(loggers, "a1b2c3d4")
+        timings.append((time.perf_counter() - start) * 1_000_000)
+        unbind_log_context(token)
+        if args.gap_ms:
+            time.sleep(args.gap_ms / 1000)
+
+    start = time.perf_counter()
+    shutdown_logging()
+    drain_ms = (time.perf_counter() - start) * 1000
+    console.close()
+
+    timings.sort()
+    drained = f"  drain={drain_ms:7.1f} ms" if options.get("use_queue", True) else ""
+    print(
+        f"  {label:<14} p50={statistics.median(timings):8.1f} us  "
+        f"p99={timings[int(len(timings) * 0.99) - 1]:8.1f} us  "
+        f"max={timings[-1]:9.1f} us{drained}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=1000)
+    parser.add_argument("--gap-ms", type=float, default=5.0, help="idle time between turns")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+
+        print(f"{args.turns} turns, INFO")
+        run("sync", args, tmp, use_queue=False)
+        run("queued", args, tmp)
+        run("json", args, tmp, fmt="json")
+
+        print(f"{args.turns} turns, DEBUG")
+        run("sync-debug", args, tmp, level=logging.DEBUG, use_queue=False)
+        run("queued-debug", args, tmp, level=logging.DEBUG)
+        run("limited-debug", args, tmp, level=logging.DEBUG, limits=LIMITS, limit_level=logging.DEBUG)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark MemoryStore.get_relevant against memory table size.
+
+Compares the FTS5 path, the shared in-process index cache
+and the legacy full-scan path.
+
+Usage:
+    python -m benchmarks.memory_retrieval
+    python -m benchmarks.memory_retrieval --sizes 1000 10000 --queries 50
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from app.storage.database import Database
+from app.memory.memory_store import MemoryStore
+from app.memory.memory_index import MemoryIndexCache
+
+
+SUBJECTS = [
+    "my dog", "my sister", "my car", "the garden", "my job", "my laptop",
+    "the apartment", "my favorite band", "my doctor", "the gym", "my boss",
+    "my birthday", "the cat", "my bike", "my flight", "the project",
+]
+
+PREDICATES = [
+    "is called", "lives in", "prefers", "was bought in", "needs", "starts at",
+    "reminds me of", "is allergic to", "costs", "is scheduled for",
+]
+
+OBJECTS = [
+    "Berlin", "blue paint", "peanuts", "Monday mornings", "jazz", "Lisbon",
+    "a new battery", "green tea", "the dentist", "March", "pasta", "Rex",
+    "the night shift", "climbing", "a red jacket", "the old station",
+]
+
+QUERIES = [
+    "what is my dog called",
+    "when is my flight",
+    "what does my sister like",
+    "remind me about the dentist",
+    "where does my boss live",
+    "tell me something about jazz",
+    "how was your day",
+]
+
+
+def make_memory(rng: random.Random) -> str:
+    return (
+        f"{rng.choice(SUBJECTS)} {rng.choice(PREDICATES)} "
+        f"{rng.choice(OBJECTS)} ({rng.randint(0, 99999)})"
+    )
+
+
+def seed(store: MemoryStore, size: int, rng: random.Random) -> None:
+    rows = [
+        ("general", make_memory(rng), rng.choice((1, 1, 1, 2, 3)))
+        for _ in range(size)
+    ]
+    store.db.submit_write(
+        lambda conn: conn.executemany(
+            "INSERT INTO memory (category, content, importance) VALUES (?, ?, ?)",
+            rows,
+        )
+    )
+
+
+def measure(fn, queries: list[str], limit: int) -> list[float]:
+    timings = []
+    for q in queries:
+        start = time.perf_counter()
+        fn(q, limit)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label: str, timings: list[float]) -> None:
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(
+        f"  {label:<6} mean={statistics.mean(timings):8.3f} ms  "
+        f"p50={statistics.median(timings):8.3f} ms  p95={p95:8.3f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    queries = [rng.choice(QUERIES) for _ in range(args.queries)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            db = Database(str(Path(tmp) / f"memory_{size}.db"))
+            store = MemoryStore(db, index_cache=MemoryIndexCache.for_database(db))
+            seed(store, size, rng)
+
+            # Warm the page cache and build the index cache before timing
+            start = time.perf_counter()
+            store._get_relevant_cached(queries[0], args.limit)
+            build_ms = (time.perf_counter() - start) * 1000
+            store._get_relevant_fts(queries[0], args.limit)
+            store._get_relevant_scan(queries[0], args.limit)
+
+            print(f"memories={size} (cache build {build_ms:.1f} ms)")
+            report("fts", measure(store._get_relevant_fts, queries, args.limit))
+            report("cached", measure(store._get_relevant_cached, queries, args.limit))
+            report("scan", measure(store._get_relevant_scan, queries, args.limit))
+
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
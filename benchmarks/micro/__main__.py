@@ -0,0 +1,70 @@
+"""
+Run the in-process microbenchmarks (see benchmarks/micro/README.md).
+
+Usage:
+    python -m benchmarks.micro                      # all cases
+    python -m benchmarks.micro --list
+    python -m benchmarks.micro split_sentences memory --runs 20
+    python -m benchmarks.micro --out before.json
+    python -m benchmarks.micro --out after.json --baseline before.json --threshold 0.05
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from benchmarks.micro import runner
+from benchmarks.micro.cases import CASES, select
+from benchmarks.micro.fixtures import Fixtures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("cases", nargs="*", help="run only cases whose name contains one of these")
+    parser.add_argument("--list", action="store_true", help="list cases and exit")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--min-time", type=float, default=0.05, help="seconds per run (sets the loop count)")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply fixture sizes")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown vs baseline")
+    args = parser.parse_args()
+
+    if args.list:
+        for case in CASES.values():
+            print(f"{case.name:<30} {case.description}")
+        return
+
+    cases = select(args.cases)
+    if not cases:
+        parser.error(f"no case matches {args.cases}")
+
+    fixtures = Fixtures(scale=args.scale, seed=args.seed)
+    try:
+        results = runner.run(cases, fixtures, args.runs, args.min_time)
+    finally:
+        fixtures.close()
+
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(json.dumps(results, indent=2))
+        print(f"results written to {args.out}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        if baseline["meta"].get("scale") != results["meta"]["scale"]:
+            print("warning: baseline was run with a different --scale", file=sys.stderr)
+
+        rows = runner.compare(results, baseline, args.threshold)
+        print(f"\nvs {args.baseline} (threshold {args.threshold:.0%}):")
+        print(runner.format_comparison(rows))
+
+        regressions = [row["name"] for row in rows if row["regression"]]
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
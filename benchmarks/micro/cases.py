@@ -0,0 +1,202 @@
+"""
+Benchmark cases. Each case is a setup function taking the run's
+Fixtures and returning the zero-argument callable to time; one call is
+one unit of work named in the case's description (a streamed response,
+a query, a turn's context, ...).
+"""
+import itertools
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+from unittest import mock
+
+from app.core.events import AssistantSpeechEvent, AssistantStateEvent
+from app.llm.ollama_stream import OllamaClient
+from app.planners.llm_planner import LLMPlanner
+from app.planners.rule_planner import Planner
+from app.services.context_builder import ContextBuilder
+from app.services.sentence_splitter import split_sentences
+from app.services.tokens import TokenCounter
+
+from benchmarks.micro.fixtures import USER_QUERIES, Fixtures
+
+
+@dataclass
+class Case:
+    name: str
+    description: str
+    setup: Callable[[Fixtures], Callable[[], object]]
+
+
+CASES: Dict[str, Case] = {}
+
+
+def case(name: str, description: str):
+    def register(setup):
+        CASES[name] = Case(name, description, setup)
+        return setup
+    return register
+
+
+def select(patterns: List[str]) -> List[Case]:
+    if not patterns:
+        return list(CASES.values())
+    return [c for c in CASES.values() if any(p in c.name for p in patterns)]
+
+
+def _cycle(items):
+    """
+    Next item per call, so repeated calls don't all hit the same input.
+    """
+    return itertools.cycle(items).__next__
+
+
+# ============================================================
+# Sentence splitting (per token, server TTS path)
+# ============================================================
+
+
+def _stream_split(tokens: List[str]):
+    def run():
+        buffer = ""
+        for token in tokens:
+            buffer += token
+            _, buffer = split_sentences(buffer)
+    return run
+
+
+@case("split_sentences.response", "400-token response streamed into the splitter token by token")
+def _(fx: Fixtures):
+    return _stream_split(fx.response_tokens(400))
+
+
+@case("split_sentences.run_on", "400 tokens without a sentence boundary (buffer re-scanned every token)")
+def _(fx: Fixtures):
+    return _stream_split(fx.run_on_tokens(400))
+
+
+# ============================================================
+# Memory retrieval
+# ============================================================
+
+
+@case("memory.get_relevant.fts", "one query against 5k memories (FTS5)")
+def _(fx: Fixtures):
+    store = fx.memory_store(5000)
+    query = _cycle(USER_QUERIES)
+    return lambda: store.get_relevant(query(), 5)
+
+
+@case("memory.get_relevant.cached", "one query against 5k memories (in-process index cache)")
+def _(fx: Fixtures):
+    store = fx.memory_store(5000, cached=True)
+    query = _cycle(USER_QUERIES)
+    store.get_relevant(query(), 5)  # build the index outside the timing
+    return lambda: store.get_relevant(query(), 5)
+
+
+@case("memory.get_relevant.scan", "one query against 5k memories (no-FTS fallback, tokenizes every row)")
+def _(fx: Fixtures):
+    store = fx.memory_store(5000)
+    query = _cycle(USER_QUERIES)
+
+    def run():
+        with store.db.read():
+            store._get_relevant_scan(query(), 5)
+    return run
+
+
+# ============================================================
+# Context building
+# ============================================================
+
+
+@case("context_builder.build", "one turn's context: 2k-message session with summary, 5k memories, 3k-token budget")
+def _(fx: Fixtures):
+    session_id, history, memory, summary = fx.conversation(2000, 5000)
+    builder = ContextBuilder(
+        system_prompt="You are a local assistant. " * 40,
+        history_store=history,
+        memory_store=memory,
+        summary_store=summary,
+        history_limit=6,
+        memory_limit=5,
+        budget_tokens=3072,
+        token_counter=TokenCounter(),
+    )
+    query = _cycle(USER_QUERIES)
+    builder.build(session_id, query())  # warm the session cache
+    return lambda: builder.build(session_id, query(), tool_context=None)
+
+
+# ============================================================
+# Planning
+# ============================================================
+
+
+@case("rule_planner.decide", "one rule planner decision over a mix of user inputs")
+def _(fx: Fixtures):
+    planner = Planner()
+    query = _cycle(USER_QUERIES)
+    return lambda: planner.decide(query(), {})
+
+
+@case("llm_planner.extract_json", "JSON extraction from one raw planner output (bare, fenced, chatty)")
+def _(fx: Fixtures):
+    planner = LLMPlanner(llm=None)
+    output = _cycle(fx.planner_outputs())
+    return lambda: planner._extract_json(output())
+
+
+# ============================================================
+# LLM streaming
+# ============================================================
+
+
+class _FakeStream:
+    def __init__(self, lines: List[bytes]):
+        self.lines = lines
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self):
+        return iter(self.lines)
+
+
+@case("ollama.stream_chat", "parse one 400-chunk SSE response (HTTP stubbed out)")
+def _(fx: Fixtures):
+    client = OllamaClient(model="bench", host="http://bench.invalid")
+    lines = fx.sse_lines(400)
+    messages = [{"role": "user", "content": "hi"}]
+
+    def run():
+        with mock.patch("app.llm.ollama_stream.requests.post", return_value=_FakeStream(lines)):
+            for _ in client.stream_chat(messages):
+                pass
+    return run
+
+
+# ============================================================
+# Events
+# ============================================================
+
+
+@case("events.speech_chunks", "AssistantSpeechEvent per chunk of a 400-token response")
+def _(fx: Fixtures):
+    tokens = fx.response_tokens(400)
+
+    def run():
+        for token in tokens:
+            AssistantSpeechEvent(text=token)
+    return run
+
+
+@case("events.state", "one AssistantStateEvent")
+def _(fx: Fixtures):
+    return lambda: AssistantStateEvent(state="thinking")
@@ -0,0 +1,209 @@
+"""
+Deterministic inputs for the microbenchmarks: streamed responses, memory
+tables, chat histories, planner outputs and SSE streams. Everything is
+generated from a seed, so runs on the same scale are comparable.
+"""
+import json
+import random
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+from app.memory.chat_history import ChatHistoryStore
+from app.memory.memory_index import MemoryIndexCache
+from app.memory.memory_store import MemoryStore
+from app.memory.session_cache import SessionCache
+from app.memory.summary_store import SummaryStore
+from app.storage.database import Database
+
+
+WORDS = (
+    "the a local assistant model answer question context memory search result "
+    "session summary token sentence planner weather tomorrow evening Berlin "
+    "train ticket price meeting calendar note reminder garden dog walk coffee "
+    "project deadline report draft review music playlist dinner recipe pasta"
+).split()
+
+SUBJECTS = ["my dog", "my sister", "my car", "the garden", "my job", "my laptop", "my boss", "my flight"]
+PREDICATES = ["is called", "lives in", "prefers", "needs", "starts at", "is allergic to", "is scheduled for"]
+OBJECTS = ["Berlin", "peanuts", "Monday mornings", "jazz", "Lisbon", "green tea", "the dentist", "March"]
+
+USER_QUERIES = [
+    "hi there",
+    "what's the weather like in Berlin tomorrow",
+    "please remember that my sister lives in Lisbon",
+    "search for the latest news on local speech models",
+    "can you summarize what we talked about",
+    "how much is a train ticket to Hamburg",
+    "tell me a joke about coffee",
+    "what is my dog called",
+    "remind me what my boss prefers",
+    "look up the opening hours of the museum",
+]
+
+
+class Fixtures:
+    """
+    Lazily built, shared across cases of one run. `scale` multiplies the
+    sizes of the generated tables and texts.
+    """
+
+    def __init__(self, scale: float = 1.0, seed: int = 7):
+        self.scale = scale
+        self.seed = seed
+        self._tmp = tempfile.TemporaryDirectory(prefix="microbench_")
+        self._cache: Dict[str, object] = {}
+
+    def rng(self, salt: str) -> random.Random:
+        return random.Random(f"{self.seed}:{salt}")
+
+    def size(self, base: int) -> int:
+        return max(int(base * self.scale), 1)
+
+    def close(self) -> None:
+        for db in [v for v in self._cache.values() if isinstance(v, Database)]:
+            db.close()
+        self._tmp.cleanup()
+
+    # --------------------------------------------------
+    # Text
+    # --------------------------------------------------
+
+    def response_tokens(self, tokens: int = 400) -> List[str]:
+        """
+        A long LLM answer as streamed chunks (~1 word each, sentences of
+        8-25 words, the odd question or exclamation).
+        """
+        rng = self.rng("response")
+        out = []
+        until_end = rng.randint(8, 25)
+        for _ in range(self.size(tokens)):
+            word = rng.choice(WORDS)
+            until_end -= 1
+            if until_end == 0:
+                word += rng.choice(".....?!")
+                until_end = rng.randint(8, 25)
+            out.append((" " if out else "") + word)
+        return out
+
+    def run_on_tokens(self, tokens: int = 400) -> List[str]:
+        """
+        A response with no sentence boundary at all (lists, code, a
+        run-on), the splitter's worst case.
+        """
+        rng = self.rng("run_on")
+        return [" " + rng.choice(WORDS) for _ in range(self.size(tokens))]
+
+    def planner_outputs(self) -> List[str]:
+        """
+        LLM planner outputs the way models actually return them.
+        """
+        plans = [
+            {"actions": [{"type": "respond"}]},
+            {"actions": [{"type": "web_search", "query": "weather Berlin tomorrow"}, {"type": "respond"}]},
+            {"actions": [{"type": "write_memory", "content": "User's sister lives in Lisbon"}, {"type": "respond"}]},
+        ]
+        chatter = " ".join(self.rng("chatter").choice(WORDS) for _ in range(60))
+        out = []
+        for plan in plans:
+            text = json.dumps(plan)
+            out.append(text)
+            out.append(f"```json\n{json.dumps(plan, indent=2)}\n```")
+            out.append(f"Sure! Here is the plan: {text}\nLet me know if {chatter}.")
+        return out
+
+    def sse_lines(self, tokens: int = 400) -> List[bytes]:
+        """
+        OpenAI-compatible streaming body, as iter_lines() yields it.
+        """
+        lines = []
+        for token in self.response_tokens(tokens):
+            chunk = {
+                "id": "chatcmpl-1",
+                "object": "chat.completion.chunk",
+                "model": "bench",
+                "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+            }
+            lines.append(b"data: " + json.dumps(chunk).encode())
+            lines.append(b"")
+        lines.append(b"data: [DONE]")
+        return lines
+
+    # --------------------------------------------------
+    # Storage
+    # --------------------------------------------------
+
+    def database(self, name: str = "bench") -> Database:
+        key = f"db:{name}"
+        if key not in self._cache:
+            self._cache[key] = Database(str(Path(self._tmp.name) / f"{name}.db"))
+        return self._cache[key]
+
+    def memory_store(self, memories: int = 5000, cached: bool = False) -> MemoryStore:
+        """
+        A store over a table of `memories` rows, FTS5-backed or served
+        from the in-process index cache.
+        """
+        key = f"memory:{memories}:{cached}"
+        if key in self._cache:
+            return self._cache[key]
+
+        db = self.database(f"memory_{memories}")
+        if not self._cache.get(f"seeded:{memories}"):
+            rng = self.rng("memories")
+            rows = [
+                (
+                    "general",
+                    f"{rng.choice(SUBJECTS)} {rng.choice(PREDICATES)} {rng.choice(OBJECTS)} ({i})",
+                    rng.choice((1, 1, 1, 2, 3)),
+                )
+                for i in range(self.size(memories))
+            ]
+            db.submit_write(
+                lambda conn: conn.executemany(
+                    "INSERT INTO memory (category, content, importance) VALUES (?, ?, ?)",
+                    rows,
+                )
+            )
+            self._cache[f"seeded:{memories}"] = True
+
+        store = MemoryStore(db, index_cache=MemoryIndexCache.for_database(db) if cached else None)
+
+        self._cache[key] = store
+        return store
+
+    def conversation(self, messages: int = 2000, memories: int = 5000):
+        """
+        (session_id, history, memory, summary stores) for one long session
+        with a summary, sharing a warm session cache like the server's.
+        """
+        key = f"conversation:{messages}:{memories}"
+        if key in self._cache:
+            return self._cache[key]
+
+        memory = self.memory_store(memories)
+        db = memory.db
+        cache = SessionCache.for_database(db)
+        history = ChatHistoryStore(db, cache=cache)
+        summary = SummaryStore(db, cache=cache)
+
+        session_id = "bench-session"
+        rng = self.rng("history")
+        rows = [
+            (
+                session_id,
+                "user" if i % 2 == 0 else "assistant",
+                " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 80))),
+            )
+            for i in range(self.size(messages))
+        ]
+        db.submit_write(
+            lambda conn: conn.executemany(
+                "INSERT INTO chat_history (session_id, role, content) VALUES (?, ?, ?)",
+                rows,
+            )
+        )
+        summary.set(session_id, " ".join(rng.choice(WORDS) for _ in range(180)), len(rows) - 10)
+
+        self._cache[key] = (session_id, history, memory, summary)
+        return self._cache[key]
@@ -0,0 +1,124 @@
+"""
+Timing and comparison for the microbenchmarks.
+
+Each case is calibrated to a loop count whose run takes at least
+`min_time_s`, warmed up once, then timed for `runs` runs; the per-call
+time of each run is kept. Results compare on the median, and a case
+regresses when it is slower than the baseline by more than `threshold`
+(a fraction) and by more than the noise of both runs.
+"""
+import gc
+import platform
+import statistics
+import time
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.micro.cases import Case
+from benchmarks.micro.fixtures import Fixtures
+
+
+def calibrate(fn: Callable[[], object], min_time_s: float) -> int:
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - start >= min_time_s or loops >= 1 << 20:
+            return loops
+        loops *= 2
+
+
+def measure(fn: Callable[[], object], runs: int, min_time_s: float) -> dict:
+    loops = calibrate(fn, min_time_s)
+
+    samples: List[float] = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(runs):
+            start = time.perf_counter()
+            for _ in range(loops):
+                fn()
+            samples.append((time.perf_counter() - start) / loops * 1e6)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    return {
+        "loops": loops,
+        "median_us": statistics.median(samples),
+        "mean_us": statistics.mean(samples),
+        "stdev_us": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "min_us": min(samples),
+        "samples_us": samples,
+    }
+
+
+def run(cases: List[Case], fixtures: Fixtures, runs: int, min_time_s: float, progress=print) -> dict:
+    results: Dict[str, dict] = {}
+    for case in cases:
+        fn = case.setup(fixtures)
+        result = measure(fn, runs, min_time_s)
+        result["description"] = case.description
+        results[case.name] = result
+        progress(format_result(case.name, result))
+
+    return {
+        "meta": {
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "host": platform.node(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "scale": fixtures.scale,
+            "seed": fixtures.seed,
+            "runs": runs,
+            "min_time_s": min_time_s,
+        },
+        "benchmarks": results,
+    }
+
+
+def format_time(us: float) -> str:
+    if us >= 1000:
+        return f"{us / 1000:8.2f} ms"
+    return f"{us:8.2f} us"
+
+
+def format_result(name: str, result: dict) -> str:
+    spread = result["stdev_us"] / result["median_us"] if result["median_us"] else 0.0
+    return f"{name:<30} {format_time(result['median_us'])}  +- {spread:5.1%}  ({result['loops']} loops)"
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[dict]:
+    """
+    One row per case present in both runs, with `regression` set when
+    the median slowed down beyond `threshold` and beyond the noise.
+    """
+    rows = []
+    for name, result in current["benchmarks"].items():
+        before: Optional[dict] = baseline["benchmarks"].get(name)
+        if before is None:
+            continue
+
+        change = result["median_us"] / before["median_us"] - 1
+        noise = (result["stdev_us"] + before["stdev_us"]) / before["median_us"]
+        rows.append({
+            "name": name,
+            "before_us": before["median_us"],
+            "after_us": result["median_us"],
+            "change": change,
+            "regression": change > threshold and change > noise,
+            "improvement": change < -threshold and -change > noise,
+        })
+    return rows
+
+
+def format_comparison(rows: List[dict]) -> str:
+    lines = []
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ("faster" if row["improvement"] else "")
+        lines.append(
+            f"{row['name']:<30} {format_time(row['before_us'])} -> {format_time(row['after_us'])}  "
+            f"{row['change']:+7.1%}  {flag}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,136 @@
+"""
+Benchmark perception updates at a target rate (default 10k/s) with
+concurrent readers and an async subscriber.
+
+"state" = PerceptionState: lock-protected dict, snapshot copies under the lock
+"bus"   = PerceptionBus: copy-on-write snapshots, ring-buffer history,
+          coalescing async subscriber
+
+Producers publish across several keys from their own threads, paced to
+the target rate; a reader thread takes snapshots in a loop (as planners
+do per turn, but much more often). Reports achieved publish rate,
+publish and snapshot latency, and subscriber deliveries.
+
+Usage:
+    python -m benchmarks.perception_bus
+    python -m benchmarks.perception_bus --rate 20000 --seconds 5 --producers 4
+"""
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+
+from app.perception.bus import PerceptionBus
+from app.perception.state import PerceptionState
+
+
+KEYS = ["audio.level", "screen.text", "clipboard.text", "user.input", "window.title", "mouse.idle_s"]
+
+
+def percentile(timings: list[float], q: float) -> float:
+    timings = sorted(timings)
+    return timings[min(int(len(timings) * q), len(timings) - 1)]
+
+
+def summary(timings: list[float]) -> str:
+    return (
+        f"p50={statistics.median(timings):7.2f} us  "
+        f"p99={percentile(timings, 0.99):7.2f} us  "
+        f"max={max(timings):8.1f} us"
+    )
+
+
+def produce(publish, rate: float, seconds: float, offset: int, timings: list[float]) -> None:
+    interval = 1.0 / rate
+    start = time.perf_counter()
+    n = 0
+    while True:
+        due = start + n * interval
+        now = time.perf_counter()
+        if now - start >= seconds:
+            break
+        if due > now:
+            time.sleep(min(due - now, 0.001))
+            continue
+
+        key = KEYS[(n + offset) % len(KEYS)]
+        t0 = time.perf_counter()
+        publish(key, {"seq": n, "value": n * 0.5})
+        timings.append((time.perf_counter() - t0) * 1_000_000)
+        n += 1
+
+
+def read(snapshot, stop: threading.Event, timings: list[float]) -> None:
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        view = snapshot()
+        len(view)
+        timings.append((time.perf_counter() - t0) * 1_000_000)
+        time.sleep(0.0001)
+
+
+def run(label: str, store, args, subscribe: bool) -> None:
+    publish = getattr(store, "publish", None) or store.update
+    per_producer = args.rate / args.producers
+
+    publish_timings: list[list[float]] = [[] for _ in range(args.producers)]
+    snapshot_timings: list[float] = []
+    stop = threading.Event()
+
+    async def main():
+        subscription = store.subscribe() if subscribe else None
+        received = 0
+
+        async def consume():
+            nonlocal received
+            async for _ in subscription:
+                received += 1
+
+        consumer = asyncio.create_task(consume()) if subscription else None
+
+        reader = threading.Thread(target=read, args=(store.snapshot, stop, snapshot_timings))
+        reader.start()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            asyncio.to_thread(produce, publish, per_producer, args.seconds, i, publish_timings[i])
+            for i in range(args.producers)
+        ))
+        elapsed = time.perf_counter() - start
+
+        stop.set()
+        reader.join()
+
+        if subscription:
+            await asyncio.sleep(0.05)
+            subscription.close()
+            await consumer
+
+        published = sum(len(t) for t in publish_timings)
+        print(f"  {label:<5} published {published} in {elapsed:.2f} s ({published / elapsed:,.0f}/s)")
+        print(f"  {label:<5} publish   {summary([t for ts in publish_timings for t in ts])}")
+        print(f"  {label:<5} snapshot  {summary(snapshot_timings)}  ({len(snapshot_timings)} reads)")
+        if subscription:
+            print(
+                f"  {label:<5} subscriber delivered={subscription.delivered} "
+                f"coalesced={subscription.coalesced}"
+            )
+
+    asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rate", type=float, default=10_000)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--producers", type=int, default=2)
+    args = parser.parse_args()
+
+    print(f"target {args.rate:,.0f} updates/s over {len(KEYS)} keys, {args.producers} producers")
+    run("state", PerceptionState(), args, subscribe=False)
+    run("bus", PerceptionBus(), args, subscribe=True)
+
+
+if __name__ == "__main__":
+    main()
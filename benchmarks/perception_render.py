@@ -0,0 +1,96 @@
+"""
+Compare planner-prompt perception rendering over a simulated session.
+
+"full"    = the previous rendering: every entry, full value, exact age
+"compact" = PerceptionSerializer with the configured policies
+"delta"   = the same, values unchanged since the previous call rendered
+           without their age
+
+Per planner call: tokens of the perception block and how often the block
+is byte-identical to the previous call's (what backend prompt caching
+can reuse).
+
+Usage:
+    python -m benchmarks.perception_render
+    python -m benchmarks.perception_render --turns 200 --screen-chars 4000
+"""
+import argparse
+import random
+import statistics
+from types import SimpleNamespace
+
+import yaml
+
+from app.perception.serializer import PerceptionSerializer, render_full
+from app.services.tokens import TokenCounter
+
+
+def entry(value, age: float):
+    return SimpleNamespace(value=value, age=age)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--config", default="app/config/assistant.yaml")
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--screen-chars", type=int, default=2000)
+    args = parser.parse_args()
+
+    with open(args.config, "r") as f:
+        cfg = (yaml.safe_load(f) or {}).get("planner", {}).get("perception") or {}
+
+    counter = TokenCounter()
+    compact = PerceptionSerializer.from_config({**cfg, "delta": False}, counter)
+    delta = PerceptionSerializer.from_config({**cfg, "delta": True}, counter)
+
+    rng = random.Random(0)
+    words = "the a report meeting budget draft review server error log deploy user".split()
+    screen = " ".join(rng.choice(words) for _ in range(args.screen_chars // 5))
+    clipboard = "git status"
+    updated = {"screen.text": 0.0, "clipboard.text": 0.0, "window.title": 0.0}
+
+    results = {"full": [], "compact": [], "delta": []}
+    identical = {"full": 0, "compact": 0, "delta": 0}
+    previous = {}
+
+    for turn in range(args.turns):
+        # 20-60 s between turns; screen changes often, clipboard sometimes
+        gap = rng.uniform(20, 60)
+        for key in updated:
+            updated[key] += gap
+        if rng.random() < 0.3:
+            screen = " ".join(rng.choice(words) for _ in range(args.screen_chars // 5))
+            updated["screen.text"] = rng.uniform(0, gap)
+        if rng.random() < 0.1:
+            clipboard = f"clip {turn}"
+            updated["clipboard.text"] = rng.uniform(0, gap)
+
+        perception = {
+            "user.input": entry({"text": f"question {turn}", "source": "keyboard"}, 0.0),
+            "screen.text": entry(screen, updated["screen.text"]),
+            "clipboard.text": entry(clipboard, updated["clipboard.text"]),
+            "window.title": entry("Terminal - vim", updated["window.title"]),
+            "audio.level": entry(round(rng.random(), 3), 0.1),
+        }
+
+        for label, text in (
+            ("full", render_full(perception)),
+            ("compact", compact.render(perception)),
+            ("delta", delta.render(perception)),
+        ):
+            results[label].append(counter.count(text))
+            identical[label] += previous.get(label) == text
+            previous[label] = text
+
+    base = statistics.mean(results["full"])
+    print(f"{args.turns} planner calls, screen text {args.screen_chars} chars")
+    for label, tokens in results.items():
+        mean = statistics.mean(tokens)
+        print(
+            f"  {label:<8} tokens/call mean={mean:7.1f}  max={max(tokens):5d}  "
+            f"saved/call={base - mean:7.1f}  identical to previous={identical[label] / args.turns:5.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
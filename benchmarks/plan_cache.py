@@ -0,0 +1,110 @@
+"""
+Benchmark CachedPlanner over a session of repeated inputs, after
+checking which plans it must not store.
+
+Checks (exit code 1 if any fails):
+- a fallback plan (LLMPlanner on unparseable output) leaves no entry
+- an inner planner that raises leaves no entry
+- a memory-write plan leaves no entry
+
+Then a simulated session: --turns inputs drawn from --distinct phrasings
+(case / punctuation variants of each), with an inner planner that takes
+--planner-ms per decision. Reports hit rate and planner time saved.
+
+Usage:
+    python -m benchmarks.plan_cache
+    python -m benchmarks.plan_cache --turns 500 --distinct 40 --planner-ms 400
+"""
+import argparse
+import logging
+import random
+import sys
+import time
+
+from app.core.actions import Action
+from app.core.plan import Plan
+from app.planners.llm_planner import LLMPlanner
+from app.planners.plan_cache import CachedPlanner
+
+
+class GarbageLLM:
+    def chat(self, prompt):
+        return "Sure! I think we should search for it."
+
+
+class FailingPlanner:
+    def decide(self, user_text, perception):
+        raise TimeoutError("planner timed out")
+
+
+class FixedPlanner:
+    def __init__(self, plan: Plan, delay_s: float = 0.0):
+        self.plan = plan
+        self.delay_s = delay_s
+
+    def decide(self, user_text, perception):
+        if self.delay_s:
+            time.sleep(self.delay_s)
+        return self.plan
+
+
+def check(name: str, planner, expect_entries: int = 0) -> bool:
+    cache = CachedPlanner(planner)
+    for _ in range(2):
+        try:
+            cache.decide("what's the weather today?", {})
+        except Exception:
+            pass
+
+    entries = cache.stats()["entries"]
+    ok = entries == expect_entries
+    print(f"  {'ok  ' if ok else 'FAIL'} {name}: {entries} cache entries")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=300)
+    parser.add_argument("--distinct", type=int, default=30)
+    parser.add_argument("--planner-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    # The fallback check makes LLMPlanner log its parse error on purpose
+    logging.getLogger("llm_planner").disabled = True
+
+    print("checks")
+    results = [
+        check("fallback plan", LLMPlanner(GarbageLLM())),
+        check("raising planner", FailingPlanner()),
+        check("memory write", FixedPlanner(Plan(actions=[
+            Action(type="write_memory", payload={"content": "x"}),
+            Action(type="respond"),
+        ]))),
+        check("web_search (cached)", FixedPlanner(Plan(actions=[
+            Action(type="web_search", payload={"query": "x"}),
+            Action(type="respond"),
+        ])), expect_entries=1),
+    ]
+    if not all(results):
+        sys.exit(1)
+
+    rng = random.Random(0)
+    phrases = [f"what is the status of project {i}" for i in range(args.distinct)]
+    variants = (str.lower, str.upper, lambda s: s + "?", lambda s: s.capitalize() + ".")
+
+    cache = CachedPlanner(FixedPlanner(Plan(actions=[Action(type="respond")]), args.planner_ms / 1000))
+    start = time.perf_counter()
+    for _ in range(args.turns):
+        cache.decide(rng.choice(variants)(rng.choice(phrases)), {})
+    elapsed = time.perf_counter() - start
+
+    stats = cache.stats()
+    print(f"{args.turns} turns over {args.distinct} phrasings, planner {args.planner_ms:.0f} ms")
+    print(
+        f"  hit rate={stats['hit_rate']:.1%}  planner calls={stats['misses']}  "
+        f"saved={stats['planner_ms_saved']:.0f} ms  total={elapsed * 1000:.0f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Benchmark PromptCompressor on a synthetic prompt: a long web-search tool
+context (with boilerplate and repeated snippets), memories, a summary and
+recent history.
+
+Reports tokens before/after and compression time. With --host/--model it
+also streams the prompt through a real Ollama server with and without
+compression and reports time-to-first-token and total latency, so the
+end-to-end change includes the compression cost.
+
+Usage:
+    python -m benchmarks.prompt_compression
+    python -m benchmarks.prompt_compression --ratios 0.4 0.6 0.8 --snippets 40
+    python -m benchmarks.prompt_compression --host http://localhost:11434 --model llama3.1
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.services.prompt_compressor import PromptCompressor
+from app.services.tokens import TokenCounter
+
+
+TOPICS = [
+    "Python 3.12 adds a per-interpreter GIL for subinterpreters.",
+    "Python 3.12 formalizes f-string parsing as described in PEP 701.",
+    "Python 3.12 removes the long-deprecated distutils package.",
+    "Error messages in Python 3.12 suggest missing imports more often.",
+    "The comprehension inlining in PEP 709 speeds up list comprehensions.",
+]
+NOISE = [
+    "The weather in Lisbon will be mild for the rest of the week.",
+    "Local football results are listed further down the page.",
+    "Our editors picked these stories for you this morning.",
+    "Traffic on the ring road is heavier than usual today.",
+]
+BOILERPLATE = [
+    "Accept all cookies to continue browsing.",
+    "Subscribe to our newsletter for weekly updates.",
+    "Click here to read more.",
+    "All rights reserved.",
+]
+
+
+def build_prompt(snippets: int, rng: random.Random) -> tuple[list[dict], str]:
+    user_text = "What changed in Python 3.12?"
+
+    lines = []
+    for i in range(snippets):
+        parts = [rng.choice(TOPICS), rng.choice(NOISE), rng.choice(NOISE)]
+        if i % 3 == 0:
+            parts.append(rng.choice(BOILERPLATE))
+        rng.shuffle(parts)
+        lines.append(f"[{i + 1}]   " + "  ".join(parts))
+
+    memories = [
+        "user works with Python daily",
+        "user lives in Porto",
+        "user prefers short answers",
+        "user is migrating a service from Python 3.10",
+    ]
+    history = []
+    for i in range(6):
+        history.append({"role": "user", "content": f"Question {i}: " + rng.choice(NOISE + TOPICS)})
+        history.append({"role": "assistant", "content": " ".join(rng.sample(TOPICS + NOISE, 3))})
+
+    messages = [
+        {"role": "system", "content": "You are a helpful local voice assistant."},
+        {"role": "system", "content": "Web search results:\n" + "\n".join(lines)},
+        {
+            "role": "system",
+            "content": "The following information is known about the user and should be considered when responding:\n"
+            + "\n".join(f"- {m}" for m in memories),
+        },
+        {"role": "system", "content": "Conversation summary so far:\n" + " ".join(rng.sample(TOPICS + NOISE, 6))},
+        *history,
+        {"role": "user", "content": user_text},
+    ]
+    return messages, user_text
+
+
+def timed_stream(llm, messages: list[dict]) -> tuple[float, float]:
+    start = time.perf_counter()
+    first = None
+    for _ in llm.stream_chat(messages):
+        if first is None:
+            first = time.perf_counter()
+    end = time.perf_counter()
+    return ((first or end) - start) * 1000, (end - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--snippets", type=int, default=25)
+    parser.add_argument("--ratios", type=float, nargs="+", default=[0.4, 0.6, 0.8])
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--host", help="Ollama host, enables the end-to-end run")
+    parser.add_argument("--model", default="llama3.1")
+    parser.add_argument("--llm-repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    counter = TokenCounter()
+    messages, user_text = build_prompt(args.snippets, rng)
+    before = counter.count_messages(messages)
+
+    print(f"prompt: {len(messages)} messages, {before} tokens")
+
+    compressed = {}
+    for ratio in args.ratios:
+        compressor = PromptCompressor(target_ratio=ratio, token_counter=counter)
+
+        timings = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            out = compressor.compress(messages, user_text)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        after = counter.count_messages(out)
+        compressed[ratio] = (out, statistics.median(timings))
+        print(
+            f"  ratio={ratio:.2f}  tokens {before:5d} -> {after:5d} "
+            f"({100 * (1 - after / before):4.1f}% saved)  "
+            f"compress p50={statistics.median(timings):7.3f} ms"
+        )
+
+    if not args.host:
+        return
+
+    from app.llm.ollama_stream import OllamaClient
+
+    llm = OllamaClient(model=args.model, host=args.host, options={"temperature": 0})
+    timed_stream(llm, messages[:2])  # load the model
+
+    def report(label: str, prompt: list[dict], overhead_ms: float) -> None:
+        runs = [timed_stream(llm, prompt) for _ in range(args.llm_repeats)]
+        ttft = statistics.median(r[0] for r in runs) + overhead_ms
+        total = statistics.median(r[1] for r in runs) + overhead_ms
+        print(f"  {label:<14} ttft={ttft:9.1f} ms  total={total:9.1f} ms")
+
+    print(f"end-to-end ({args.model}, includes compression time)")
+    report("uncompressed", messages, 0.0)
+    for ratio, (out, compress_ms) in compressed.items():
+        report(f"ratio={ratio:.2f}", out, compress_ms)
+
+
+if __name__ == "__main__":
+    main()
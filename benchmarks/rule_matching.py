@@ -0,0 +1,158 @@
+"""
+Benchmark rule-planner intent matching with a large rule set.
+
+"loop"   = the previous approach: every pattern checked in turn with
+           re.search on a string pattern
+"engine" = RuleEngine: literal phrases in one Aho-Corasick pass over the
+           words, regex patterns indexed by their leading word (the rest
+           in one compiled alternation)
+
+Both return the same winning intent; the script checks that first, on
+the generated queries and on PARITY_INPUTS against the shipped rules
+(apostrophes, possessives, punctuation around trigger words).
+
+Usage:
+    python -m benchmarks.rule_matching
+    python -m benchmarks.rule_matching --rules 500 --regex-share 0.2 --queries 1000
+"""
+import argparse
+import random
+import re
+import statistics
+import time
+
+import yaml
+
+from app.planners.rule_engine import RuleEngine
+
+SHIPPED_RULES = "app/config/planner_rules.yaml"
+
+# Inputs where word splitting and \b disagree easily
+PARITY_INPUTS = [
+    "today's headlines please",
+    "what's the current score?",
+    "Today: any news?",
+    "the latest's been odd",
+    "don't forget, remember that I'm vegan",
+    "please remember: my sister's name is Ana",
+    "save this-it's important",
+    "what is O'Brien's address",
+    "who's playing tonight",
+    "remembering that currently isn't news",
+    "I'd like a recipe",
+]
+
+
+WORDS = (
+    "alarm timer weather music light door lamp kitchen bedroom garage heat "
+    "volume playlist radio podcast calendar meeting reminder shopping list "
+    "email message call battery printer camera window garden water coffee "
+    "oven fan speaker news traffic train flight hotel recipe dinner lunch"
+).split()
+VERBS = "set start stop play pause open close turn check show add cancel".split()
+
+
+def build_rules(count: int, regex_share: float, rng: random.Random) -> list[dict]:
+    rules = []
+    for i in range(count):
+        patterns = []
+        for _ in range(3):
+            phrase = f"{rng.choice(VERBS)} {rng.choice(WORDS)} {rng.choice(WORDS)} {i}"
+            if rng.random() < regex_share:
+                patterns.append(r"\b" + phrase.replace(" ", r"\s+") + r"\b")
+            else:
+                patterns.append(phrase)
+        rules.append({
+            "intent": f"intent_{i}",
+            "priority": rng.randint(0, 10),
+            "patterns": patterns,
+            "actions": [{"type": "respond"}],
+        })
+    return rules
+
+
+def build_queries(rules: list[dict], count: int, rng: random.Random) -> list[str]:
+    queries = []
+    for _ in range(count):
+        filler = " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 14)))
+        if rng.random() < 0.5:
+            phrase = rng.choice(rng.choice(rules)["patterns"]).replace(r"\s+", " ").replace(r"\b", "")
+            if rng.random() < 0.3:
+                # Possessive / contraction right after the trigger phrase
+                phrase += rng.choice(("'s", "'ll", "'"))
+            filler = f"please {phrase} and then {filler}"
+        queries.append(filler)
+    return queries
+
+
+def loop_match(rules: list[dict], text: str) -> str | None:
+    lowered = text.lower()
+    best = None
+    for rule in rules:
+        for pattern in rule["patterns"]:
+            regex = pattern if not re.fullmatch(r"[\w' ]+", pattern) else r"\b" + pattern + r"\b"
+            m = re.search(regex, lowered)
+            if m:
+                key = (-rule["priority"], m.start())
+                if best is None or key < best[0]:
+                    best = (key, rule["intent"])
+                break
+    return best[1] if best else None
+
+
+def engine_match(engine: RuleEngine, text: str) -> str | None:
+    match = engine.match(text)
+    return match.intent if match else None
+
+
+def timed(fn, queries) -> list[float]:
+    timings = []
+    for q in queries:
+        start = time.perf_counter()
+        fn(q)
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    return timings
+
+
+def summary(timings: list[float]) -> str:
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    return f"p50={statistics.median(timings):9.1f} us  p95={p95:9.1f} us"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rules", type=int, default=500)
+    parser.add_argument("--regex-share", type=float, default=0.2)
+    parser.add_argument("--queries", type=int, default=300)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    rules = build_rules(args.rules, args.regex_share, rng)
+    queries = build_queries(rules, args.queries, rng)
+
+    start = time.perf_counter()
+    engine = RuleEngine.from_config(rules)
+    print(f"{args.rules} rules, {args.rules * 3} patterns, compiled in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    mismatches = sum(loop_match(rules, q) != engine_match(engine, q) for q in queries)
+    print(f"  agreement: {args.queries - mismatches}/{args.queries}")
+
+    with open(SHIPPED_RULES) as f:
+        shipped = yaml.safe_load(f)["rules"]
+    shipped_engine = RuleEngine.from_config(shipped)
+    diverged = [
+        (q, loop_match(shipped, q), engine_match(shipped_engine, q))
+        for q in PARITY_INPUTS
+        if loop_match(shipped, q) != engine_match(shipped_engine, q)
+    ]
+    print(f"  shipped rules parity: {len(PARITY_INPUTS) - len(diverged)}/{len(PARITY_INPUTS)}")
+    for q, expected, got in diverged:
+        print(f"    {q!r}: loop={expected} engine={got}")
+
+    print(f"  loop    {summary(timed(lambda q: loop_match(rules, q), queries))}")
+    print(f"  engine  {summary(timed(lambda q: engine_match(engine, q), queries))}")
+
+
+if __name__ == "__main__":
+    main()
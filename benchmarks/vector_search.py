@@ -0,0 +1,65 @@
+"""
+Benchmark VectorIndex append and top-k search latency.
+
+Usage:
+    python -m benchmarks.vector_search
+    python -m benchmarks.vector_search --sizes 10000 50000 --dim 768
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.memory.vector_index import VectorIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000])
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            vectors = rng.standard_normal((size, args.dim), dtype=np.float32)
+            importance = rng.integers(1, 4, size).astype(np.float32)
+            queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+
+            for quantize in (False, True):
+                label = "int8" if quantize else "float32"
+                index = VectorIndex(
+                    str(Path(tmp) / f"{label}_{size}"),
+                    dim=args.dim,
+                    quantize=quantize,
+                )
+
+                # Real add() path, including its periodic flushes
+                start = time.perf_counter()
+                for i in range(size):
+                    index.add(i + 1, vectors[i], importance[i])
+                add_us = (time.perf_counter() - start) / size * 1e6
+
+                timings = []
+                for q in queries:
+                    start = time.perf_counter()
+                    index.search(q, args.k, importance_weight=0.3)
+                    timings.append((time.perf_counter() - start) * 1000)
+
+                timings.sort()
+                print(
+                    f"memories={size:<7} dim={args.dim} {label:<7} "
+                    f"add={add_us:6.1f} us  "
+                    f"search p50={statistics.median(timings):7.3f} ms  "
+                    f"p95={timings[int(len(timings) * 0.95) - 1]:7.3f} ms"
+                )
+
+
+if __name__ == "__main__":
+    main()
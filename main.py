@@ -1,17 +1,34 @@
+from app.config import Config
 from app.core.orchestrator_factory import build_orchestrator
+from app.memory.retention import MemoryRetention
+from app.memory.vector_index import VectorIndex
+from app.observability.tracing import build_tracer
+from app.services.summary_worker import SummaryWorker
+from app.storage.database import Database
 from app.ui.console import print_event
 
 
 def main():
     orchestrator = build_orchestrator()
+    tracer = build_tracer(Config().raw.get("tracing"))
 
-    while True:
-        user_text = input("\nYou: ")
-        if user_text.strip().lower() in {"exit", "quit"}:
-            break
+    try:
+        while True:
+            user_text = input("\nYou: ")
+            if user_text.strip().lower() in {"exit", "quit"}:
+                break
 
-        for event in orchestrator.handle_user_input(user_text):
-            print_event(event)
+            with tracer.trace("turn", session_id=orchestrator.session_id):
+                for event in orchestrator.handle_user_input(user_text):
+                    print_event(event)
+    finally:
+        # Flush queued writes before exiting
+        SummaryWorker.close_shared()
+        MemoryRetention.close_shared()
+        tracer.close()
+        Database.close_shared()
+        # After the database: queued writes update the index from on_done
+        VectorIndex.close_shared()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,77 @@
+"""
+Merge near-duplicate memories in an existing database.
+
+Reports how many rows were removed and how retrieval latency changed.
+
+Usage:
+    python -m scripts.consolidate_memory
+    python -m scripts.consolidate_memory --db data/assistant.db --threshold 0.75 --dry-run
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.storage.database import Database
+from app.memory.memory_store import MemoryStore
+from app.memory.dedup import find_duplicate_groups
+
+
+def retrieval_latency_ms(store: MemoryStore, queries: list[str], rounds: int = 3) -> float:
+    timings = []
+    for _ in range(rounds):
+        for q in queries:
+            start = time.perf_counter()
+            store.get_relevant(q)
+            timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db", default="data/assistant.db")
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    db = Database(args.db)
+    store = MemoryStore(db)
+
+    contents = store.get_all(limit=-1)
+    if not contents:
+        print("No memories stored, nothing to do.")
+        return
+
+    rng = random.Random(0)
+    queries = [rng.choice(contents) for _ in range(args.queries)]
+
+    if args.dry_run:
+        with db.read() as conn:
+            rows = [
+                (r["id"], r["content"], r["importance"])
+                for r in conn.execute("SELECT id, content, importance FROM memory")
+            ]
+        groups = find_duplicate_groups(rows, args.threshold, store.MAX_IMPORTANCE)
+        removed = sum(len(g.remove_ids) for g in groups)
+        print(f"rows:            {len(rows)}")
+        print(f"duplicate groups: {len(groups)}")
+        print(f"would remove:    {removed}")
+        return
+
+    before_ms = retrieval_latency_ms(store, queries)
+    report = store.consolidate(args.threshold)
+    after_ms = retrieval_latency_ms(store, queries)
+
+    print(f"rows before:       {report.rows_before}")
+    print(f"rows removed:      {report.rows_removed}")
+    print(f"rows after:        {report.rows_after}")
+    print(f"duplicate groups:  {len(report.groups)}")
+    print(
+        f"retrieval p50:     {before_ms:.3f} ms -> {after_ms:.3f} ms "
+        f"(saved {before_ms - after_ms:.3f} ms per turn)"
+    )
+
+
+if __name__ == "__main__":
+    main()
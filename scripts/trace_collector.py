@@ -0,0 +1,145 @@
+"""
+Minimal OTLP/HTTP (JSON) trace collector for local use.
+
+Accepts POST /v1/traces from the otlp exporter (tracing.exporter: otlp)
+and prints each trace as an indented span tree with durations. With
+--out, received spans are also appended as JSON lines.
+
+Usage:
+    python -m scripts.trace_collector
+    python -m scripts.trace_collector --port 4318 --out logs/collected_traces.jsonl
+"""
+import argparse
+import json
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def attribute_value(value: dict):
+    for kind in ("stringValue", "boolValue", "doubleValue"):
+        if kind in value:
+            return value[kind]
+    if "intValue" in value:
+        return int(value["intValue"])
+    return None
+
+
+class Collector:
+    def __init__(self, out: str | None, settle_s: float):
+        self.out = out
+        self.settle_s = settle_s
+        self.lock = threading.Lock()
+        self.traces: dict[str, list[dict]] = defaultdict(list)
+        self.last_seen: dict[str, float] = {}
+
+    def receive(self, payload: dict) -> int:
+        spans = []
+        for resource in payload.get("resourceSpans", []):
+            for scope in resource.get("scopeSpans", []):
+                for s in scope.get("spans", []):
+                    spans.append({
+                        "trace_id": s["traceId"],
+                        "span_id": s["spanId"],
+                        "parent_id": s.get("parentSpanId"),
+                        "name": s["name"],
+                        "start_ns": int(s["startTimeUnixNano"]),
+                        "end_ns": int(s["endTimeUnixNano"]),
+                        "attributes": {
+                            a["key"]: attribute_value(a["value"])
+                            for a in s.get("attributes", [])
+                        },
+                        "error": s.get("status", {}).get("message"),
+                    })
+
+        with self.lock:
+            for s in spans:
+                self.traces[s["trace_id"]].append(s)
+                self.last_seen[s["trace_id"]] = time.monotonic()
+
+            if self.out:
+                with open(self.out, "a", encoding="utf-8") as f:
+                    for s in spans:
+                        f.write(json.dumps(s) + "\n")
+
+        return len(spans)
+
+    def flush_settled(self) -> None:
+        """
+        Print traces that received no spans for `settle_s`.
+        """
+        now = time.monotonic()
+        with self.lock:
+            done = [t for t, seen in self.last_seen.items() if now - seen >= self.settle_s]
+            ready = [(t, self.traces.pop(t)) for t in done]
+            for t in done:
+                del self.last_seen[t]
+
+        for trace_id, spans in ready:
+            print_trace(trace_id, spans)
+
+
+def print_trace(trace_id: str, spans: list[dict]) -> None:
+    children = defaultdict(list)
+    ids = {s["span_id"] for s in spans}
+    for s in spans:
+        parent = s["parent_id"] if s["parent_id"] in ids else None
+        children[parent].append(s)
+
+    print(f"trace {trace_id} ({len(spans)} spans)")
+
+    def walk(parent, depth):
+        for s in sorted(children[parent], key=lambda s: s["start_ns"]):
+            ms = (s["end_ns"] - s["start_ns"]) / 1e6
+            attrs = " ".join(f"{k}={v}" for k, v in s["attributes"].items())
+            error = f"  ERROR {s['error']}" if s["error"] else ""
+            print(f"  {'  ' * depth}{s['name']:<20} {ms:9.2f} ms  {attrs}{error}")
+            walk(s["span_id"], depth + 1)
+
+    walk(None, 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4318)
+    parser.add_argument("--out")
+    parser.add_argument("--settle-s", type=float, default=2.0)
+    args = parser.parse_args()
+
+    collector = Collector(args.out, args.settle_s)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != "/v1/traces":
+                self.send_error(404)
+                return
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            try:
+                collector.receive(json.loads(body))
+            except (ValueError, KeyError) as e:
+                self.send_error(400, str(e))
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Collecting OTLP traces on http://{args.host}:{args.port}/v1/traces")
+
+    try:
+        while True:
+            time.sleep(0.5)
+            collector.flush_settled()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
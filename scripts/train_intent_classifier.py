@@ -0,0 +1,122 @@
+"""
+Train and evaluate the HybridPlanner intent classifier.
+
+Input is JSONL with {"text": ..., "label": ...} per line, labels one of
+respond / web_search / write_memory. HybridPlanner writes LLM planner
+decisions in this format to planner.classifier.turn_log, so the model
+learns from the turns that would otherwise go to the LLM.
+
+Reports held-out accuracy, per-label precision/recall and, per confidence
+threshold, the share of turns the classifier would decide on its own
+(LLM planner calls avoided; write_memory predictions never are) and its
+accuracy on them.
+
+Usage:
+    python -m scripts.train_intent_classifier
+    python -m scripts.train_intent_classifier --data data/planner_turns.jsonl extra.jsonl \\
+        --out data/intent_classifier.npz --thresholds 0.7 0.8 0.9
+"""
+import argparse
+import json
+import random
+import time
+from collections import Counter
+
+import numpy as np
+
+from app.planners.intent_classifier import IntentClassifier
+
+
+def load_examples(paths: list[str]) -> list[tuple[str, str]]:
+    examples = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                row = json.loads(line)
+                if row.get("label") in IntentClassifier.LABELS and row.get("text"):
+                    examples.append((row["text"], row["label"]))
+    return examples
+
+
+def evaluate(model: IntentClassifier, examples: list[tuple[str, str]], thresholds: list[float]) -> None:
+    predictions = [model.predict(text) for text, _ in examples]
+    truth = [label for _, label in examples]
+
+    correct = sum(p == t for (p, _), t in zip(predictions, truth))
+    print(f"  accuracy: {correct / len(examples):.3f} ({correct}/{len(examples)})")
+
+    for label in model.labels:
+        tp = sum(p == label and t == label for (p, _), t in zip(predictions, truth))
+        predicted = sum(p == label for p, _ in predictions)
+        actual = truth.count(label)
+        precision = tp / predicted if predicted else 0.0
+        recall = tp / actual if actual else 0.0
+        print(f"  {label:<13} precision={precision:.3f}  recall={recall:.3f}  (n={actual})")
+
+    print("  threshold  decided (llm calls avoided)  accuracy when decided")
+    for threshold in thresholds:
+        decided = [
+            (p, t)
+            for (p, c), t in zip(predictions, truth)
+            if c >= threshold and p in IntentClassifier.DECIDES
+        ]
+        accuracy = sum(p == t for p, t in decided) / len(decided) if decided else 0.0
+        print(f"  {threshold:9.2f}  {len(decided) / len(examples):27.1%}  {accuracy:21.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--data", nargs="+", default=["data/planner_turns.jsonl"])
+    parser.add_argument("--out", default="data/intent_classifier.npz")
+    parser.add_argument("--dim", type=int, default=1 << 15)
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--lr", type=float, default=2.0)
+    parser.add_argument("--eval-share", type=float, default=0.2)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.6, 0.7, 0.8, 0.9])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    examples = load_examples(args.data)
+    if not examples:
+        raise SystemExit(f"No labelled examples in {', '.join(args.data)}")
+
+    random.Random(args.seed).shuffle(examples)
+    split = int(len(examples) * (1 - args.eval_share))
+    train, held_out = examples[:split], examples[split:] or examples[:split]
+
+    print(f"{len(examples)} examples ({dict(Counter(label for _, label in examples))})")
+
+    model = IntentClassifier.empty(dim=args.dim)
+    start = time.perf_counter()
+    losses = model.fit(
+        [text for text, _ in train],
+        [label for _, label in train],
+        epochs=args.epochs,
+        lr=args.lr,
+        seed=args.seed,
+    )
+    print(f"trained on {len(train)} in {time.perf_counter() - start:.1f} s (loss {losses[0]:.3f} -> {losses[-1]:.3f})")
+
+    print(f"held-out ({len(held_out)})")
+    evaluate(model, held_out, args.thresholds)
+
+    model.save(args.out)
+
+    start = time.perf_counter()
+    loaded = IntentClassifier.load(args.out)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    timings = []
+    for text, _ in held_out[:500]:
+        start = time.perf_counter()
+        loaded.predict(text)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    print(f"saved {args.out} (load {load_ms:.1f} ms, predict p50 {np.median(timings):.3f} ms)")
+
+
+if __name__ == "__main__":
+    main()